@@ -1,7 +1,6 @@
 import sys
 from eval_core.engine import EvaluationEngine
 from eval_core.utils import safe_print, log
-from eval_core.admin import AdminMenu  # You’ll implement admin next
 
 #redacted in french for my students (in english for my part) please modify it in your prefered langage.
 
@@ -28,6 +27,7 @@ def main():
     # -----------------------------------------
     if student_name.lower() in ["teacher", "admin", "prof"]:
         safe_print("\n🔐 Entering ADMIN MODE...\n")
+        from eval_core.admin import AdminMenu  # sqlite3 / log viewer: teacher mode only
         admin = AdminMenu()
         admin.start()
         return
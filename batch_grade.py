@@ -0,0 +1,48 @@
+import sys
+import argparse
+from eval_core.batch import BatchGrader
+from eval_core.utils import safe_print, logger
+
+# Headless regrade of a whole cohort (no QCM, no cooldown, no input()).
+# Usage: python3 batch_grade.py [--dir results] [--workers 8] [--timeout 2]
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade every student folder at once.")
+    parser.add_argument("--dir", default="results", help="submissions directory (one folder per student)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=2, help="timeout per test in seconds")
+    parser.add_argument("--backend", default="subprocess", choices=["subprocess", "warm"],
+                        help="sandbox backend (warm = pre-forked interpreters)")
+    parser.add_argument("--no-cache", action="store_true", help="ignore the verdict cache")
+    parser.add_argument("--quiet", action="store_true", help="no log echo on the console")
+    parser.add_argument("--publish", action="store_true", help="push all results to git_repo in one commit")
+    args = parser.parse_args()
+
+    try:
+        grader = BatchGrader(args.dir, workers=args.workers, timeout=args.timeout,
+                             backend=args.backend, use_cache=not args.no_cache)
+    except FileNotFoundError as e:
+        safe_print(f"❌ {e}")
+        sys.exit(1)
+
+    if args.quiet:
+        logger.configure(console=False)
+
+    summary = grader.run()
+
+    safe_print("\n===========================================")
+    safe_print("          📦 Batch grading finished        ")
+    safe_print("===========================================")
+    safe_print(f"Students : {summary['students']}")
+    safe_print(f"Passed   : {summary['passed']}")
+    safe_print(f"Average  : {summary['average_score']}")
+    safe_print(f"Time     : {summary['elapsed_seconds']}s ({summary['workers']} workers)\n")
+
+    if args.publish:
+        if grader.publish(timeout=120):
+            safe_print("📤 Results pushed.")
+        else:
+            safe_print("⚠️ Push not done yet, results stay queued (data/publish_queue.json).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+import time
+import statistics
+
+# Exercise catalog: cold load, warm lookups, reload after an edit.
+# Usage (from the repo root): python3 benchmarks/bench_catalog.py [runs]
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eval_core.catalog import ExerciseCatalog  # noqa: E402
+from eval_core.utils import logger  # noqa: E402
+
+
+def run(runs=20, root="exercises"):
+    logger.configure(console=False)
+
+    cold = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        catalog = ExerciseCatalog(root)
+        cold.append((time.perf_counter() - start) * 1000)
+
+    names = catalog.names()
+    lookups = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < 0.2:
+        for name in names:
+            catalog.tests(name)
+            catalog.tests_hash(name)
+        lookups += 2 * len(names)
+    lookup_rate = lookups / (time.perf_counter() - start)
+
+    # Edit detection: stat() only once check_interval has elapsed
+    catalog = ExerciseCatalog(root, check_interval=0)
+    path = catalog.tests_path(names[0])
+    st = os.stat(path)
+    reload = []
+    for i in range(runs):
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + i + 1))
+        start = time.perf_counter()
+        catalog.tests(names[0])
+        reload.append((time.perf_counter() - start) * 1000)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    return {
+        "exercises": len(names),
+        "runs": runs,
+        "cold_load_median_ms": round(statistics.median(cold), 3),
+        "cold_load_max_ms": round(max(cold), 3),
+        "lookups_per_s": round(lookup_rate),
+        "reload_median_ms": round(statistics.median(reload), 3),
+    }
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(json.dumps(run(runs), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import time
+import tempfile
+
+# Comparator.compare / StreamMatcher throughput on small and multi-MB outputs
+# (inline expected strings, and a file-backed tests/NN.out).
+# Usage (from the repo root): python3 benchmarks/bench_comparator.py [size_mb]
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eval_core.comparator import Comparator  # noqa: E402
+from eval_core.stream_compare import StreamMatcher  # noqa: E402
+
+CHUNK = 65536
+
+
+def _output(size):
+    line = "Fizz 1234567890 Buzz\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def _measure(fn, size, min_time=0.2):
+    """
+    Repeat fn() for at least min_time seconds -> (calls/s, MB/s).
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+    return round(calls / elapsed, 1), round(calls * size / elapsed / 1e6, 1)
+
+
+def bench_case(comparator, name, got, expected):
+    size = len(got)
+    data = got.encode("utf-8")
+
+    def stream():
+        matcher = StreamMatcher(expected)
+        for i in range(0, len(data), CHUNK):
+            if not matcher.feed(data[i:i + CHUNK]):
+                break
+        matcher.finish()
+
+    compare_rate, compare_mb = _measure(lambda: comparator.compare(got, expected), size)
+    stream_rate, stream_mb = _measure(stream, size)
+
+    return {
+        "case": name,
+        "bytes": size,
+        "compare_per_s": compare_rate,
+        "compare_mb_s": compare_mb,
+        "stream_per_s": stream_rate,
+        "stream_mb_s": stream_mb,
+    }
+
+
+def run(size_mb=4):
+    comparator = Comparator()
+    small = _output(120)
+    big = _output(int(size_mb * 1024 * 1024))
+
+    with tempfile.NamedTemporaryFile("w", suffix=".out", encoding="utf-8") as f:
+        f.write(big)
+        f.flush()
+        return [
+            bench_case(comparator, "small_equal", small, small),
+            bench_case(comparator, "small_trailing_ws", small + "  \n\n", small),
+            bench_case(comparator, "large_equal", big, big),
+            bench_case(comparator, "large_diff_at_end", big[:-2] + "X\n", big),
+            bench_case(comparator, "large_equal_file", big, {"file": f.name}),
+        ]
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    print(json.dumps(run(size_mb), indent=4))
+
+
+if __name__ == "__main__":
+    main()
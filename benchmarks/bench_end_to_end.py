@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+# End-to-end grading (BatchGrader) of N synthetic students built from exercises/:
+# correct, wrong, crashing and timing-out solutions, deterministic for a given seed.
+# Usage (from the repo root): python3 benchmarks/bench_end_to_end.py [students]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from eval_core.batch import BatchGrader  # noqa: E402
+from eval_core.catalog import ExerciseCatalog  # noqa: E402
+from eval_core.case_files import read_text  # noqa: E402
+from eval_core.utils import log, logger  # noqa: E402
+
+KINDS = {"correct": 0.5, "wrong": 0.2, "crash": 0.2, "timeout": 0.1}
+
+# "correct" answers every test of the exercise from a lookup table
+TEMPLATES = {
+    "correct": "import sys\nCASES = {cases!r}\nsys.stdout.write(CASES.get(sys.stdin.read(), ''))\n",
+    "wrong": "import sys\nsys.stdin.read()\nprint('definitely not the answer')\n",
+    "crash": "import sys\nsys.stdin.read()\nraise RuntimeError('boom')\n",
+    "timeout": "while True:\n    pass\n",
+}
+
+
+def build_cohort(submissions_dir, exercises, catalog, students, seed):
+    """
+    Writes submissions_dir/<student>/<expected file>; returns {kind: count}.
+    """
+    rng = random.Random(seed)
+    kinds = list(KINDS)
+    weights = list(KINDS.values())
+    counts = dict.fromkeys(kinds, 0)
+
+    for i in range(students):
+        student_dir = os.path.join(submissions_dir, f"student{i:04d}")
+        os.makedirs(student_dir)
+        for exo in exercises:
+            name = exo["name"]
+            kind = rng.choices(kinds, weights)[0]
+            counts[kind] += 1
+            cases = {read_text(t.get("input", "")): read_text(t["output"])
+                     for t in catalog.tests(name)}
+            filename = catalog.expected_filenames(name)[0]
+            with open(os.path.join(student_dir, filename), "w", encoding="utf-8") as f:
+                f.write(TEMPLATES[kind].format(cases=cases))
+
+    return counts
+
+
+def run(students=20, backend="subprocess", workers=None, timeout=0.5, seed=42):
+    logger.configure(console=False)
+    cwd = os.getcwd()
+    # The log writer resolves logs/ once: here, not in the temp dir removed below
+    log(f"[BENCH] End-to-end: {students} students, {backend} backend")
+    logger.flush()
+
+    # Everything else the grader writes (results, caches) stays in the temp dir
+    with tempfile.TemporaryDirectory(dir=REPO_ROOT) as tmp:
+        os.chdir(tmp)
+        try:
+            os.makedirs("results")
+            grader = BatchGrader(
+                "results", workers=workers, timeout=timeout, backend=backend, use_cache=False,
+                config_dir=os.path.join(REPO_ROOT, "config"),
+                exercises_dir=os.path.join(REPO_ROOT, "exercises")
+            )
+            catalog = ExerciseCatalog(os.path.join(REPO_ROOT, "exercises"))
+            exercises = grader.selected_exercises()
+            counts = build_cohort("results", exercises, catalog, students, seed)
+
+            start = time.perf_counter()
+            summary = grader.run()
+            elapsed = time.perf_counter() - start
+            logger.flush()
+        finally:
+            os.chdir(cwd)
+
+    submissions = students * len(exercises)
+    return {
+        "backend": backend,
+        "students": students,
+        "submissions": submissions,
+        "kinds": counts,
+        "workers": summary["workers"],
+        "timeout_s": timeout,
+        "elapsed_s": round(elapsed, 3),
+        "submissions_per_s": round(submissions / elapsed, 2),
+        # Only the "correct" submissions can pass: anything else is a grading bug
+        "passed_submissions": sum(summary["exercise_success"].values()),
+        "expected_passed": counts["correct"],
+    }
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(json.dumps([run(students, backend) for backend in ("subprocess", "warm")], indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import statistics
+
+# Per-test latency of the sandbox backends (subprocess vs warm pool).
+# Usage (from the repo root): python3 benchmarks/bench_sandbox_backends.py [runs]
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eval_core.sandbox_runner import SandboxRunner  # noqa: E402
+
+SUBMISSION = """n = int(input())
+for i in range(1, n + 1):
+    print("FizzBuzz" if i % 15 == 0 else "Fizz" if i % 3 == 0 else "Buzz" if i % 5 == 0 else i)
+"""
+
+
+def bench(backend, file_path, runs):
+    sandbox = SandboxRunner(backend=backend)
+    sandbox.run(file_path, "python", "15\n")  # warm-up
+
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = sandbox.run(file_path, "python", "15\n")
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert result.exit_code == 0, result.stderr
+
+    if sandbox.pool is not None:
+        sandbox.pool.close()
+
+    return {
+        "backend": sandbox.backend,
+        "runs": runs,
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "median_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(sorted(latencies)[int(runs * 0.95) - 1], 3),
+    }
+
+
+def run(runs=50):
+    with tempfile.TemporaryDirectory(dir=os.getcwd()) as tmp:
+        file_path = os.path.join(tmp, "fizzbuzz.py")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(SUBMISSION)
+
+        return [bench(backend, file_path, runs) for backend in ("subprocess", "warm")]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(json.dumps(run(runs), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eval_core.similarity import SimilarityIndex  # noqa: E402
+
+# Similarity index on a synthetic cohort: every student writes their own random
+# program per exercise, a few copy another student's (renamed variables, other
+# constants, extra lines). Measures the full index, an incremental update and the
+# report, and checks that the planted copies come out on top.
+# Usage (from the repo root): python3 benchmarks/bench_similarity.py [students] [exercises]
+
+OPS = ["+", "-", "*", "//", "%"]
+
+
+class _Catalog:
+    def __init__(self, exercises):
+        self.exercises = exercises
+
+    def names(self):
+        return self.exercises
+
+    def expected_filenames(self, name):
+        return [f"{name}.py"]
+
+
+def _program(rng, lines=30):
+    names = [f"v{i}" for i in range(6)]
+    out = ["n = int(input())"]
+    depth = 0
+    for _ in range(lines):
+        a, b, c = rng.sample(names, 3)
+        kind = rng.random()
+        indent = "    " * depth
+        if kind < 0.15 and depth < 2:
+            out.append(f"{indent}for {a} in range({rng.randint(1, 9)}, n):")
+            depth += 1
+        elif kind < 0.25 and depth < 2:
+            out.append(f"{indent}if {a} {rng.choice(['<', '>', '=='])} {b}:")
+            depth += 1
+        elif kind < 0.35 and depth > 0:
+            depth -= 1
+            out.append(f"{'    ' * depth}{a} = {rng.randint(0, 99)}")
+        elif kind < 0.45:
+            out.append(f"{indent}print({a}, {b} {rng.choice(OPS)} {rng.randint(1, 9)})")
+        else:
+            out.append(f"{indent}{a} = {b} {rng.choice(OPS)} {c} {rng.choice(OPS)} {rng.randint(1, 9)}")
+    return "\n".join(["v0 = v1 = v2 = v3 = v4 = v5 = 1"] + out) + "\n"
+
+
+def _disguise(rng, source):
+    """
+    Renamed variables, other constants, a few extra lines.
+    """
+    for i in range(6):
+        source = source.replace(f"v{i}", f"tmp_{rng.randint(100, 999)}_{i}")
+    lines = []
+    for line in source.splitlines():
+        lines.append("".join(str(rng.randint(1, 9)) if ch.isdigit() and rng.random() < 0.5 else ch
+                             for ch in line) if "tmp_" not in line else line)
+        if rng.random() < 0.1:
+            lines.append(line[: len(line) - len(line.lstrip())] + "pass  # my code")
+    return "\n".join(lines) + "\n"
+
+
+def run(students=300, exercises=8, copies=10, seed=1):
+    rng = random.Random(seed)
+    names = [f"exo{i}" for i in range(exercises)]
+    catalog = _Catalog(names)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = os.path.join(tmp, "results")
+        planted = set()
+        sources = {}
+        for s in range(students):
+            for name in names:
+                sources[(f"student{s:03}", name)] = _program(rng)
+        for _ in range(copies):
+            a, b = rng.sample(range(students), 2)
+            name = rng.choice(names)
+            sources[(f"student{b:03}", name)] = _disguise(rng, sources[(f"student{a:03}", name)])
+            planted.add((name, tuple(sorted((f"student{a:03}", f"student{b:03}")))))
+
+        for (student, name), source in sources.items():
+            os.makedirs(os.path.join(results, student), exist_ok=True)
+            with open(os.path.join(results, student, f"{name}.py"), "w", encoding="utf-8") as f:
+                f.write(source)
+
+        index = SimilarityIndex(os.path.join(tmp, "similarity.db"))
+
+        start = time.perf_counter()
+        index.index_tree(catalog, results)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        # New submission of one student: only that file is fingerprinted again
+        with open(os.path.join(results, "student000", "exo0.py"), "a", encoding="utf-8") as f:
+            f.write("print(n)\n")
+        start = time.perf_counter()
+        indexed, unchanged, _ = index.index_tree(catalog, results)
+        incremental_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        pairs = index.suspicious_pairs(min_similarity=0.5, limit=None)
+        report_ms = (time.perf_counter() - start) * 1000
+
+        fingerprint_count = index._db.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+        found = {(p["exercise"], tuple(sorted(p["students"]))) for p in pairs}
+
+    return {
+        "students": students,
+        "exercises": exercises,
+        "submissions": len(sources),
+        "fingerprints": fingerprint_count,
+        "naive_pairs": exercises * students * (students - 1) // 2,
+        "full_index_ms": round(full_ms, 1),
+        "incremental_ms": round(incremental_ms, 1),
+        "incremental_indexed": indexed,
+        "report_ms": round(report_ms, 1),
+        "pairs_reported": len(pairs),
+        "planted_found": len(planted & found),
+        "planted": len(planted),
+    }
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    exercises = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(json.dumps(run(students, exercises), indent=4))
+
+
+if __name__ == "__main__":
+    main()
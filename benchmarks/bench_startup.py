@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import shutil
+import statistics
+import subprocess
+import tempfile
+
+# Session startup: fresh interpreter -> `import eval_core.engine` -> EvaluationEngine ready.
+# Every run is a new process (cold imports), in a temp dir with a copy of config/
+# and a local bare Git repo, so the background clone is exercised too.
+# Usage (from the repo root): python3 benchmarks/bench_startup.py [runs]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+from eval_core.engine import EvaluationEngine
+imported = time.perf_counter()
+engine = EvaluationEngine("bench_student")
+ready = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "init_ms": (ready - imported) * 1000,
+                  "total_ms": (ready - start) * 1000}))
+"""
+
+
+def _prepare(tmp):
+    shutil.copytree(os.path.join(REPO_ROOT, "config"), os.path.join(tmp, "config"))
+    os.symlink(os.path.join(REPO_ROOT, "exercises"), os.path.join(tmp, "exercises"))
+
+    bare = os.path.join(tmp, "remote.git")
+    subprocess.run(["git", "init", "--bare", "-q", bare], capture_output=True, shell=False)
+
+    path = os.path.join(tmp, "config", "eval_config.json")
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config.update(git_repo=bare, log_console=False, sandbox_backend="subprocess",
+                  grading_service="", watch_mode=False)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=4)
+
+
+def run(runs=10):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    samples = []
+
+    with tempfile.TemporaryDirectory(dir=REPO_ROOT) as tmp:
+        _prepare(tmp)
+        for _ in range(runs):
+            out = subprocess.run(
+                [sys.executable, "-c", CHILD], cwd=tmp, env=env,
+                capture_output=True, text=True, shell=False
+            )
+            if out.returncode != 0:
+                raise RuntimeError(f"Startup run failed: {out.stderr.strip()}")
+            samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    def median(key):
+        return round(statistics.median(s[key] for s in samples), 2)
+
+    return {
+        "runs": runs,
+        "import_median_ms": median("import_ms"),
+        "init_median_ms": median("init_ms"),
+        "total_median_ms": median("total_ms"),
+        "total_max_ms": round(max(s["total_ms"] for s in samples), 2),
+    }
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(json.dumps(run(runs), indent=4))
+
+
+if __name__ == "__main__":
+    main()
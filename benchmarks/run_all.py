@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+
+# Runs the whole benchmark suite and writes one JSON file per run,
+# so two runs (two commits, two machines) can be compared.
+# Usage (from the repo root):
+#   python3 benchmarks/run_all.py [--quick] [--output FILE] [--baseline OLD.json]
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+import bench_sandbox_backends  # noqa: E402
+import bench_comparator  # noqa: E402
+import bench_catalog  # noqa: E402
+import bench_end_to_end  # noqa: E402
+import bench_startup  # noqa: E402
+import bench_similarity  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, shell=False
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suite(quick=False):
+    runs = 10 if quick else 50
+    students = 5 if quick else 20
+
+    suite = {
+        "sandbox_latency": lambda: bench_sandbox_backends.run(runs),
+        "comparator": lambda: bench_comparator.run(1 if quick else 4),
+        "catalog": lambda: bench_catalog.run(5 if quick else 20),
+        "startup": lambda: bench_startup.run(5 if quick else 20),
+        "similarity": lambda: bench_similarity.run(40 if quick else 300),
+        "end_to_end": lambda: [bench_end_to_end.run(students, backend)
+                               for backend in ("subprocess", "warm")],
+    }
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "quick": quick,
+        "results": {},
+    }
+
+    for name, bench in suite.items():
+        start = time.perf_counter()
+        report["results"][name] = bench()
+        print(f"[BENCH] {name} done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    return report
+
+
+# ---------------------------------------------------------
+# COMPARE WITH AN OLDER RUN
+# ---------------------------------------------------------
+
+def _flatten(value, prefix=""):
+    """
+    {"a": [{"backend": "warm", "mean_ms": 3}]} -> {"a.warm.mean_ms": 3}
+    """
+    flat = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            label = str(i)
+            if isinstance(item, dict):
+                label = str(item.get("backend") or item.get("case") or i)
+            flat.update(_flatten(item, f"{prefix}.{label}"))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        flat[prefix] = value
+    return flat
+
+
+def compare(baseline, report):
+    old = _flatten(baseline["results"])
+    new = _flatten(report["results"])
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        if old[key]:
+            rows.append({"metric": key, "old": old[key], "new": new[key],
+                         "ratio": round(new[key] / old[key], 3)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the grading benchmark suite.")
+    parser.add_argument("--quick", action="store_true", help="fewer runs (smoke test)")
+    parser.add_argument("--output", default=None, help="JSON file (default: benchmarks/results/<date>.json)")
+    parser.add_argument("--baseline", default=None, help="older JSON run to compare with")
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    report = run_suite(args.quick)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["comparison"] = {
+                "baseline": args.baseline,
+                "metrics": compare(json.load(f), report),
+            }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+
+    print(json.dumps(report, indent=4))
+    print(f"[BENCH] Saved to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
-import json
 from eval_core.utils import safe_print, log
+from eval_core.results_store import get_results_store
+from eval_core.log_viewer import LogViewer
 
 RESULTS_DIR = "results"
 LOG_FILE = "logs/system.log"
@@ -12,6 +13,11 @@ class AdminMenu:
         if not os.path.isdir(RESULTS_DIR):
             os.mkdir(RESULTS_DIR)
 
+        # Indexed results (first run: import the existing results/ tree)
+        self.store = get_results_store()
+        if self.store.count() == 0:
+            self.store.import_tree(RESULTS_DIR)
+
     # -----------------------------------------------------
     # Main loop
     # -----------------------------------------------------
@@ -35,6 +41,18 @@ class AdminMenu:
                 self.show_system_logs()
 
             elif choice == "4":
+                self.filter_students()
+
+            elif choice == "5":
+                self.show_leaderboard()
+
+            elif choice == "6":
+                self.import_results()
+
+            elif choice == "7":
+                self.show_similarity_report()
+
+            elif choice == "8":
                 safe_print("\n🔙 Leaving admin mode...")
                 break
 
@@ -50,7 +68,11 @@ class AdminMenu:
         safe_print("1️⃣  List all students evaluated")
         safe_print("2️⃣  View results of a specific student")
         safe_print("3️⃣  View system logs")
-        safe_print("4️⃣  Exit admin mode\n")
+        safe_print("4️⃣  Filter students (passed / failed / exercise)")
+        safe_print("5️⃣  Leaderboard")
+        safe_print("6️⃣  Re-import results/ folder")
+        safe_print("7️⃣  Similarity report (suspicious pairs)")
+        safe_print("8️⃣  Exit admin mode\n")
 
     # -----------------------------------------------------
     # Option 1 — List students
@@ -58,35 +80,32 @@ class AdminMenu:
 
     def list_students(self):
         safe_print("\n📁 Students evaluated:")
+        self._print_rows(self.store.students())
 
-        dirs = [d for d in os.listdir(RESULTS_DIR)
-                if os.path.isdir(os.path.join(RESULTS_DIR, d))]
-
-        if not dirs:
-            safe_print("⚠️ No student results found yet.\n")
+    def _print_rows(self, rows, ranked=False):
+        if not rows:
+            safe_print("⚠️ No student results found.\n")
             return
 
-        for d in dirs:
-            safe_print(f" - {d}")
+        for rank, (student, total, passed) in enumerate(rows, 1):
+            prefix = f"{rank:4}. " if ranked else " - "
+            status = "✅" if passed else "❌"
+            safe_print(f"{prefix}{student:25} {total:>6} pts {status}")
 
-        safe_print("")
+        safe_print(f"\n({len(rows)} students)\n")
 
     # -----------------------------------------------------
-    # Option 2 — Show a student's results.json
+    # Option 2 — Show a student's results
     # -----------------------------------------------------
 
     def show_student_results(self):
         student = input("\nEnter student name: ").strip()
 
-        path = os.path.join(RESULTS_DIR, student, "results.json")
-
-        if not os.path.exists(path):
-            safe_print(f"❌ No results found for '{student}'.")
-            return
-
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = self.store.get(student)
+            if data is None:
+                safe_print(f"❌ No results found for '{student}'.")
+                return
 
             safe_print("\n===========================================")
             safe_print(f"📊 Results for: {student}")
@@ -94,37 +113,142 @@ class AdminMenu:
 
             safe_print(f"QCM Score : {data['qcm_score']}")
             safe_print(f"Total Score : {data['total_score']}")
-            safe_print(f"Passed : {'✅ YES' if data['passed'] else '❌ NO'}\n")
+            safe_print(f"Passed : {'✅ YES' if data['passed'] else '❌ NO'}")
+            if "variant" in data:
+                safe_print(f"Variant : {data['variant']}")
+            safe_print("")
 
             safe_print("🧪 Exercises results:")
             for exo in data["exercises"]:
                 status = "✅ OK" if exo["success"] else "❌ KO"
-                safe_print(f" - {exo['exercise']:25} {status} ({exo['points']} pts)")
+                details = ""
+                if exo.get("variation"):
+                    details += f" [{exo['variation']}]"
+                if exo.get("efficiency") is not None:
+                    details += f" x{exo['efficiency']} CPU"
+                safe_print(f" - {exo['exercise']:25} {status} ({exo['points']} pts){details}")
 
             safe_print("\n===========================================\n")
 
         except Exception as e:
-            safe_print("❌ Error reading results file.")
+            safe_print("❌ Error reading results.")
             log(f"[ADMIN ERROR] Failed to load results for {student}: {e}")
 
+    # -----------------------------------------------------
+    # Option 4 — Filter students
+    # -----------------------------------------------------
+
+    def filter_students(self):
+        safe_print("\nFilter by: 1) passed  2) failed  3) exercise succeeded  4) exercise failed")
+        choice = input("> ").strip()
+
+        if choice == "1":
+            rows = self.store.students(passed=True)
+        elif choice == "2":
+            rows = self.store.students(passed=False)
+        elif choice in ("3", "4"):
+            stats = self.store.exercise_stats()
+            if stats:
+                safe_print("Exercises: " + ", ".join(f"{name} ({ok} ✅)" for name, ok in stats.items()))
+            exercise = input("Exercise name: ").strip()
+            rows = self.store.students(exercise=exercise, exercise_success=(choice == "3"))
+        else:
+            safe_print("❌ Invalid choice.")
+            return
+
+        safe_print("")
+        self._print_rows(rows)
+
+    # -----------------------------------------------------
+    # Option 5 — Leaderboard
+    # -----------------------------------------------------
+
+    def show_leaderboard(self):
+        size = input("\nHow many students? [10] ").strip()
+        limit = int(size) if size.isdigit() else 10
+
+        safe_print("\n🏆 Leaderboard:")
+        self._print_rows(self.store.leaderboard(limit), ranked=True)
+
+    # -----------------------------------------------------
+    # Option 6 — (Re)import the results/ folder
+    # -----------------------------------------------------
+
+    def import_results(self):
+        imported, skipped, errors = self.store.import_tree(RESULTS_DIR)
+        safe_print(f"\n📥 Imported {imported} results ({skipped} unchanged, {errors} errors).\n")
+
+    # -----------------------------------------------------
+    # Option 7 — Similarity report
+    # -----------------------------------------------------
+
+    def show_similarity_report(self):
+        # sqlite index + tokenizers only loaded when asked for
+        from eval_core.similarity import get_similarity_index, line_ranges
+        from eval_core.catalog import get_catalog
+
+        index = get_similarity_index()
+        indexed, unchanged, removed = index.index_tree(get_catalog(), RESULTS_DIR)
+        safe_print(f"\n🔎 Index updated: {indexed} new / modified submissions "
+                   f"({unchanged} unchanged, {removed} removed).")
+
+        exercise = input("Exercise (Enter = all): ").strip() or None
+        threshold = input("Minimum similarity % [50]: ").strip()
+        min_similarity = int(threshold) / 100 if threshold.isdigit() else 0.5
+
+        pairs = index.suspicious_pairs(exercise=exercise, min_similarity=min_similarity, limit=30)
+        if not pairs:
+            safe_print("✅ No suspicious pair found.\n")
+            return
+
+        safe_print("\n🕵️ Suspicious pairs:")
+        for rank, pair in enumerate(pairs, 1):
+            a, b = pair["students"]
+            safe_print(f"{rank:4}. {pair['exercise']:22} {a:>15} ↔ {b:<15} "
+                       f"{pair['similarity'] * 100:5.1f}% ({pair['shared']} fingerprints)")
+
+        choice = input("\nDetails of pair # (Enter to skip): ").strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(pairs):
+            pair = pairs[int(choice) - 1]
+            lines_a, lines_b = index.shared_lines(*pair["ids"])
+            for student, path, lines in zip(pair["students"], pair["paths"], (lines_a, lines_b)):
+                safe_print(f" - {student}: {path}\n   shared lines: {line_ranges(lines)}")
+        safe_print("")
+
     # -----------------------------------------------------
     # Option 3 — Show system logs
     # -----------------------------------------------------
 
     def show_system_logs(self):
-        if not os.path.exists(LOG_FILE):
+        viewer = LogViewer(LOG_FILE)
+        if not viewer.files():
             safe_print("⚠️ No system logs found.")
             return
 
-        safe_print("\n======= 📝 SYSTEM LOGS =======\n")
+        # Empty answers = no filter (plain tail of the live log)
+        safe_print("\nFilters (press Enter to skip):")
+        student = input("Student: ").strip() or None
+        since = input("From (YYYY-MM-DD HH:MM or HH:MM): ").strip() or None
+        until = input("To   (YYYY-MM-DD HH:MM or HH:MM): ").strip() or None
+        tag = input("Tag (e.g. SANDBOX ERROR, GIT): ").strip() or None
 
         try:
-            with open(LOG_FILE, "r", encoding="utf-8") as f:
-                for line in f.readlines()[-50:]:  # show last 50 lines
-                    safe_print(line.rstrip())
+            if student or since or until or tag:
+                lines = viewer.search(student=student, since=since, until=until, tag=tag, limit=50)
+            else:
+                lines = viewer.tail(50)  # show last 50 lines
 
+            safe_print("\n======= 📝 SYSTEM LOGS =======\n")
+            for line in lines:
+                safe_print(line)
+            if not lines:
+                safe_print("(no matching lines)")
             safe_print("\n==============================\n")
 
+        except ValueError as e:
+            safe_print("❌ Invalid date, expected YYYY-MM-DD HH:MM or HH:MM.")
+            log(f"[ADMIN ERROR] Bad log filter: {e}")
+
         except Exception as e:
             safe_print("❌ Error opening system logs.")
             log(f"[ADMIN ERROR] Failed to open system.log: {e}")
\ No newline at end of file
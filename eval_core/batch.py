@@ -0,0 +1,486 @@
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from eval_core.utils import log, configure_logger
+from eval_core.sandbox_runner import SandboxRunner
+from eval_core.comparator import Comparator
+from eval_core.verdict_cache import VerdictCache, suite_name, verdict_key
+from eval_core.catalog import get_catalog
+from eval_core.git_manager import GitManager
+from eval_core.publish_queue import PublishQueue
+from eval_core.results_store import get_results_store
+from eval_core.variants import VariantFile, VariantError, resolve_exercises
+from eval_core.calibration import (
+    PerformanceLimits, performance_spec, performance_points, efficiency
+)
+
+SUMMARY_FILE = "cohort_summary.json"
+
+
+# ---------------------------------------------------------
+# WORKER SIDE (runs inside the process pool)
+# ---------------------------------------------------------
+
+_worker_sandbox = None
+_worker_comparator = None
+
+
+def _init_worker(timeout, backend, limits, compilers, exercises_dir):
+    """
+    Build one SandboxRunner + Comparator per worker process.
+    With the "warm" backend, each worker keeps one warm interpreter.
+    """
+    global _worker_sandbox, _worker_comparator
+    _worker_sandbox = SandboxRunner(timeout=timeout, backend=backend, pool_size=1,
+                                    limits=limits, compilers=compilers)
+    _worker_comparator = Comparator(exercises_dir)
+
+
+def _grade_case(job):
+    """
+    Grade one (submission, test) pair.
+    cpu_limit: calibrated CPU limit of the test (None: sandbox timeout only).
+    Returns (submission_key, test_index, verdict, cacheable, cpu_time).
+    """
+    key, index, file_path, language, test, streaming, cpu_limit = job
+
+    # Already compiled by the main process: this only picks up the bytecode / binary
+    result = _worker_sandbox.preflight(file_path, language) or _worker_sandbox.run(
+        file_path=file_path,
+        language=language,
+        input_data=test.get("input", ""),
+        expected=test["output"] if streaming else None
+    )
+    verdict = _worker_comparator.verdict(result, test["output"])
+    if verdict == "ok" and cpu_limit is not None and result.cpu_time > cpu_limit:
+        verdict = "timeout"
+
+    # Timeouts depend on the load, internal errors on the sandbox: never cached
+    return key, index, verdict, verdict not in ("timeout", "internal_error"), result.cpu_time
+
+
+def _run_each(sandbox, streaming):
+    """
+    Same execution as _grade_case (one run per test), for the calibration.
+    """
+    def execute(file_path, language, tests):
+        return [
+            sandbox.run(file_path=file_path, language=language,
+                        input_data=test.get("input", ""),
+                        expected=test["output"] if streaming else None)
+            for test in tests
+        ]
+    return execute
+
+
+# ---------------------------------------------------------
+# BATCH GRADER (headless, whole cohort)
+# ---------------------------------------------------------
+
+class BatchGrader:
+
+    def __init__(self, submissions_dir="results", workers=None, timeout=2,
+                 backend="subprocess", use_cache=True, config_dir="config",
+                 exercises_dir="exercises"):
+        self.submissions_dir = os.path.abspath(submissions_dir)
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.backend = backend
+        self.exercises_dir = exercises_dir
+        self.catalog = get_catalog(exercises_dir)
+
+        self.config = self._load_json(os.path.join(config_dir, "eval_config.json"))
+        self.exercises_data = self._load_json(os.path.join(config_dir, "exercises.json"))
+        configure_logger(self.config)
+
+        # Per-student exercises when the exam uses pre-generated variants
+        self.variants = None
+        if self.config.get("exam_variants"):
+            try:
+                self.variants = VariantFile(self.config["exam_variants"])
+            except VariantError as e:
+                log(f"[VARIANTS ERROR] {e} -> same exercises for everyone")
+
+        self.verdict_cache = None
+        if use_cache and self.config.get("verdict_cache", False):
+            self.verdict_cache = VerdictCache(
+                max_entries=self.config.get("verdict_cache_max_entries", 5000)
+            )
+
+        if not os.path.isdir(self.submissions_dir):
+            raise FileNotFoundError(f"Submissions directory not found: {self.submissions_dir}")
+
+    # ---------------------------------------------------------
+    # Load JSON helper
+    # ---------------------------------------------------------
+    def _load_json(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Missing file: {path}")
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    # ---------------------------------------------------------
+    # DISCOVERY
+    # ---------------------------------------------------------
+
+    def list_students(self):
+        return sorted(
+            d for d in os.listdir(self.submissions_dir)
+            if os.path.isdir(os.path.join(self.submissions_dir, d))
+        )
+
+    def selected_exercises(self):
+        """
+        Same selection as EvaluationEngine.run_exercises.
+        Exercises without a folder are skipped (logged).
+        """
+        selected = []
+        for exo in self.exercises_data["exercises"][: self.config["exercise_count"]]:
+            if exo["name"] not in self.catalog:
+                log(f"[BATCH] Exercise folder missing, skipped: {exo['name']}")
+                continue
+            selected.append(exo)
+        return selected
+
+    def student_exercises(self, student, default):
+        """
+        Exercises of the student's variant (same as the interactive session),
+        or `default` without variants.
+        """
+        if self.variants is None:
+            return default
+        try:
+            exercises = resolve_exercises(self.variants.for_student(student), self.exercises_data,
+                                          self.catalog)
+        except VariantError as e:
+            log(f"[VARIANTS ERROR] {student}: {e}")
+            return default
+        return [exo for exo in exercises if exo["name"] in self.catalog]
+
+    def _find_submission(self, student, exo_name):
+        """
+        First file of results/<student>/ listed in expected_files.json.
+        """
+        expected = self.catalog.expected_filenames(exo_name)
+        student_dir = os.path.join(self.submissions_dir, student)
+
+        for fname in expected:
+            path = os.path.join(student_dir, fname)
+            if os.path.isfile(path):
+                return path
+
+        return None
+
+    # ---------------------------------------------------------
+    # GRADE EVERYTHING
+    # ---------------------------------------------------------
+
+    def run(self):
+        start = time.time()
+        students = self.list_students()
+        default = self.selected_exercises()
+        by_student = {student: self.student_exercises(student, default) for student in students}
+        exercises = default
+        if self.variants is not None:
+            # Every exercise at least one student has, in bank order
+            names = {exo["name"] for exos in by_student.values() for exo in exos}
+            exercises = [exo for exo in self.exercises_data["exercises"] if exo["name"] in names]
+
+        # Test suites: (exercise, variation) -> tests (a variation has its own tests)
+        tests = {}
+        for exos in by_student.values():
+            for exo in exos:
+                suite = (exo["name"], exo.get("variation"))
+                if suite not in tests:
+                    tests[suite] = self.catalog.tests(*suite)
+
+        # Identical submissions (same bytes, same tests) are graded once
+        sandbox = SandboxRunner(timeout=self.timeout, limits=self.config.get("sandbox_limits"),
+                                compilers=self.config.get("compilers"))
+        comparator = Comparator(self.exercises_dir)
+        streaming = self.config.get("streaming_compare", False)
+        performance = self._performance(tests, comparator, streaming)
+        submissions = {}
+        paths = {}
+        graded = {}
+        for student in students:
+            for exo in by_student[student]:
+                exo_name = exo["name"]
+                file_path = self._find_submission(student, exo_name)
+                if file_path is None:
+                    continue
+                variation = exo.get("variation")
+                cache_key = verdict_key(
+                    suite_name(exo_name, variation), file_path,
+                    self.catalog.tests_hash(exo_name, variation),
+                    exo["language"], sandbox.limits(exo["language"])
+                )
+                submissions[(student, exo_name)] = cache_key[0]
+                paths[(student, exo_name)] = file_path
+                if cache_key[0] in graded:
+                    continue
+                graded[cache_key[0]] = {"cache_key": cache_key, "file_path": file_path,
+                                        "exo": exo, "verdicts": None}
+
+        # Verdict cache first, then the pre-flight compile (in this process,
+        # once per submission), then one job per (submission, test).
+        # CPU times depend on the machine load: performance-graded exercises are never cached
+        jobs = []
+        uncacheable = set()
+        for key, entry in graded.items():
+            suite = (entry["exo"]["name"], entry["exo"].get("variation"))
+            exo_performance = performance.get(suite)
+            if self.verdict_cache is not None and exo_performance is None:
+                entry["verdicts"] = self.verdict_cache.lookup(entry["cache_key"])
+            if entry["verdicts"] is None:
+                failed = sandbox.preflight(entry["file_path"], entry["exo"]["language"])
+                if failed is not None:
+                    entry["verdicts"] = [comparator.verdict(failed, None)]
+                    if self.verdict_cache is not None and failed.compile_error is not None \
+                            and exo_performance is None:
+                        self.verdict_cache.store(entry["cache_key"], entry["verdicts"])
+            if entry["verdicts"] is None:
+                exo = entry["exo"]
+                if exo_performance is not None:
+                    uncacheable.add(key)
+                for index, test in enumerate(tests[suite]):
+                    cpu_limit = exo_performance["limits"][index] if exo_performance else None
+                    jobs.append((key, index, entry["file_path"], exo["language"], test,
+                                 streaming, cpu_limit))
+
+        log(f"[BATCH] Grading {len(students)} students, {len(graded)} distinct submissions, "
+            f"{len(jobs)} test runs, {self.workers} workers")
+
+        case_verdicts = {}
+        case_cpu = {}
+        if jobs:
+            with ProcessPoolExecutor(max_workers=self.workers,
+                                     initializer=_init_worker,
+                                     initargs=(self.timeout, self.backend,
+                                               self.config.get("sandbox_limits"),
+                                               self.config.get("compilers"),
+                                               self.exercises_dir)) as pool:
+                # Like a session, a submission stops at its first failing test:
+                # its later tests that have not started yet are cancelled
+                pending = {}
+                for job in jobs:
+                    pending.setdefault(job[0], []).append((job[1], pool.submit(_grade_case, job)))
+                futures = [future for runs in pending.values() for _, future in runs]
+
+                for future in as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    key, index, verdict, cacheable, cpu_time = future.result()
+                    if verdict != "ok":
+                        for later, other in pending[key]:
+                            if later > index:
+                                other.cancel()
+                    if verdict == "internal_error":
+                        log(f"[BATCH] Sandbox failure on {graded[key]['file_path']} "
+                            f"(test {index}): rerun the batch to grade it")
+                    case_verdicts.setdefault(key, {})[index] = verdict
+                    case_cpu.setdefault(key, {})[index] = cpu_time
+                    if not cacheable:
+                        uncacheable.add(key)
+
+        for key, entry in graded.items():
+            if entry["verdicts"] is not None:
+                continue
+            suite = (entry["exo"]["name"], entry["exo"].get("variation"))
+            entry["verdicts"] = self._ordered_verdicts(
+                case_verdicts.get(key, {}), len(tests[suite])
+            )
+            if self.verdict_cache is not None and key not in uncacheable:
+                self.verdict_cache.store(entry["cache_key"], entry["verdicts"])
+
+            # Efficiency of a performance-graded submission that passed every test
+            if suite in performance and entry["verdicts"] == ["ok"] * len(tests[suite]):
+                cpu = case_cpu.get(key, {})
+                entry["efficiency"] = efficiency(
+                    [cpu[index] for index in range(len(tests[suite]))],
+                    performance[suite]["calibration"]
+                )
+
+        verdicts = {
+            pair: graded[key]["verdicts"] for pair, key in submissions.items()
+        }
+        efficiencies = {
+            pair: graded[key].get("efficiency") for pair, key in submissions.items()
+        }
+
+        cohort = []
+        saved = []
+        for student in students:
+            results = self._build_results(student, by_student[student], tests, verdicts,
+                                          efficiencies, performance)
+            saved.append((results, self._save_results(student, results)))
+            cohort.append(results)
+
+        # Admin index: the whole cohort in one transaction
+        try:
+            get_results_store().save_many(saved)
+        except Exception as e:
+            log(f"[RESULTS ERROR] Could not index the cohort results: {e}")
+
+        # Similarity index: only the new / modified submissions are fingerprinted
+        if self.config.get("similarity_index", False):
+            from eval_core.similarity import get_similarity_index
+            try:
+                indexed = get_similarity_index().add_many(
+                    (student, exo_name, path) for (student, exo_name), path in paths.items()
+                )
+                log(f"[SIMILARITY] {indexed} new or modified submissions indexed")
+            except Exception as e:
+                log(f"[SIMILARITY ERROR] Could not index the cohort submissions: {e}")
+
+        summary = self._build_summary(cohort, exercises, time.time() - start)
+        self._save_summary(summary)
+
+        log(f"[BATCH] Done in {summary['elapsed_seconds']}s")
+        return summary
+
+    def _performance(self, suites, comparator, streaming):
+        """
+        {(exercise, variation): PerformanceLimits.for_exercise()} for the
+        performance-graded suites, calibrated with the workers' backend (one run per test).
+        """
+        graded = [suite for suite in suites
+                  if performance_spec(self.catalog.meta(suite[0])) is not None]
+        if not graded:
+            return {}
+
+        sandbox = SandboxRunner(timeout=self.timeout, backend=self.backend, pool_size=1,
+                                limits=self.config.get("sandbox_limits"),
+                                compilers=self.config.get("compilers"))
+        limiter = PerformanceLimits(self.catalog, comparator, _run_each(sandbox, streaming),
+                                    mode=f"{sandbox.backend}:single")
+        return {suite: limiter.for_exercise(*suite) for suite in graded}
+
+    # ---------------------------------------------------------
+    # PUBLISH (the whole cohort in one commit + one push)
+    # ---------------------------------------------------------
+
+    def publish(self, timeout=None):
+        """
+        Returns True once every student is pushed; the rest stays queued.
+        """
+        if not self.config.get("git_repo"):
+            log("[PUBLISH ERROR] No git_repo configured")
+            return False
+
+        git = GitManager(self.config["git_repo"], results_dir=self.submissions_dir)
+        git.clone_if_needed()
+        queue = PublishQueue(git, batch_window=0)
+        for student in self.list_students():
+            queue.enqueue(student)
+        return queue.close(timeout)
+
+    # ---------------------------------------------------------
+    # RESULTS (same schema as EvaluationEngine)
+    # ---------------------------------------------------------
+
+    def _previous_qcm_score(self, student):
+        """
+        The QCM is interactive only: keep the score of a previous session.
+        """
+        path = os.path.join(self.submissions_dir, student, "results.json")
+        if not os.path.exists(path):
+            return 0
+        try:
+            return self._load_json(path).get("qcm_score", 0)
+        except (ValueError, OSError) as e:
+            log(f"[BATCH] Unreadable results.json for {student}: {e}")
+            return 0
+
+    def _ordered_verdicts(self, by_index, count):
+        """
+        {test_index: verdict} -> list in test order, up to the first failure
+        (same shape as EvaluationEngine and the verdict cache).
+        """
+        ordered = []
+        for index in range(count):
+            verdict = by_index.get(index, "runtime")
+            ordered.append(verdict)
+            if verdict != "ok":
+                break
+        return ordered
+
+    def _build_results(self, student, exercises, tests, verdicts, efficiencies, performance):
+        qcm_score = self._previous_qcm_score(student)
+        results = {
+            "student": student,
+            "qcm_score": qcm_score,
+            "exercises": [],
+            "total_score": 0,
+            "passed": False
+        }
+        if self.variants is not None:
+            results["variant"] = self.variants.number_for(student)
+
+        exo_points = 0
+        for exo in exercises:
+            exo_name = exo["name"]
+            suite = (exo_name, exo.get("variation"))
+            exo_verdicts = verdicts.get((student, exo_name))
+            success = (
+                exo_verdicts is not None
+                and len(exo_verdicts) == len(tests[suite])
+                and all(v == "ok" for v in exo_verdicts)
+            )
+            if not success:
+                # Same as a session: only the passed exercises are written
+                continue
+            ratio = efficiencies.get((student, exo_name))
+            spec = performance[suite]["spec"] if suite in performance else None
+            points = performance_points(exo["points"], ratio, spec)
+            exo_points += points
+            entry = {
+                "exercise": exo_name,
+                "success": True,
+                "points": points
+            }
+            if exo.get("variation"):
+                entry["variation"] = exo["variation"]
+            if ratio is not None:
+                entry["efficiency"] = ratio
+            results["exercises"].append(entry)
+
+        results["total_score"] = qcm_score + exo_points
+        results["passed"] = (results["total_score"] >= self.config["passing_score"])
+        return results
+
+    def _save_results(self, student, results):
+        path = os.path.join(self.submissions_dir, student, "results.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+        return path
+
+    # ---------------------------------------------------------
+    # COHORT SUMMARY
+    # ---------------------------------------------------------
+
+    def _build_summary(self, cohort, exercises, elapsed):
+        per_exercise = {exo["name"]: 0 for exo in exercises}
+        for results in cohort:
+            for exo in results["exercises"]:
+                if exo["success"]:
+                    per_exercise[exo["exercise"]] += 1
+
+        scores = [r["total_score"] for r in cohort]
+
+        return {
+            "students": len(cohort),
+            "passed": sum(1 for r in cohort if r["passed"]),
+            "average_score": round(sum(scores) / len(scores), 2) if scores else 0,
+            "exercise_success": per_exercise,
+            "scores": {r["student"]: r["total_score"] for r in cohort},
+            "workers": self.workers,
+            "elapsed_seconds": round(elapsed, 2)
+        }
+
+    def _save_summary(self, summary):
+        path = os.path.join(self.submissions_dir, SUMMARY_FILE)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4)
+        log(f"[BATCH] Cohort summary saved at {path}")
@@ -0,0 +1,383 @@
+import os
+import json
+import time
+import hashlib
+import statistics
+import threading
+from eval_core.utils import log
+from eval_core.case_generator import generation_spec
+
+CALIBRATION_DIR = os.path.join(".cache", "calibration")
+# Bumped when the calibration file changes meaning: older files are recalibrated
+CALIBRATION_VERSION = 2
+# Reference CPU time (startup excluded) under which efficiency ratios are noise
+MIN_WORK_SECONDS = 0.05
+
+# "performance" of meta.json, with its defaults
+DEFAULT_SPEC = {
+    "reference": "reference.py",
+    "language": "python",   # language of the reference solution
+    "runs": 5,              # reference runs, the median CPU time of each test is kept
+    "multiplier": 3.0,      # calibrated limit = startup + multiplier x reference work
+    "min_seconds": 0.1,     # floor of the work part of a limit (timer / load noise)
+    "cpu_seconds": None,    # fixed limit for every test instead of a calibration
+    "bonus_ratio": None,    # efficiency <= bonus_ratio -> + bonus_points
+    "bonus_points": 0,
+    "slow_ratio": None,     # efficiency > slow_ratio -> - slow_penalty
+    "slow_penalty": 0,
+}
+
+
+class CalibrationError(Exception):
+    """
+    The reference solution failed or gave a wrong output: no calibrated limit.
+    """
+
+
+def performance_spec(meta):
+    """
+    meta.json "performance" merged with the defaults, or None.
+    """
+    spec = meta.get("performance")
+    if not spec:
+        return None
+    return dict(DEFAULT_SPEC, **spec)
+
+
+def calibration_key(exo_dir, spec, tests_hash, mode):
+    """
+    sha256 of reference source + tests + calibration settings + execution mode:
+    CPU times are only comparable when measured the same way.
+    """
+    with open(os.path.join(exo_dir, spec["reference"]), "rb") as f:
+        reference = hashlib.sha256(f.read()).hexdigest()
+    payload = json.dumps({
+        "version": CALIBRATION_VERSION,
+        "reference": reference,
+        "language": spec["language"],
+        "tests": tests_hash,
+        "runs": spec["runs"],
+        "multiplier": spec["multiplier"],
+        "min_seconds": spec["min_seconds"],
+        "mode": mode,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------
+# CALIBRATION (reference solution, several runs)
+# ---------------------------------------------------------
+
+# Program that does nothing: its CPU time is the startup cost of a run
+STARTUP_PROGRAMS = {
+    "python": ("startup.py", "pass\n"),
+    "c": ("startup.c", "int main(void) { return 0; }\n"),
+    "cpp": ("startup.cpp", "int main() { return 0; }\n"),
+}
+
+
+def _calibration_path(name, key, root):
+    return os.path.join(root, name, f"{key[:16]}.json")
+
+
+def startup_baseline(language, runs, execute, root=CALIBRATION_DIR):
+    """
+    Median CPU time of an empty program run by the same execution path:
+    interpreter (or process) startup, which says nothing about the solution.
+    """
+    if language not in STARTUP_PROGRAMS:
+        return 0.0
+    filename, source = STARTUP_PROGRAMS[language]
+    path = os.path.abspath(os.path.join(root, filename))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+
+    samples = []
+    for _ in range(max(1, runs)):
+        for result in execute(path, language, [{"input": "", "output": ""}]):
+            if result.exit_code == 0:
+                samples.append(result.cpu_time)
+    return round(statistics.median(samples), 4) if samples else 0.0
+
+
+def calibrate(name, exo_dir, spec, tests, execute, comparator, key, mode,
+              root=CALIBRATION_DIR):
+    """
+    Runs the reference spec["runs"] times on every test and writes
+    <root>/<name>/<key>.json: startup baseline, per-test median CPU time and
+    time limit (one file per execution mode, e.g. the sessions and the batch grader).
+    execute(file_path, language, tests) -> SandboxResults in test order.
+    Raises CalibrationError.
+    """
+    start = time.perf_counter()
+    reference = os.path.join(exo_dir, spec["reference"])
+    language = spec["language"]
+    samples = [[] for _ in tests]
+
+    for _ in range(max(1, spec["runs"])):
+        results = list(execute(reference, language, tests))
+        if len(results) != len(tests):
+            raise CalibrationError(f"{name}: reference stopped after {len(results)} tests")
+        for index, (test, result) in enumerate(zip(tests, results)):
+            verdict = comparator.verdict(result, test["output"])
+            if verdict != "ok":
+                raise CalibrationError(f"{name}: reference got {verdict} on test {index}")
+            samples[index].append(result.cpu_time)
+
+    reference_cpu = [round(statistics.median(cpu), 4) for cpu in samples]
+    baseline = min(startup_baseline(language, spec["runs"], execute, root),
+                   min(reference_cpu, default=0.0))
+    calibration = {
+        "exercise": name,
+        "key": key,
+        "mode": mode,
+        "language": language,
+        "runs": spec["runs"],
+        "multiplier": spec["multiplier"],
+        "baseline_cpu": baseline,
+        "reference_cpu": reference_cpu,
+        # Startup is paid once per run whatever the solution: only the work is multiplied
+        "limits": [round(baseline + max(spec["min_seconds"], (cpu - baseline) * spec["multiplier"]), 4)
+                   for cpu in reference_cpu],
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    path = _calibration_path(name, key, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(calibration, f, indent=4)
+    os.replace(path + ".tmp", path)
+
+    work = sum(reference_cpu) - baseline * len(reference_cpu)
+    log(f"[CALIBRATION] {name}: reference {work:.3f}s CPU over {len(tests)} tests "
+        f"(+{baseline:.3f}s startup per run), x{spec['multiplier']} ({spec['runs']} runs, "
+        f"{(time.perf_counter() - start) * 1000:.0f} ms)")
+    if work < MIN_WORK_SECONDS:
+        log(f"[CALIBRATION] {name}: reference work under {MIN_WORK_SECONDS}s, "
+            f"too small to rank efficiency (use bigger tests)")
+    return calibration
+
+
+def load_calibration(name, key, root=CALIBRATION_DIR):
+    """
+    Stored calibration of an exercise, or None if missing / outdated.
+    """
+    try:
+        with open(_calibration_path(name, key, root), "r", encoding="utf-8") as f:
+            calibration = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return calibration if calibration.get("key") == key else None
+
+
+# ---------------------------------------------------------
+# LIMITS, EFFICIENCY, POINTS
+# ---------------------------------------------------------
+
+def time_limits(tests, spec, calibration):
+    """
+    CPU limit of every test in seconds (None: only the sandbox timeout).
+    test.json "cpu_seconds" > exercise "cpu_seconds" > calibrated limit.
+    """
+    limits = []
+    for index, test in enumerate(tests):
+        if test.get("cpu_seconds") is not None:
+            limits.append(test["cpu_seconds"])
+        elif spec["cpu_seconds"] is not None:
+            limits.append(spec["cpu_seconds"])
+        elif calibration is not None:
+            limits.append(calibration["limits"][index])
+        else:
+            limits.append(None)
+    return limits
+
+
+def efficiency(cpu_times, calibration):
+    """
+    Student CPU time / reference CPU time over all the tests, startup excluded
+    (1.0 = as fast as the reference, 2.0 = twice as slow), or None when the
+    reference does too little work for the ratio to mean anything.
+    """
+    if calibration is None or len(cpu_times) != len(calibration["reference_cpu"]):
+        return None
+    if sum(cpu_times) <= 0:
+        return None  # no CPU accounting (non-POSIX fallback)
+    startup = calibration["baseline_cpu"] * len(cpu_times)
+    work = sum(calibration["reference_cpu"]) - startup
+    if work < MIN_WORK_SECONDS:
+        return None
+    return round(max(0.0, sum(cpu_times) - startup) / work, 2)
+
+
+def performance_points(points, ratio, spec):
+    """
+    Points of a passed exercise adjusted by its efficiency:
+    bonus at or under "bonus_ratio", penalty over "slow_ratio" (never below 0).
+    """
+    if spec is None or ratio is None:
+        return points
+    if spec["bonus_ratio"] is not None and ratio <= spec["bonus_ratio"]:
+        return points + spec["bonus_points"]
+    if spec["slow_ratio"] is not None and ratio > spec["slow_ratio"]:
+        return max(0, points - spec["slow_penalty"])
+    return points
+
+
+class PerformanceLimits:
+    """
+    Time limits of the exercises that have a "performance" entry in meta.json.
+    Calibrated with the same execution path as the grading, then read back
+    from .cache/calibration/ (until the reference or the tests change).
+    Shared by SubmissionGrader and BatchGrader.
+    A performance exercise is never graded without its calibration:
+    warm_up() starts the missing ones in background threads (sessions,
+    grading service), generated cases first, and for_exercise() waits for
+    them, or calibrates right away if nothing was started.
+    """
+
+    def __init__(self, catalog, comparator, execute, mode, root=CALIBRATION_DIR):
+        self.catalog = catalog
+        self.comparator = comparator
+        self.execute = execute
+        self.mode = mode
+        self.root = root
+        self._lock = threading.Lock()
+        # One calibration at a time: parallel runs would skew each other's CPU times
+        self._calibrate_lock = threading.Lock()
+        # calibration key -> calibration (None: the reference failed)
+        self._calibrations = {}
+        # key being calibrated in the background -> Event set when it is done
+        self._running = {}
+
+    def warm_up(self, exercises, wait=False):
+        """
+        Starts the missing calibrations of these (exercise, variation) pairs
+        in the background, after their generated cases (meta.json
+        "generated_tests"); wait=True returns once they are all done.
+        """
+        threads = []
+        for name, variation in exercises:
+            try:
+                thread = self._start(name, variation)
+            except (OSError, ValueError) as e:
+                log(f"[CALIBRATION ERROR] {name}: {e}")
+                continue
+            if thread is not None:
+                threads.append(thread)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def for_exercise(self, name, variation=None):
+        """
+        None if the exercise is not performance-graded,
+        else {"spec", "limits" (per test), "calibration" (or None)}.
+        A variation is calibrated on its own tests.
+        """
+        spec = performance_spec(self.catalog.meta(name))
+        if spec is None:
+            return None
+
+        tests = self.catalog.tests(name, variation)
+        calibration = None
+        if spec["cpu_seconds"] is None:
+            calibration = self._calibration(name, spec, tests,
+                                            self.catalog.tests_hash(name, variation))
+        return {"spec": spec, "limits": time_limits(tests, spec, calibration),
+                "calibration": calibration}
+
+    def _cached(self, name, key):
+        """
+        (found, calibration) from memory or .cache/calibration/ (under self._lock).
+        """
+        if key in self._calibrations:
+            return True, self._calibrations[key]
+        calibration = load_calibration(name, key, self.root)
+        if calibration is not None:
+            self._calibrations[key] = calibration
+            return True, calibration
+        return False, None
+
+    def _start(self, name, variation):
+        """
+        Thread that builds the generated cases then the calibration of an
+        exercise, off the caller's thread. None if it has neither.
+        """
+        meta = self.catalog.meta(name)
+        spec = performance_spec(meta)
+        if spec is not None and spec["cpu_seconds"] is not None:
+            spec = None
+        # A variation is graded on its own tests only, never generated ones
+        if spec is None and (variation is not None or generation_spec(meta) is None):
+            return None
+
+        thread = threading.Thread(
+            target=self._warm, args=(name, variation, spec),
+            name=f"calibrate-{name}", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _warm(self, name, variation, spec):
+        try:
+            tests = self.catalog.tests(name, variation)
+            if spec is None:
+                return
+            exo_dir = self.catalog.exercise_dir(name)
+            key = calibration_key(exo_dir, spec, self.catalog.tests_hash(name, variation),
+                                  self.mode)
+        except (OSError, ValueError) as e:
+            log(f"[CALIBRATION ERROR] {name}: {e}")
+            return
+
+        with self._lock:
+            if key in self._running or self._cached(name, key)[0]:
+                return
+            self._running[key] = threading.Event()
+        self._calibrate(name, exo_dir, spec, tests, key)
+
+    def _calibration(self, name, spec, tests, tests_hash):
+        exo_dir = self.catalog.exercise_dir(name)
+        try:
+            key = calibration_key(exo_dir, spec, tests_hash, self.mode)
+        except OSError as e:
+            log(f"[CALIBRATION ERROR] {name}: {e}")
+            return None
+
+        with self._lock:
+            found, calibration = self._cached(name, key)
+            if found:
+                return calibration
+            done = self._running.get(key)
+
+        if done is not None:
+            log(f"[CALIBRATION] {name} not calibrated yet: waiting for it")
+            done.wait()
+            with self._lock:
+                return self._calibrations.get(key)
+
+        return self._calibrate(name, exo_dir, spec, tests, key)
+
+    def _calibrate(self, name, exo_dir, spec, tests, key):
+        calibration = None
+        try:
+            with self._calibrate_lock:
+                with self._lock:
+                    if key in self._calibrations:
+                        return self._calibrations[key]
+                log(f"[CALIBRATION] Calibrating {name} ({spec['runs']} reference runs)...")
+                try:
+                    calibration = calibrate(name, exo_dir, spec, tests, self.execute,
+                                            self.comparator, key, self.mode, self.root)
+                except (CalibrationError, OSError) as e:
+                    log(f"[CALIBRATION ERROR] {e}")
+                return calibration
+        finally:
+            # Also on an unexpected error: nobody waits forever on this key
+            with self._lock:
+                self._calibrations.setdefault(key, calibration)
+                done = self._running.pop(key, None)
+            if done is not None:
+                done.set()
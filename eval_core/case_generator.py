@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+from eval_core.utils import log
+from eval_core.case_files import list_case_files
+
+GENERATED_DIR = os.path.join(".cache", "generated")
+GENERATOR_TIMEOUT = 120
+
+# "generated_tests" of meta.json, with its defaults
+DEFAULT_SPEC = {
+    "generator": "generator.py",
+    "reference": "reference.py",
+    "seed": 0,
+    "count": 20,        # every case is one more sandbox run per submission
+    "timeout": 5,
+}
+
+# Runs generator.py once for all the cases: generate(rng, index) -> input string.
+# Case i only depends on (seed, i): raising "count" keeps the first cases.
+DRIVER = """
+import os, sys, random, runpy
+path, seed, count, out = sys.argv[1], sys.argv[2], int(sys.argv[3]), sys.argv[4]
+generate = runpy.run_path(path)["generate"]
+width = max(2, len(str(count - 1)))
+for index in range(count):
+    data = generate(random.Random(f"{seed}:{index}"), index)
+    with open(os.path.join(out, f"{index:0{width}d}.in"), "w", encoding="utf-8", newline="") as f:
+        f.write(data)
+"""
+
+
+class GenerationError(Exception):
+    """
+    The generator or the reference solution failed: no case is produced.
+    """
+
+
+def generation_spec(meta):
+    """
+    meta.json "generated_tests" merged with the defaults, or None.
+    """
+    spec = meta.get("generated_tests")
+    if not spec:
+        return None
+    return dict(DEFAULT_SPEC, **spec)
+
+
+def generation_key(exo_dir, spec):
+    """
+    sha256 of generator source + reference source + seed + count:
+    the cached cases are reused as long as none of them changed.
+    """
+    digest = hashlib.sha256()
+    for kind in ("generator", "reference"):
+        with open(os.path.join(exo_dir, spec[kind]), "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    digest.update(f"{spec['seed']}:{spec['count']}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def cases_dir(name, key, root=GENERATED_DIR):
+    return os.path.join(os.path.abspath(root), name, key[:16])
+
+
+def is_complete(directory):
+    return os.path.exists(os.path.join(directory, "generation.json"))
+
+
+# ---------------------------------------------------------
+# GENERATION (generator once, reference once, in bulk)
+# ---------------------------------------------------------
+
+def generate_cases(name, exo_dir, spec, root=GENERATED_DIR, sandbox=None):
+    """
+    Builds <root>/<name>/<key>/NN.in + NN.out, unless already cached.
+    Returns the folder. Raises GenerationError.
+    """
+    key = generation_key(exo_dir, spec)
+    target = cases_dir(name, key, root)
+    if is_complete(target):
+        return target
+
+    start = time.perf_counter()
+    tmp = f"{target}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    try:
+        # 1. Inputs: one generator process for every case
+        try:
+            out = subprocess.run(
+                ["python3", "-c", DRIVER, os.path.join(exo_dir, spec["generator"]),
+                 str(spec["seed"]), str(spec["count"]), tmp],
+                capture_output=True, text=True, shell=False, timeout=GENERATOR_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            raise GenerationError(f"{name}: generator timed out")
+        if out.returncode != 0:
+            raise GenerationError(f"{name}: generator failed: {out.stderr.strip()}")
+
+        cases = sorted(os.path.join(tmp, f) for f in os.listdir(tmp) if f.endswith(".in"))
+        if len(cases) != spec["count"]:
+            raise GenerationError(f"{name}: generator wrote {len(cases)}/{spec['count']} inputs")
+
+        # 2. Expected outputs: the reference runs all the inputs in one sandbox launch
+        if sandbox is None:
+            from eval_core.sandbox_runner import SandboxRunner  # generation only
+            sandbox = SandboxRunner(timeout=spec["timeout"])
+        results = sandbox.run_many(
+            os.path.join(exo_dir, spec["reference"]), "python",
+            [{"file": path} for path in cases]
+        )
+
+        for path, result in zip(cases, results):
+            if result.exit_code != 0 or result.stderr.strip() != "" or result.limit_exceeded:
+                raise GenerationError(
+                    f"{name}: reference failed on {os.path.basename(path)}: "
+                    f"{result.stderr.strip() or result.limit_exceeded or f'exit code {result.exit_code}'}"
+                )
+            with open(path[:-len(".in")] + ".out", "w", encoding="utf-8", newline="") as f:
+                f.write(result.stdout)
+        if len(results) != len(cases):
+            raise GenerationError(f"{name}: reference stopped after {len(results)} cases")
+
+        with open(os.path.join(tmp, "generation.json"), "w", encoding="utf-8") as f:
+            json.dump({"exercise": name, "key": key, "seed": spec["seed"],
+                       "count": spec["count"], "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                      f, indent=4)
+
+        try:
+            os.replace(tmp, target)
+        except OSError:
+            # Generated at the same time by another process: keep theirs
+            if not is_complete(target):
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    # Older generations of this exercise are useless now
+    parent = os.path.dirname(target)
+    for old in os.listdir(parent):
+        if os.path.join(parent, old) != target and ".tmp" not in old:
+            shutil.rmtree(os.path.join(parent, old), ignore_errors=True)
+
+    log(f"[GENERATOR] {spec['count']} cases for {name} in "
+        f"{(time.perf_counter() - start) * 1000:.0f} ms (seed {spec['seed']})")
+    return target
+
+
+def generated_cases(directory):
+    """
+    Cached cases in the same shape as the tests/ cases of the catalog.
+    """
+    return [
+        {"name": f"gen-{case_name}",
+         "input": {"file": input_path} if input_path is not None else "",
+         "output": {"file": output_path}}
+        for case_name, input_path, output_path in list_case_files(directory)
+    ]
@@ -0,0 +1,364 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from eval_core.utils import log
+from eval_core.case_files import CASES_DIR, list_case_files
+from eval_core.case_generator import (
+    GenerationError, generation_spec, generation_key, cases_dir, is_complete,
+    generate_cases, generated_cases
+)
+
+EXERCISES_DIR = "exercises"
+# exercises/<name>/variations/<variation>.json: tests of a meta.json variation
+VARIATIONS_DIR = "variations"
+
+
+class ExerciseCatalog:
+    """
+    In-memory index of every exercises/<name>/ folder.
+    - everything is parsed once, lookups are served from memory
+    - a file is re-read only when its mtime/size changed on disk
+    - one validated access path (name regex + folder containment)
+    - file-backed cases (tests/NN.in + NN.out) are listed, never read:
+      only their paths go into the test list
+    - generated cases (meta.json "generated_tests") come from the
+      .cache/generated/ folder, built once per generator/seed/reference
+    - a meta.json variation with a variations/<variation>.json file is
+      graded on those tests instead (same format as test.json)
+    """
+
+    SAFE_NAME_REGEX = r"^[a-zA-Z0-9_\-]+$"
+
+    FILES = {
+        "tests": "test.json",
+        "meta": "meta.json",
+        "expected_files": "expected_files.json",
+        "description": "description.md",
+    }
+
+    def __init__(self, root=EXERCISES_DIR, check_interval=1.0):
+        """
+        check_interval: seconds between two stat() checks of the same file.
+        """
+        self.root = os.path.abspath(root)
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        # (name, kind) -> {"stamp", "checked", "value", "hash"}
+        self._files = {}
+        # name -> lock held while its cases are generated (outside self._lock,
+        # so lookups of the other exercises are never blocked by a generator)
+        self._generation_locks = {}
+
+        if not os.path.isdir(self.root):
+            raise FileNotFoundError(f"[SECURITY] Exercises directory not found: {self.root}")
+
+        self.refresh()
+
+    # -----------------------------------------
+    # INDEXING
+    # -----------------------------------------
+
+    def refresh(self):
+        """
+        (Re)scan the exercises folder and load every entry.
+        """
+        start = time.perf_counter()
+        names = self.names()
+        for name in names:
+            for kind in self.FILES:
+                if os.path.exists(self._path(name, kind)):
+                    self._get(name, kind)
+
+        log(f"[CATALOG] Indexed {len(names)} exercises in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def names(self):
+        return sorted(
+            d for d in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, d)) and re.match(self.SAFE_NAME_REGEX, d)
+        )
+
+    def __contains__(self, name):
+        return isinstance(name, str) and re.match(self.SAFE_NAME_REGEX, name) is not None \
+            and os.path.isdir(os.path.join(self.root, name))
+
+    # -----------------------------------------
+    # SAFE PATHS
+    # -----------------------------------------
+
+    def exercise_dir(self, name):
+        # SECURITY CHECK 1 — validate name
+        if not isinstance(name, str) or not re.match(self.SAFE_NAME_REGEX, name):
+            raise ValueError(
+                f"[SECURITY] Invalid exercise name '{name}' (potential path traversal)"
+            )
+
+        # SECURITY CHECK 2 — ensure path is INSIDE the exercises root
+        exo_dir = os.path.abspath(os.path.join(self.root, name))
+        if os.path.dirname(exo_dir) != self.root:
+            raise PermissionError("[SECURITY] Attempt to access outside exercises directory")
+
+        return exo_dir
+
+    def _path(self, name, kind):
+        return os.path.join(self.exercise_dir(name), self._filename(kind))
+
+    def _filename(self, kind):
+        """
+        kind: a FILES key, or ("variation", <variation>).
+        """
+        if isinstance(kind, tuple):
+            variation = kind[1]
+            if not isinstance(variation, str) or not re.match(self.SAFE_NAME_REGEX, variation):
+                raise ValueError(
+                    f"[SECURITY] Invalid variation name '{variation}' (potential path traversal)"
+                )
+            return os.path.join(VARIATIONS_DIR, f"{variation}.json")
+        return self.FILES[kind]
+
+    # -----------------------------------------
+    # CACHED FILE ACCESS
+    # -----------------------------------------
+
+    def _get(self, name, kind):
+        path = self._path(name, kind)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._files.get((name, kind))
+            if entry is not None and now - entry["checked"] < self.check_interval:
+                return entry
+
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                self._files.pop((name, kind), None)
+                raise FileNotFoundError(
+                    f"[SECURITY] {self._filename(kind)} not found for exercise '{name}'"
+                )
+
+            stamp = (st.st_mtime_ns, st.st_size)
+            if entry is not None and entry["stamp"] == stamp:
+                entry["checked"] = now
+                return entry
+
+            with open(path, "rb") as f:
+                raw = f.read()
+
+            if kind == "description":
+                value = raw.decode("utf-8")
+            else:
+                value = json.loads(raw.decode("utf-8"))
+
+            if entry is not None:
+                log(f"[CATALOG] Reloaded {self._filename(kind)} of {name}")
+
+            entry = {
+                "stamp": stamp,
+                "checked": now,
+                "value": value,
+                "hash": hashlib.sha256(raw).hexdigest()
+            }
+            self._files[(name, kind)] = entry
+            return entry
+
+    def _case_files(self, name):
+        """
+        tests/ folder of an exercise: {"stamp", "checked", "cases", "hash"}.
+        Re-listed when a file is added, removed or rewritten.
+        """
+        directory = os.path.join(self.exercise_dir(name), CASES_DIR)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._files.get((name, "cases"))
+            if entry is not None and now - entry["checked"] < self.check_interval:
+                return entry
+
+            found = list_case_files(directory)
+            stamp = []
+            for case_name, input_path, output_path in found:
+                for path in (input_path, output_path):
+                    if path is not None:
+                        st = os.stat(path)
+                        stamp.append((path, st.st_mtime_ns, st.st_size))
+            stamp = tuple(stamp)
+
+            if entry is not None and entry["stamp"] == stamp:
+                entry["checked"] = now
+                return entry
+
+            if entry is not None:
+                log(f"[CATALOG] Reloaded {CASES_DIR}/ of {name} ({len(found)} cases)")
+
+            entry = {
+                "stamp": stamp,
+                "checked": now,
+                "cases": [
+                    {"name": case_name,
+                     "input": {"file": input_path} if input_path is not None else "",
+                     "output": {"file": output_path}}
+                    for case_name, input_path, output_path in found
+                ],
+                "hash": None  # computed on first tests_hash()
+            }
+            self._files[(name, "cases")] = entry
+            return entry
+
+    def _case_files_hash(self, entry):
+        """
+        sha256 over the content of every case file (read by blocks).
+        """
+        with self._lock:
+            if entry["hash"] is None:
+                digest = hashlib.sha256()
+                for path, _, _ in entry["stamp"]:
+                    digest.update(os.path.basename(path).encode("utf-8") + b"\0")
+                    with open(path, "rb") as f:
+                        for block in iter(lambda: f.read(1024 * 1024), b""):
+                            digest.update(block)
+                entry["hash"] = digest.hexdigest()
+            return entry["hash"]
+
+    def _generated(self, name):
+        """
+        Generated cases of an exercise: {"stamp", "checked", "cases", "key"}.
+        Generated on first use if not cached yet (a failure is logged, no case).
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._files.get((name, "generated"))
+            if entry is not None and now - entry["checked"] < self.check_interval:
+                return entry
+
+            spec = generation_spec(self.meta(name))
+            stamp = None
+            if spec is not None:
+                exo_dir = self.exercise_dir(name)
+                # The cache folder is relative to the working directory:
+                # after a chdir, the cases of the old one are not reused
+                stamp = [json.dumps(spec, sort_keys=True), cases_dir(name, "")]
+                for kind in ("generator", "reference"):
+                    try:
+                        st = os.stat(os.path.join(exo_dir, spec[kind]))
+                        stamp.append((st.st_mtime_ns, st.st_size))
+                    except FileNotFoundError:
+                        stamp.append(None)
+                stamp = tuple(stamp)
+
+            if entry is not None and entry["stamp"] == stamp:
+                entry["checked"] = now
+                return entry
+            generation_lock = self._generation_locks.setdefault(name, threading.Lock())
+
+        with generation_lock:
+            with self._lock:
+                # Another thread may have generated them while we waited
+                entry = self._files.get((name, "generated"))
+                if entry is not None and entry["stamp"] == stamp:
+                    entry["checked"] = time.monotonic()
+                    return entry
+
+            entry = {"stamp": stamp, "checked": now, "cases": [], "key": None}
+            if spec is not None:
+                try:
+                    key = generation_key(exo_dir, spec)
+                    directory = cases_dir(name, key)
+                    if not is_complete(directory):
+                        log(f"[GENERATOR] Generating {spec['count']} cases for {name}...")
+                        directory = generate_cases(name, exo_dir, spec)
+                    entry.update(cases=generated_cases(directory), key=key)
+                except (GenerationError, OSError) as e:
+                    log(f"[GENERATOR ERROR] {e}")
+
+            with self._lock:
+                self._files[(name, "generated")] = entry
+            return entry
+
+    # -----------------------------------------
+    # PUBLIC LOOKUPS
+    # -----------------------------------------
+
+    def tests(self, name, variation=None):
+        """
+        test.json cases, then the file-backed cases of tests/,
+        then the generated cases (if any).
+        With a variation: the cases of variations/<variation>.json only.
+        """
+        if variation is not None:
+            return self._get(name, ("variation", variation))["value"]["tests"]
+        tests = self._get(name, "tests")["value"]["tests"]
+        cases = self._case_files(name)["cases"] + self._generated(name)["cases"]
+        return tests + cases if cases else tests
+
+    def tests_path(self, name):
+        return self._path(name, "tests")
+
+    def tests_hash(self, name, variation=None):
+        """
+        sha256 of the raw test.json, plus the tests/ files and the
+        generation key if any (used by the verdict cache).
+        With a variation: sha256 of its variations/<variation>.json.
+        """
+        if variation is not None:
+            return self._get(name, ("variation", variation))["hash"]
+        tests_hash = self._get(name, "tests")["hash"]
+        cases = self._case_files(name)
+        generated = self._generated(name)
+        if not cases["cases"] and not generated["cases"]:
+            return tests_hash
+        parts = [tests_hash]
+        if cases["cases"]:
+            parts.append(self._case_files_hash(cases))
+        if generated["cases"]:
+            parts.append(generated["key"])
+        return hashlib.sha256("".join(parts).encode("utf-8")).hexdigest()
+
+    def meta(self, name):
+        try:
+            return self._get(name, "meta")["value"]
+        except FileNotFoundError:
+            return {}
+
+    def variations(self, name):
+        """
+        meta.json variations that have their own tests (variations/<variation>.json).
+        The others cannot be graded differently, so they are never drawn.
+        """
+        return [
+            variation for variation in self.meta(name).get("variations", [])
+            if isinstance(variation, str) and re.match(self.SAFE_NAME_REGEX, variation)
+            and os.path.isfile(self._path(name, ("variation", variation)))
+        ]
+
+    def expected_filenames(self, name):
+        return self._get(name, "expected_files")["value"]["filenames"]
+
+    def description(self, name):
+        """
+        Returns None if the exercise has no description.md.
+        """
+        try:
+            return self._get(name, "description")["value"]
+        except FileNotFoundError:
+            return None
+
+
+# ---------------------------------------------------------
+# SHARED CATALOGS (one per exercises root)
+# ---------------------------------------------------------
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(root=EXERCISES_DIR):
+    root = os.path.abspath(root)
+    with _catalogs_lock:
+        if root not in _catalogs:
+            _catalogs[root] = ExerciseCatalog(root)
+        return _catalogs[root]
@@ -1,11 +1,12 @@
-import json
 import os
-import re
 from eval_core.utils import log
+from eval_core.catalog import get_catalog
+from eval_core.case_files import is_file_ref
+from eval_core.stream_compare import StreamMatcher
 
-class Comparator:
+COMPARE_CHUNK = 65536
 
-    SAFE_NAME_REGEX = r"^[a-zA-Z0-9_\-]+$"
+class Comparator:
 
     def __init__(self, tests_path="exercises"):
         """
@@ -17,47 +18,17 @@ class Comparator:
             raise FileNotFoundError(
                 f"[SECURITY] Tests root directory not found: {self.tests_root}"
             )
+        self.catalog = get_catalog(self.tests_root)
 
     # -----------------------------------------
     # LOAD TESTS
     # -----------------------------------------
 
-    def load_tests(self, exercise_name):
+    def load_tests(self, exercise_name, variation=None):
         """
-        Loads test.json for the given exercise.
+        Loads test.json for the given exercise (validated + cached by the catalog).
         """
-        # SECURITY CHECK 1 — validate name
-        if not re.match(self.SAFE_NAME_REGEX, exercise_name):
-            raise ValueError(
-                f"[SECURITY] Invalid exercise name '{exercise_name}' (potential path traversal)"
-            )
-
-        # SECURITY CHECK 2 — build safe path
-        exo_dir = os.path.join(self.tests_root, exercise_name)
-        exo_dir = os.path.abspath(exo_dir)
-
-        # SECURITY CHECK 3 — ensure path is INSIDE tests_root
-        if not exo_dir.startswith(self.tests_root):
-            raise PermissionError("[SECURITY] Attempt to access outside tests directory")
-
-        # SECURITY CHECK 4 — ensure directory exists
-        if not os.path.isdir(exo_dir):
-            raise FileNotFoundError(
-                f"[SECURITY] Exercise directory missing: {exo_dir}"
-            )
-
-        # SECURITY CHECK 5 — ensure test.json exists
-        path = os.path.join(exo_dir, "test.json")
-
-        if not os.path.exists(path):
-            raise FileNotFoundError(
-                f"[SECURITY] test.json not found for exercise '{exercise_name}'"
-            )
-
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        return data["tests"]
+        return self.catalog.tests(exercise_name, variation)
 
     # -----------------------------------------
     # NORMALIZE OUTPUT
@@ -84,7 +55,58 @@ class Comparator:
     # -----------------------------------------
 
     def compare(self, got, expected):
+        if is_file_ref(expected):
+            # NN.out is read through a memory map, never loaded as a string
+            data = (got or "").encode("utf-8")
+            matcher = StreamMatcher(expected)
+            for i in range(0, len(data), COMPARE_CHUNK):
+                if not matcher.feed(data[i:i + COMPARE_CHUNK]):
+                    return False
+            return matcher.finish()
+
         got_norm = self._normalize(got)
         exp_norm = self._normalize(expected)
         return got_norm == exp_norm
+
+    # -----------------------------------------
+    # VERDICT FOR ONE SANDBOX RESULT
+    # -----------------------------------------
+
+    def verdict(self, result, expected):
+        """
+        Judge one SandboxResult against the expected output.
+        Returns "ok", "compile_error", "timeout" (TLE), "memory" (MLE), "runtime"
+        or "wrong_output" (same keys as the roast bank), or "internal_error"
+        when the sandbox itself failed (not the student's fault).
+        """
+        if getattr(result, "internal_error", False):
+            return "internal_error"
+
+        # Pre-flight: the submission never ran
+        if getattr(result, "compile_error", None) is not None:
+            return "compile_error"
+
+        limit = getattr(result, "limit_exceeded", None)
+        if limit == "time":
+            return "timeout"
+        if limit == "memory":
+            return "memory"
+        if limit == "output":
+            return "wrong_output"
+
+        # Streaming mode: killed as soon as the output diverged
+        if getattr(result, "diverged", False):
+            return "wrong_output"
+
+        if result.exit_code != 0 or result.stderr.strip() != "":
+            return "runtime"
+
+        stream_match = getattr(result, "stream_match", None)
+        if stream_match is not None:
+            return "ok" if stream_match else "wrong_output"
+
+        if not self.compare(result.stdout, expected):
+            return "wrong_output"
+
+        return "ok"
     #TODO:    add strict mode
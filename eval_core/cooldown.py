@@ -1,13 +1,116 @@
+import os
+import json
 import time
 import random
-from eval_core.utils import log
+import threading
+from eval_core.utils import log, file_lock
+from eval_core.tracing import traced
+
+COOLDOWN_FILE = os.path.join("data", "cooldowns.json")
+
+
+class CooldownStore:
+    """
+    Persisted cooldown deadlines, keyed by "student/exercise":
+    {"deadline": epoch seconds, "attempts": failed attempts so far,
+     "updated": epoch seconds of the last failed attempt}
+    Re-read before each change, under a file lock, so several app.py can
+    share the file, and a restart does not reset a pending cooldown.
+    Entries older than max_age (the exam length) are dropped on each change:
+    the next exam starts from zero attempts.
+    """
+
+    def __init__(self, path=COOLDOWN_FILE):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._cond = threading.Condition()
+        self._entries = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log(f"[COOLDOWN ERROR] Could not read {self.path}: {e}")
+            return {}
+
+    def _write(self):
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=4)
+        os.replace(tmp, self.path)
+
+    def get(self, key):
+        with self._cond:
+            return self._entries.get(key)
+
+    def update(self, key, entry, max_age=None):
+        """
+        entry=None removes the key. Wakes up every waiter.
+        max_age: seconds after which the other entries are stale and pruned.
+        """
+        with self._cond:
+            # Read-modify-write of the shared file: another app.py must not interleave
+            with file_lock(self.lock_path):
+                self._entries = self._read()
+                if max_age is not None:
+                    now = time.time()
+                    self._entries = {
+                        k: e for k, e in self._entries.items()
+                        if not is_expired(e, max_age, now)
+                    }
+                if entry is None:
+                    self._entries.pop(key, None)
+                else:
+                    self._entries[key] = entry
+                self._write()
+            self._cond.notify_all()
+
+    def wait_change(self, timeout):
+        with self._cond:
+            self._cond.wait(timeout)
+
+
+def is_expired(entry, max_age, now=None):
+    """
+    True once the cooldown is over and the last failed attempt is older than
+    max_age (entries written before "updated" existed are stale).
+    """
+    now = time.time() if now is None else now
+    return entry["deadline"] <= now and entry.get("updated", 0) + max_age <= now
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_cooldown_store(path=COOLDOWN_FILE):
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = CooldownStore(path)
+        return _stores[path]
+
 
 class CooldownManager:
+    """
+    Cooldowns are deadlines, not sleeps: apply_penalty() only records when the
+    student may submit again, the engine checks remaining() before grading.
+    wait() / wait_async() are there for callers that do want to block.
+    """
 
-    def __init__(self, config):
+    def __init__(self, config, student=None, store=None):
         self.base_penalty = config["penalty_start_seconds"]
         self.increment = config["penalty_increment_seconds"]
         self.mode = config.get("penalty_mode", "linear")  # optional config (linear/exponential)
+        self.student = student
+        self.store = store or get_cooldown_store()
+        # Attempts count for one exam only, not for every later session
+        self.max_age = config.get("duration_minutes", 90) * 60
 
     # ---------------------------------------------------------
     # CALCULATE PENALTY
@@ -29,12 +132,15 @@ class CooldownManager:
         return self.base_penalty
 
     # ---------------------------------------------------------
-    # APPLY COOLDOWN
+    # APPLY COOLDOWN (deadline, returns immediately)
     # ---------------------------------------------------------
 
-    def apply_penalty(self, attempt):
+    def _key(self, exo_name):
+        return f"{self.student}/{exo_name}"
+
+    def apply_penalty(self, attempt, exo_name=None):
         """
-        Waits for the calculated cooldown time.
+        Starts the cooldown of this attempt and returns its length in seconds.
         """
         penalty = self._calculate_penalty(attempt)
 
@@ -42,12 +148,73 @@ class CooldownManager:
 
         print(f"\n⏳ Please wait {penalty} seconds before trying again...\n")
 
-        # SAFETY: small sleep chunks (prevents engine freeze)
-        remaining = penalty
-        while remaining > 0:
-            chunk = min(5, remaining)
-            time.sleep(chunk)
-            remaining -= chunk
+        now = time.time()
+        self.store.update(self._key(exo_name), {
+            "deadline": now + penalty,
+            "attempts": attempt,
+            "updated": now
+        }, max_age=self.max_age)
+        return penalty
+
+    def attempts(self, exo_name=None):
+        """
+        Failed attempts already recorded (survives a restart during the
+        exam, expires after "duration_minutes").
+        """
+        entry = self.store.get(self._key(exo_name))
+        if entry is None or is_expired(entry, self.max_age):
+            return 0
+        return entry["attempts"]
+
+    def remaining(self, exo_name=None):
+        """
+        Seconds left before the next submission (0 = free to submit).
+        """
+        entry = self.store.get(self._key(exo_name))
+        if entry is None:
+            return 0
+        return max(0, entry["deadline"] - time.time())
+
+    def clear(self, exo_name=None):
+        """
+        Exercise passed (or teacher override): no more cooldown / attempts.
+        """
+        self.store.update(self._key(exo_name), None, max_age=self.max_age)
+
+    # ---------------------------------------------------------
+    # WAITING (for callers that want to block)
+    # ---------------------------------------------------------
+
+    @traced("cooldown.wait", "cooldown")
+    def wait(self, exo_name=None, timeout=None):
+        """
+        Blocks until the cooldown is over (woken early by clear()).
+        Returns True if it is over, False on timeout.
+        """
+        limit = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.remaining(exo_name)
+            if remaining <= 0:
+                return True
+            if limit is not None:
+                left = limit - time.monotonic()
+                if left <= 0:
+                    return False
+                remaining = min(remaining, left)
+            self.store.wait_change(remaining)
+
+    async def wait_async(self, exo_name=None):
+        """
+        Awaitable version of wait() for async callers
+        (re-checked every second so clear() is seen quickly).
+        """
+        import asyncio  # only async callers pay for it
+
+        while True:
+            remaining = self.remaining(exo_name)
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, 1.0))
 
     # ---------------------------------------------------------
     # ROAST PICKER
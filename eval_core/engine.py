@@ -1,35 +1,81 @@
 import os
 import json
-from eval_core.utils import safe_print, log
+import time
+from datetime import datetime
+from functools import cached_property
+from eval_core.utils import safe_print, log, logger, configure_logger
 from eval_core.file_loader import StudentFileManager
 from eval_core.sandbox_runner import SandboxRunner
 from eval_core.scoring import ScoringSystem
 from eval_core.comparator import Comparator
 from eval_core.cooldown import CooldownManager
 from eval_core.git_manager import GitManager
+from eval_core.publish_queue import PublishQueue
+from eval_core.catalog import get_catalog
+from eval_core.tracing import tracer, span, traced, configure_tracing
+from eval_core.grader import SubmissionGrader
+from eval_core.variants import VariantFile, VariantError, resolve_questions, resolve_exercises
+from eval_core.calibration import performance_spec, performance_points
 
 
 class EvaluationEngine:
 
     def __init__(self, student_name):
+        started = time.perf_counter()
         self.student = student_name
 
-        # Load config files
+        # Load config file (QCM, roasts and exercises are loaded on first use)
         self.config = self._load_json("config/eval_config.json")
-        self.qcm_data = self._load_json("config/qcm.json")
-        self.roasts = self._load_json("config/roasts.json")
-        self.exercises_data = self._load_json("config/exercises.json")
+
+        configure_logger(self.config)
+        configure_tracing(self.config)
+        tracer.reset()
+        self.session_id = f"{self.student}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        logger.set_session(self.session_id)
 
         # Core systems
-        self.file_manager = StudentFileManager(self.student)
-        self.sandbox = SandboxRunner()
+        self.file_manager = StudentFileManager(
+            self.student,
+            watch=self.config.get("watch_mode", False),
+            debounce=self.config.get("watch_debounce_ms", 300) / 1000
+        )
+        self.sandbox = SandboxRunner(
+            backend=self.config.get("sandbox_backend", "subprocess"),
+            pool_size=self.config.get("warm_pool_size", 2),
+            limits=self.config.get("sandbox_limits"),
+            compilers=self.config.get("compilers")
+        )
         self.scoring = ScoringSystem(self.config)
         self.comparator = Comparator()
-        self.cooldown = CooldownManager(self.config)
-
-        # Git sync
+        self.catalog = get_catalog()
+        self.cooldown = CooldownManager(self.config, self.student)
+        self.verdict_cache = None
+        if self.config.get("verdict_cache", False):
+            from eval_core.verdict_cache import VerdictCache  # sqlite3 only if enabled
+            self.verdict_cache = VerdictCache(
+                max_entries=self.config.get("verdict_cache_max_entries", 5000)
+            )
+        self.grader = SubmissionGrader(self.config, self.sandbox, self.comparator,
+                                       self.catalog, self.verdict_cache)
+        # Lab server daemon (grading_daemon.py): submissions are sent, not run here
+        self.grading_client = None
+        if self.config.get("grading_service"):
+            from eval_core.grading_service import GradingClient
+            self.grading_client = GradingClient(
+                self.config["grading_service"],
+                retry_for=self.config.get("service_retry_seconds", 600)
+            )
+
+        # Git sync: the clone runs in the background, only publishing waits for it
         self.git = GitManager(self.config["git_repo"])
-        self.git.clone_if_needed()
+        # Background publisher (also catches up results left by a previous run)
+        self.publisher = None
+        if self.config["git_repo"]:
+            self.git.clone_in_background()
+            self.publisher = PublishQueue(
+                self.git,
+                batch_window=self.config.get("publish_batch_window", 1.0)
+            ).start()
 
         # Result structure
         self.results = {
@@ -40,8 +86,59 @@ class EvaluationEngine:
             "passed": False
         }
 
+        # Pre-generated exam variant (generate_variants.py): one record read
+        self.variant = None
+        if self.config.get("exam_variants"):
+            try:
+                self.variant = VariantFile(self.config["exam_variants"]).for_student(self.student)
+                self.results["variant"] = self.variant["number"]
+                log(f"[VARIANTS] {self.student} gets variant {self.variant['number']} "
+                    f"(seed {self.variant['seed']})")
+            except VariantError as e:
+                log(f"[VARIANTS ERROR] {e} -> default exam")
+
         log(f"Starting evaluation session for {self.student}")
+        self.startup_ms = round((time.perf_counter() - started) * 1000, 1)
+        log(f"[STARTUP] Session ready in {self.startup_ms} ms")
+
+
+    # ---------------------------------------------------------
+    # Config data loaded on first use
+    # ---------------------------------------------------------
+    @cached_property
+    def qcm_data(self):
+        return self._load_json("config/qcm.json")
+
+    @cached_property
+    def roasts(self):
+        return self._load_json("config/roasts.json")
 
+    @cached_property
+    def exercises_data(self):
+        return self._load_json("config/exercises.json")
+
+    # ---------------------------------------------------------
+    # Exam content (variant, or the first N of each bank)
+    # ---------------------------------------------------------
+    def _exam_questions(self):
+        """
+        [(question, choices to show, answer letter)]
+        """
+        if self.variant is not None:
+            try:
+                return resolve_questions(self.variant, self.qcm_data)
+            except VariantError as e:
+                log(f"[VARIANTS ERROR] {e} -> default questions")
+        return [(q, q["choices"], q["answer"])
+                for q in self.qcm_data["questions"][: self.config["qcm_count"]]]
+
+    def _exam_exercises(self):
+        if self.variant is not None:
+            try:
+                return resolve_exercises(self.variant, self.exercises_data, self.catalog)
+            except VariantError as e:
+                log(f"[VARIANTS ERROR] {e} -> default exercises")
+        return self.exercises_data["exercises"][: self.config["exercise_count"]]
 
     # ---------------------------------------------------------
     # Load JSON helper
@@ -55,21 +152,22 @@ class EvaluationEngine:
     # ---------------------------------------------------------
     # Load test.json for an exercise
     # ---------------------------------------------------------
-    def _load_tests(self, exo_name):
-        path = os.path.join("exercises", exo_name, "test.json")
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"Missing test.json for {exo_name}")
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)["tests"]
+    def _load_tests(self, exo_name, variation=None):
+        return self.catalog.tests(exo_name, variation)
 
     # ---------------------------------------------------------
     # RUN FULL EVALUATION
     # ---------------------------------------------------------
     def run(self):
-        self.prepare_session()
-        self.run_qcm()
-        self.run_exercises()
-        self.finalize()
+        try:
+            with span("session", "engine", student=self.student):
+                self.prepare_session()
+                self.warm_up_calibrations()
+                self.run_qcm()
+                self.run_exercises()
+                self.finalize()
+        finally:
+            tracer.export(self.session_id)
 
 
     # ---------------------------------------------------------
@@ -78,24 +176,36 @@ class EvaluationEngine:
     def prepare_session(self):
         self.file_manager.prepare_student_directory()
 
+    def warm_up_calibrations(self):
+        """
+        Calibrates the performance-graded exercises of the exam in the
+        background while the QCM runs; a grading that comes first waits for
+        it (the grading service does its own).
+        """
+        if self.grading_client is None:
+            self.grader.performance.warm_up(
+                [(exo["name"], exo.get("variation")) for exo in self._exam_exercises()]
+            )
+
 
     # ---------------------------------------------------------
     # QCM SECTION
     # ---------------------------------------------------------
+    @traced("qcm", "engine")
     def run_qcm(self):
         safe_print("\n===== QCM =====")
 
-        questions = self.qcm_data["questions"][: self.config["qcm_count"]]
+        questions = self._exam_questions()
         total_qcm_points = 0
 
-        for q in questions:
+        for q, choices, answer in questions:
             safe_print(f"\n{q['question']}")
-            for choice in q["choices"]:
+            for choice in choices:
                 safe_print("  " + choice)
 
             ans = input("\nYour answer: ").strip().upper()
 
-            if ans == q["answer"]:
+            if ans == answer:
                 total_qcm_points += q["points"]
             else:
                 roast = self.cooldown.roast("qcm_wrong", self.roasts)
@@ -112,89 +222,159 @@ class EvaluationEngine:
     def run_exercises(self):
         safe_print("\n===== EXERCISES =====")
 
-        selected_exos = self.exercises_data["exercises"][: self.config["exercise_count"]]
+        selected_exos = self._exam_exercises()
 
         for exo in selected_exos:
             exo_name = exo["name"]
             language = exo["language"]
             points = exo["points"]
+            # Only drawn when it has its own tests (variations/<variation>.json)
+            variation = exo.get("variation")
 
             safe_print(f"\n--- Exercise: {exo_name} ---")
 
             # Show description
-            desc_path = os.path.join("exercises", exo_name, "description.md")
-            if os.path.exists(desc_path):
-                with open(desc_path, "r", encoding="utf-8") as f:
-                    safe_print(f.read())
-
-            attempt = 1
-
-            while True:
-                # WAIT FOR FILE
-                file_path = self.file_manager.wait_for_submission(exo_name)
-
-                if file_path is None:
-                    safe_print(self.cooldown.roast("wrong_filename", self.roasts, exo_name))
-                    self.cooldown.apply_penalty(attempt)
-                    attempt += 1
-                    continue
-
-                # LOAD TESTS
-                tests = self._load_tests(exo_name)
-
-                all_passed = True
-
-                for test in tests:
-                    input_data = test.get("input", "")
-                    expected = test["output"]
-
-                    result = self.sandbox.run(
-                        file_path=file_path,
-                        language=language,
-                        input_data=input_data
-                    )
-
-                    # Runtime fail?
-                    if result.exit_code != 0 or result.stderr.strip() != "":
-                        log(f"Runtime error: {result.stderr}")
-                        safe_print(self.cooldown.roast("runtime", self.roasts, exo_name))
-                        self.cooldown.apply_penalty(attempt)
+            description = self.catalog.description(exo_name)
+            if description is not None:
+                safe_print(description)
+            if variation:
+                safe_print(f"🎲 Variante : {variation}")
+
+            with span("exercise", "engine", exercise=exo_name):
+                # Failed attempts / pending cooldown survive a restart
+                attempt = self.cooldown.attempts(exo_name) + 1
+
+                while True:
+                    # WAIT FOR FILE
+                    file_path = self.file_manager.wait_for_submission(exo_name)
+
+                    # COOLDOWN: checked, not slept through
+                    remaining = self.cooldown.remaining(exo_name)
+                    if remaining > 0:
+                        safe_print(f"\n⏳ Cooldown: {int(remaining + 0.999)}s left before your next submission.")
+                        if not self.file_manager.watch:
+                            continue
+                        # Watch mode: the saved file is graded when the cooldown ends
+                        self.cooldown.wait(exo_name)
+
+                    if file_path is None:
+                        safe_print(self.cooldown.roast("wrong_filename", self.roasts, exo_name))
+                        self.cooldown.apply_penalty(attempt, exo_name)
                         attempt += 1
-                        all_passed = False
+                        continue
+
+                    # Watch mode: a save during the cooldown is graded now, not twice
+                    self.file_manager.mark_graded(file_path)
+                    all_passed = True
+                    report = self._grade_submission(exo_name, file_path, language, variation)
+                    if report is None:
+                        continue
+
+                    for verdict in report["verdicts"]:
+                        # The sandbox failed, not the student: no roast, no penalty
+                        if verdict == "internal_error":
+                            safe_print("⚠️ Erreur interne du correcteur : ta soumission n'est "
+                                       "pas comptée (pas de pénalité). Renvoie-la.")
+                            all_passed = False
+                            break
+
+                        # Runtime fail? Output comparison?
+                        if verdict != "ok":
+                            safe_print(self.cooldown.roast(verdict, self.roasts, exo_name))
+                            self.cooldown.apply_penalty(attempt, exo_name)
+                            attempt += 1
+                            all_passed = False
+                            break
+
+                    # SUCCESS !!
+                    if all_passed:
+                        ratio = report.get("efficiency")
+                        earned = performance_points(
+                            points, ratio, performance_spec(self.catalog.meta(exo_name))
+                        )
+                        safe_print(f"✔️ Correct ! +{earned} pts")
+                        if ratio is not None:
+                            safe_print(f"⚡ Temps CPU : x{ratio} celui de la solution de référence"
+                                       + (f" ({earned - points:+} pts)" if earned != points else ""))
+                        entry = {
+                            "exercise": exo_name,
+                            "success": True,
+                            "points": earned
+                        }
+                        if variation:
+                            entry["variation"] = variation
+                        if ratio is not None:
+                            entry["efficiency"] = ratio
+                        self.results["exercises"].append(entry)
+                        self.scoring.add_points(earned)
+                        self.cooldown.clear(exo_name)
                         break
 
-                    # Output comparison
-                    if not self.comparator.compare(result.stdout, expected):
-                        log("Wrong output.")
-                        safe_print(self.cooldown.roast("wrong_output", self.roasts, exo_name))
-                        self.cooldown.apply_penalty(attempt)
-                        attempt += 1
-                        all_passed = False
-                        break
 
-                # SUCCESS !!
-                if all_passed:
-                    safe_print(f"✔️ Correct ! +{points} pts")
-                    self.results["exercises"].append({
-                        "exercise": exo_name,
-                        "success": True,
-                        "points": points
-                    })
-                    self.scoring.add_points(points)
-                    break
+    # ---------------------------------------------------------
+    # VERDICTS OF ONE SUBMISSION (grading service or local sandbox)
+    # ---------------------------------------------------------
+    def _grade_submission(self, exo_name, file_path, language, variation=None):
+        """
+        Returns the SubmissionGrader report (per-test verdicts in order,
+        up to the first failure, + efficiency), or None if the grading
+        service could not grade it (no penalty, the student submits again).
+        """
+        report = None
+        if self.grading_client is not None:
+            from eval_core.grading_service import (
+                GradingServiceError, GradingServiceBusy, GradingServiceUnreachable
+            )
+
+            try:
+                report = self.grading_client.grade(self.student, exo_name, file_path, variation)
+            except GradingServiceUnreachable as e:
+                # Only a dead daemon is replaced by local grading
+                log(f"[SERVICE ERROR] {e} -> grading locally")
+            except GradingServiceBusy as e:
+                log(f"[SERVICE ERROR] {e} -> gave up, submission not graded")
+                safe_print("⏳ Le serveur de correction est saturé : ta soumission n'a pas été "
+                           "corrigée (pas de pénalité). Renvoie-la dans un instant.")
+                return None
+            except GradingServiceError as e:
+                log(f"[SERVICE ERROR] {e} -> submission not graded")
+                safe_print(f"⚠️ Soumission refusée par le serveur de correction : {e}")
+                return None
+
+        if report is None:
+            report = self.grader.grade(exo_name, file_path, language, variation)
+
+        compile_error = report.get("compile_error")
+        if compile_error is not None:
+            safe_print(f"↳ Erreur de compilation : ligne {compile_error['line']}, "
+                       f"colonne {compile_error['column']} — {compile_error['message']}")
+
+        mismatch = report.get("mismatch")
+        if mismatch is not None:
+            safe_print(f"↳ Première différence : ligne {mismatch['line']}, "
+                       f"colonne {mismatch['column']}")
+
+        return report
 
 
     # ---------------------------------------------------------
     # FINALIZATION
     # ---------------------------------------------------------
+    @traced("finalize", "engine")
     def finalize(self):
         total = self.scoring.total_points()
         self.results["total_score"] = total
         self.results["passed"] = (total >= self.config["passing_score"])
 
         self.file_manager.save_results(self.results)
-        self.git.push_results(self.student)
+        if self.publisher is not None:
+            self.publisher.enqueue(self.student)
 
         safe_print("\n===== END OF EVALUATION =====")
         safe_print(f"Total score: {total}")
-        safe_print("PASSED!" if self.results["passed"] else "FAILED...")
\ No newline at end of file
+        safe_print("PASSED!" if self.results["passed"] else "FAILED...")
+
+        # Give the push a bounded chance before the app exits;
+        # whatever is left stays queued for the next run.
+        if self.publisher is not None and not self.publisher.close(self.config.get("publish_timeout", 15)):
+            log(f"[PUBLISH] Results of {self.student} still queued, will retry on next start")
\ No newline at end of file
@@ -3,20 +3,29 @@ import time
 import json
 from datetime import datetime
 from eval_core.utils import log
+from eval_core.catalog import get_catalog
+from eval_core.tracing import traced
 
 class StudentFileManager:
     #TODO: strict regex
     SAFE_NAME_REGEX = r"^[a-zA-Z0-9_\-\.]+$"
 
-    def __init__(self, student_name):
+    def __init__(self, student_name, watch=False, debounce=0.3):
+        """
+        watch: detect saves automatically instead of waiting for 'submit'.
+        """
         self.student = student_name
         self.base_dir = os.path.abspath("results")
         self.student_dir = os.path.join(self.base_dir, self.student)
+        self.watch = watch
+        self.debounce = debounce
+        self.watcher = None
 
     # ------------------------------------------------
     # PREPARE FOLDER
     # ------------------------------------------------
 
+    @traced("prepare_student_directory", "files")
     def prepare_student_directory(self):
         """
         Create results/<student>/ if missing.
@@ -34,15 +43,8 @@ class StudentFileManager:
     # ------------------------------------------------
 
     def _load_expected_filenames(self, exo_name):
-        path = os.path.join("exercises", exo_name, "expected_files.json")
-        #Security if no path
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"[SECURITY] Missing expected_files.json for {exo_name}")
-
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        return data["filenames"]
+        #Security (name + path) handled by the catalog
+        return get_catalog().expected_filenames(exo_name)
 
     # ------------------------------------------------
     # VERIFY FILENAME
@@ -64,12 +66,16 @@ class StudentFileManager:
     # WAIT FOR SUBMISSION
     # ------------------------------------------------
 
+    @traced("wait_for_submission", "files")
     def wait_for_submission(self, exo_name):
         """
         Waits for the student to type 'submit'.
         Then checks once if a valid file exists.
         If not found → return None so the engine can restart the prompt.
+        In watch mode: returns as soon as an expected file is saved with new content.
         """
+        if self.watch:
+            return self._watch_for_submission(exo_name)
 
         print("\n► When your file is ready, type: submit")
         print("► Your file must be placed in:", self.student_dir)
@@ -95,10 +101,31 @@ class StudentFileManager:
         print("\n⚠️ File not found. Make sure you placed:", expected_files)
         return None
 
+    def _watch_for_submission(self, exo_name):
+        if self.watcher is None:
+            from eval_core.watcher import SubmissionWatcher  # watch mode only
+            self.watcher = SubmissionWatcher(self.student_dir, debounce=self.debounce)
+
+        expected_files = self._load_expected_filenames(exo_name)
+        print("\n► Watch mode: save your file, it is graded automatically.")
+        print("► Your file must be placed in:", self.student_dir, expected_files)
+
+        path = self.watcher.wait(expected_files)
+        log(f"Detected saved file: {path}")
+        return path
+
+    def mark_graded(self, file_path):
+        """
+        Watch mode: the content graded now is not reported again.
+        """
+        if self.watcher is not None:
+            self.watcher.mark_seen(file_path)
+
     # ------------------------------------------------
     # SAVE RESULTS JSON
     # ------------------------------------------------
 
+    @traced("save_results", "files")
     def save_results(self, results_dict):
         """
         Save result.json inside student's folder.
@@ -108,4 +135,11 @@ class StudentFileManager:
         with open(path, "w", encoding="utf-8") as f:
             json.dump(results_dict, f, indent=4)
 
-        log(f"Saved results for {self.student} at {path}")
\ No newline at end of file
+        log(f"Saved results for {self.student} at {path}")
+
+        # Keep the admin index in sync (results.json stays the reference)
+        try:
+            from eval_core.results_store import get_results_store  # sqlite3: end of session only
+            get_results_store().save(results_dict, path)
+        except Exception as e:
+            log(f"[RESULTS ERROR] Could not index results of {self.student}: {e}")
\ No newline at end of file
@@ -0,0 +1,421 @@
+import os
+import sys
+import json
+import time
+import signal
+import selectors
+
+try:
+    from eval_core.stream_compare import StreamMatcher
+    from eval_core.case_files import open_input
+    from eval_core.launcher import REPORT_MEMORY, run_main
+    _SCRIPT_HELPERS = ()
+except ImportError:  # executed as a script from eval_core/
+    from stream_compare import StreamMatcher
+    from case_files import open_input
+    from launcher import REPORT_MEMORY, run_main
+    # Top-level names: dropped before the submission runs (see _exec_child),
+    # its own "case_files.py" must not resolve to ours
+    _SCRIPT_HELPERS = ("stream_compare", "case_files", "launcher")
+
+# Warm Python worker (fork server).
+# Started once by WarmPythonPool, it pre-imports the usual student modules,
+# then forks a fresh child for every test case (launcher.run_main).
+# With --once, it serves one multi-case request of SandboxRunner.run_many.
+# STDLIB ONLY: this file is also executed as a standalone script.
+
+PRELOAD_MODULES = [
+    "math", "random", "string", "re", "json", "itertools",
+    "collections", "functools", "datetime", "decimal", "fractions",
+    "statistics", "runpy", "pkgutil", "traceback",
+]
+
+READ_CHUNK = 65536
+
+# Default per-run limits (see "sandbox_limits" in eval_config.json).
+# "max_processes" (RLIMIT_NPROC) is only applied when configured: it counts
+# every process of the user, not just the ones of this run.
+DEFAULT_LIMITS = {
+    "cpu_seconds": 2,
+    "memory_mb": 256,
+    "max_output_kb": 1024,
+}
+
+# Protocol fds of the server, closed in every child
+_PROTO_FDS = ()
+
+
+# ---------------------------------------------------------
+# CHILD SIDE: run the student file as "python3 file.py" would
+# ---------------------------------------------------------
+
+def _exec_child(file_path, code_obj, stdin_fd, stdout_fd, stderr_fd, limits=None,
+                report_fd=None):
+    """
+    Never returns: runs the submission then exits with its exit code.
+    code_obj: the already compiled submission, or None to compile it here.
+    report_fd: write end of the report pipe (see launcher.run_main).
+    """
+    os.setpgid(0, 0)
+    os.dup2(stdin_fd, 0)
+    os.dup2(stdout_fd, 1)
+    os.dup2(stderr_fd, 2)
+    for fd in (stdin_fd, stdout_fd, stderr_fd):
+        if fd > 2:
+            os.close(fd)
+    for name in _SCRIPT_HELPERS:
+        sys.modules.pop(name, None)
+    run_main(file_path, code_obj, limits, report_fd)
+
+
+# ---------------------------------------------------------
+# PARENT SIDE: feed stdin, drain stdout/stderr, enforce timeout
+# ---------------------------------------------------------
+
+def communicate(pid, stdin_fd, stdout_fd, stderr_fd, input_bytes, timeout, max_output=None,
+                on_stdout=None):
+    """
+    Non-blocking I/O loop on the three pipes of a child.
+    Returns (stdout_bytes, stderr_bytes, timed_out, stop).
+    stop: None, "output" (stdout + stderr went past max_output bytes)
+          or "diverged" (on_stdout returned False). The loop ends right there.
+    on_stdout(chunk): streaming consumer; stdout is then NOT kept in memory.
+    The pipes are closed on return; the child is NOT reaped.
+    """
+    sel = selectors.DefaultSelector()
+    out_chunks = {stdout_fd: [], stderr_fd: []}
+    received = 0
+    stop = None
+
+    if input_bytes:
+        os.set_blocking(stdin_fd, False)
+        sel.register(stdin_fd, selectors.EVENT_WRITE)
+    else:
+        os.close(stdin_fd)
+    sel.register(stdout_fd, selectors.EVENT_READ)
+    sel.register(stderr_fd, selectors.EVENT_READ)
+
+    view = memoryview(input_bytes)
+    offset = 0
+    deadline = time.monotonic() + timeout
+    timed_out = False
+
+    while sel.get_map():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+
+        for key, _ in sel.select(remaining):
+            fd = key.fd
+            if fd == stdin_fd:
+                try:
+                    offset += os.write(fd, view[offset:offset + READ_CHUNK])
+                except BrokenPipeError:
+                    offset = len(view)
+                if offset >= len(view):
+                    sel.unregister(fd)
+                    os.close(fd)
+            else:
+                data = os.read(fd, READ_CHUNK)
+                if not data:
+                    sel.unregister(fd)
+                    os.close(fd)
+                    continue
+
+                received += len(data)
+                if max_output is not None and received > max_output:
+                    # Keep nothing past the limit: the run stops below
+                    data = data[:max(0, len(data) - (received - max_output))]
+                if fd == stdout_fd and on_stdout is not None:
+                    if not on_stdout(data):
+                        stop = "diverged"
+                else:
+                    out_chunks[fd].append(data)
+
+        if stop is None and max_output is not None and received > max_output:
+            stop = "output"
+        if stop is not None:
+            break
+
+    for key in list(sel.get_map().values()):
+        os.close(key.fd)
+    sel.close()
+
+    return (b"".join(out_chunks[stdout_fd]), b"".join(out_chunks[stderr_fd]),
+            timed_out, stop)
+
+
+def kill_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def exit_status(status):
+    """
+    waitpid status -> Popen-like return code (negative signal number).
+    """
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def decode(data):
+    # Same as Popen(text=True): universal newlines
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+
+def max_output_bytes(limits):
+    if limits and limits.get("max_output_kb"):
+        return int(limits["max_output_kb"]) * 1024
+    return None
+
+
+def read_report(fd):
+    """
+    What the child wrote on its report pipe (b"" if nothing), then close it.
+    Non-blocking: a leftover process of the run may still hold the write end.
+    """
+    os.set_blocking(fd, False)
+    try:
+        return os.read(fd, 16)
+    except BlockingIOError:
+        return b""
+    finally:
+        os.close(fd)
+
+
+def finish_case(pid, stdout, stderr, timed_out, stop, started, limits, matcher=None,
+                report_fd=None):
+    """
+    Reap the child (kill it first if needed) and build the result dict:
+    SandboxResult contract + resource accounting + which limit was hit
+    (+ streaming comparison outcome when a matcher was used).
+    report_fd: read end of the child's report pipe (closed here).
+    """
+    limits = limits or {}
+    if timed_out or stop is not None:
+        kill_group(pid)
+
+    _, status, usage = os.wait4(pid, 0)
+    wall_time = time.monotonic() - started
+    exit_code = exit_status(status)
+    memory_error = report_fd is not None and read_report(report_fd) == REPORT_MEMORY
+
+    result = {
+        "stdout": decode(stdout),
+        "stderr": decode(stderr),
+        "exit_code": exit_code,
+        "cpu_time": round(usage.ru_utime + usage.ru_stime, 4),
+        "peak_rss_kb": usage.ru_maxrss,
+        "wall_time": round(wall_time, 4),
+        "limit_exceeded": None,
+    }
+
+    if matcher is not None:
+        result["diverged"] = stop == "diverged"
+        result["stream_match"] = not result["diverged"] and matcher.finish()
+        result["mismatch"] = matcher.mismatch
+
+    cpu_limit = limits.get("cpu_seconds")
+    # SIGXCPU = soft CPU limit, SIGKILL = hard one (or killed by us)
+    cpu_killed = exit_code == -signal.SIGXCPU or (
+        exit_code == -signal.SIGKILL and cpu_limit and result["cpu_time"] >= cpu_limit - 0.1
+    )
+
+    if timed_out or cpu_killed:
+        result.update(stdout="", stderr="Timeout", exit_code=1, limit_exceeded="time")
+    elif exit_code != 0 and memory_error:
+        result["limit_exceeded"] = "memory"
+    elif stop == "output" or exit_code == -signal.SIGXFSZ:
+        result.update(exit_code=exit_code or 1, limit_exceeded="output")
+
+    return result
+
+
+def run_case(file_path, input_data, timeout, code_obj=None, limits=None, expected=None):
+    """
+    Fork one child for one test case.
+    input_data: string, or {"file": path} (NN.in, streamed from a memory map).
+    expected: compare stdout while it streams, kill the child on divergence.
+    Returns a dict with the SandboxResult contract.
+    """
+    in_r, in_w = os.pipe()
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    report_r, report_w = os.pipe()
+
+    started = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+        for fd in (in_w, out_r, err_r, report_r) + _PROTO_FDS:
+            os.close(fd)
+        _exec_child(file_path, code_obj, in_r, out_w, err_w, limits, report_w)
+
+    for fd in (in_r, out_w, err_w, report_w):
+        os.close(fd)
+
+    matcher = StreamMatcher(expected) if expected is not None else None
+    with open_input(input_data) as input_bytes:
+        stdout, stderr, timed_out, stop = communicate(
+            pid, in_w, out_r, err_r, input_bytes, timeout,
+            max_output_bytes(limits), matcher.feed if matcher else None
+        )
+
+    return finish_case(pid, stdout, stderr, timed_out, stop, started, limits, matcher,
+                       report_r)
+
+
+_code_cache = {}
+CODE_CACHE_SIZE = 64
+
+
+def _compile(file_path):
+    """
+    Compile once, reused by every case / request while the file is unchanged.
+    On a syntax error return None: every child then reports it like python3 does.
+    """
+    try:
+        st = os.stat(file_path)
+        key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+        if key in _code_cache:
+            return _code_cache[key]
+
+        with open(file_path, "rb") as f:
+            code_obj = compile(f.read(), file_path, "exec", dont_inherit=True)
+    except (SyntaxError, ValueError, OSError):
+        return None
+
+    if len(_code_cache) >= CODE_CACHE_SIZE:
+        _code_cache.pop(next(iter(_code_cache)))
+    _code_cache[key] = code_obj
+    return code_obj
+
+
+def run_cases(file_path, inputs, timeout, stop_on_error=True, limits=None, expected=None):
+    """
+    Run every test input of an exercise in one session.
+    Each case still gets its own forked child and its own stdin/stdout/stderr.
+    stop_on_error: stop after the first case that crashes, times out
+                   (or whose streamed output does not match `expected`).
+    """
+    code_obj = _compile(file_path)
+    results = []
+
+    for index, input_data in enumerate(inputs):
+        res = run_case(file_path, input_data, timeout, code_obj, limits,
+                       expected[index] if expected is not None else None)
+        results.append(res)
+        failed = res["exit_code"] != 0 or res["stderr"].strip() != "" \
+            or res.get("stream_match") is False
+        if stop_on_error and failed:
+            break
+
+    return results
+
+
+def error_response(request, message):
+    """
+    Failure of the server itself, in the shape the request expects
+    (a list of results for an "inputs" request).
+    """
+    error = {"stdout": "", "stderr": message, "exit_code": 1, "internal_error": True}
+    if isinstance(request, dict) and "inputs" in request:
+        return {"results": [error]}
+    return error
+
+
+def handle(request):
+    if "inputs" in request:
+        return {"results": run_cases(request["file"], request["inputs"], request["timeout"],
+                                     request.get("stop_on_error", True), request.get("limits"),
+                                     request.get("expected"))}
+    return run_case(request["file"], request.get("input", ""), request["timeout"],
+                    _compile(request["file"]), request.get("limits"), request.get("expected"))
+
+
+# ---------------------------------------------------------
+# SERVER LOOP (one JSON request per line)
+# ---------------------------------------------------------
+
+def _read_lines(fd):
+    buffer = b""
+    while True:
+        data = os.read(fd, READ_CHUNK)
+        if not data:
+            return
+        buffer += data
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            yield line
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def serve():
+    global _PROTO_FDS
+
+    for name in PRELOAD_MODULES:
+        __import__(name)
+
+    # Keep the protocol on private fds, stdio of children stays clean
+    proto_in = os.dup(0)
+    proto_out = os.dup(1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    _PROTO_FDS = (proto_in, proto_out)
+
+    _write_all(proto_out, b'{"ready": true}\n')
+
+    for line in _read_lines(proto_in):
+        request = None
+        try:
+            request = json.loads(line)
+            response = handle(request)
+        except Exception as e:
+            response = error_response(request, str(e))
+        _write_all(proto_out, json.dumps(response).encode("utf-8") + b"\n")
+
+
+def serve_once():
+    """
+    One request on stdin, one response on stdout, then exit.
+    Used by SandboxRunner.run_many without a warm pool.
+    """
+    global _PROTO_FDS
+
+    for name in PRELOAD_MODULES:
+        __import__(name)
+
+    request = json.loads(sys.stdin.buffer.read())
+    proto_out = os.dup(1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    _PROTO_FDS = (proto_out,)
+
+    try:
+        response = handle(request)
+    except Exception as e:
+        response = {"error": str(e)}
+    _write_all(proto_out, json.dumps(response).encode("utf-8") + b"\n")
+
+
+if __name__ == "__main__":
+    if "--once" in sys.argv:
+        serve_once()
+    else:
+        serve()
@@ -1,13 +1,18 @@
 import subprocess
 import os
+import shutil
+import threading
 from eval_core.utils import log
+from eval_core.tracing import span, traced
 
 class GitManager:
 
-    def __init__(self, repo_url, repo_dir="submissions"):
+    def __init__(self, repo_url, repo_dir="submissions", results_dir="results"):
         self.repo_url = repo_url
         self.repo_dir = repo_dir
         self.repo_path = os.path.abspath(repo_dir)
+        self.results_dir = results_dir
+        self._clone_thread = None
 
     # ---------------------------------------------------------
     # Run git command safely (no shell injection)
@@ -16,28 +21,48 @@ class GitManager:
     def _git(self, args):
         """
         Run a git command using subprocess safely.
+        Returns True on success.
         """
         try:
-            result = subprocess.run(
-                ["git"] + args,
-                cwd=self.repo_path if os.path.isdir(self.repo_path) else None,
-                capture_output=True,
-                text=True,
-                shell=False
-            )
+            with span(f"git {args[0]}", "git"):
+                result = subprocess.run(
+                    ["git"] + args,
+                    cwd=self.repo_path if os.path.isdir(self.repo_path) else None,
+                    capture_output=True,
+                    text=True,
+                    shell=False
+                )
 
             if result.returncode != 0:
-                log(f"[GIT ERROR] {' '.join(args)} -> {result.stderr}")
-            else:
-                log(f"[GIT] {' '.join(args)}")
+                log(f"[GIT ERROR] {' '.join(args)} -> {result.stderr or result.stdout}")
+                return False
+
+            log(f"[GIT] {' '.join(args)}")
+            return True
 
         except Exception as e:
             log(f"[GIT EXCEPTION] {e}")
+            return False
+
+    def _has_staged_changes(self):
+        """
+        True if the index differs from HEAD (`git diff --cached --quiet` exits 1).
+        """
+        try:
+            result = subprocess.run(
+                ["git", "diff", "--cached", "--quiet"],
+                cwd=self.repo_path, capture_output=True, shell=False
+            )
+        except OSError as e:
+            log(f"[GIT EXCEPTION] {e}")
+            return True
+        return result.returncode != 0
 
     # ---------------------------------------------------------
     # Clone repo if missing
     # ---------------------------------------------------------
 
+    @traced("git clone", "git")
     def clone_if_needed(self):
         if os.path.isdir(self.repo_path):
             log("Repo already exists, pulling latest changes.")
@@ -53,6 +78,27 @@ class GitManager:
         )
         log("Clone complete.")
 
+    def clone_in_background(self):
+        """
+        Starts clone_if_needed() in a thread: the session does not wait for
+        the network. Every publish waits for it (wait_ready).
+        """
+        if self._clone_thread is None:
+            self._clone_thread = threading.Thread(
+                target=self.clone_if_needed, name="git-clone", daemon=True
+            )
+            self._clone_thread.start()
+        return self
+
+    def wait_ready(self, timeout=None):
+        """
+        True once the background clone is over (or none was started).
+        """
+        if self._clone_thread is not None:
+            self._clone_thread.join(timeout)
+            return not self._clone_thread.is_alive()
+        return True
+
     # ---------------------------------------------------------
     # Commit & push student's results
     # ---------------------------------------------------------
@@ -61,18 +107,60 @@ class GitManager:
         """
         Adds, commits, and pushes the student's folder.
         """
-        student_path = os.path.join(self.repo_path, student_name)
+        return self.publish_batch([student_name])
 
-        if not os.path.exists(student_path):
-            log(f"[GIT ERROR] No folder found for {student_name}")
+    # ---------------------------------------------------------
+    # Copy results/<student>/ into the repo
+    # ---------------------------------------------------------
+
+    def sync_student(self, student_name):
+        source = os.path.join(self.results_dir, student_name)
+        if not os.path.isdir(source) or not os.path.isdir(self.repo_path):
             return
+        shutil.copytree(source, os.path.join(self.repo_path, student_name), dirs_exist_ok=True)
+
+    # ---------------------------------------------------------
+    # One commit + one push for many students
+    # ---------------------------------------------------------
+
+    @traced("git publish", "git")
+    def publish_batch(self, student_names):
+        """
+        Stages every student folder, makes ONE commit and pushes it.
+        Returns True once the push went through, or when there is nothing to
+        publish (already committed, or no results folder for these students).
+        False if the repository is still missing (failed clone): kept queued.
+        """
+        self.wait_ready()
+
+        if not os.path.isdir(self.repo_path):
+            # The background clone failed (network?): try again now
+            self.clone_if_needed()
+            if not os.path.isdir(self.repo_path):
+                log(f"[GIT ERROR] No repository at {self.repo_path}: publish postponed")
+                return False
+
+        staged = []
+        for student_name in student_names:
+            if not os.path.isdir(os.path.join(self.results_dir, student_name)):
+                # Nothing to publish, ever: do not keep it queued
+                log(f"[GIT ERROR] No folder found for {student_name}")
+                continue
+            self.sync_student(student_name)
+            if not self._git(["add", student_name]):
+                return False
+            staged.append(student_name)
 
-        # Stage the student folder
-        self._git(["add", student_name])
+        if not staged:
+            return True
 
-        # Commit
-        commit_msg = f"Results for {student_name}"
-        self._git(["commit", "-m", commit_msg])
+        # Nothing new (already published): still push, an earlier commit may be unpushed
+        if self._has_staged_changes():
+            commit_msg = f"Results for {', '.join(staged)}"
+            if not self._git(["commit", "-m", commit_msg]):
+                return False
 
-        # Push
-        self._git(["push"])
\ No newline at end of file
+        # Push (another machine may have pushed first: rebase then retry once)
+        if self._git(["push"]):
+            return True
+        return self._git(["pull", "--rebase"]) and self._git(["push"])
\ No newline at end of file
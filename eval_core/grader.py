@@ -0,0 +1,159 @@
+from eval_core.utils import log
+from eval_core.verdict_cache import suite_name, verdict_key
+from eval_core.tracing import span, traced
+from eval_core.calibration import PerformanceLimits, efficiency
+
+
+class SubmissionGrader:
+    """
+    Runs the tests of one submission and judges them.
+    Shared by EvaluationEngine (local grading) and the grading service.
+    """
+
+    def __init__(self, config, sandbox, comparator, catalog, verdict_cache=None):
+        self.config = config
+        self.sandbox = sandbox
+        self.comparator = comparator
+        self.catalog = catalog
+        self.verdict_cache = verdict_cache
+        # Per-test CPU limits of the performance-graded exercises
+        # (a grading waits for the calibration of its exercise)
+        self.performance = PerformanceLimits(
+            catalog, comparator, self.execute_tests,
+            mode=f"{sandbox.backend}:{config.get('test_mode', 'single')}"
+        )
+
+    # ---------------------------------------------------------
+    # EXECUTE THE TESTS OF ONE SUBMISSION
+    # ---------------------------------------------------------
+    def execute_tests(self, file_path, language, tests):
+        """
+        Yields/returns the SandboxResults in test order.
+        - "single"     : one sandbox run per test, lazily (stops with the caller)
+        - "multi_case" : one sandbox launch for all the tests
+        - "concurrent" : all the tests in parallel, the rest is killed on first failure
+        With "streaming_compare", stdout is checked while it arrives and the
+        program is killed at the first divergence.
+        """
+        inputs = [test.get("input", "") for test in tests]
+        mode = self.config.get("test_mode", "single")
+        expected = None
+        if self.config.get("streaming_compare", False):
+            expected = [test["output"] for test in tests]
+
+        if mode == "multi_case":
+            return self.sandbox.run_many(file_path, language, inputs, expected=expected)
+
+        if mode == "concurrent":
+            return self.sandbox.run_concurrent(
+                file_path, language, inputs,
+                check=lambda i, result: self.comparator.verdict(result, tests[i]["output"]) == "ok",
+                max_workers=self.config.get("max_parallel_tests"),
+                expected=expected
+            )
+
+        return (
+            self.sandbox.run(file_path=file_path, language=language, input_data=input_data,
+                             expected=expected[i] if expected is not None else None)
+            for i, input_data in enumerate(inputs)
+        )
+
+    # ---------------------------------------------------------
+    # VERDICTS OF ONE SUBMISSION (with verdict cache)
+    # ---------------------------------------------------------
+    @traced("grade_submission", "grading")
+    def grade(self, exo_name, file_path, language, variation=None):
+        """
+        Returns {"verdicts", "mismatch", "compile_error", "cpu_time", "efficiency", "cached"}:
+        the per-test verdicts in order, up to the first failure,
+        the first output difference if the failure was a wrong output,
+        {"line", "column", "message"} if the submission does not compile,
+        the total CPU time and, for a calibrated exercise that passed,
+        its CPU time relative to the reference solution.
+        variation: graded on the tests of that meta.json variation.
+        """
+        tests = self.catalog.tests(exo_name, variation)
+        performance = self.performance.for_exercise(exo_name, variation)
+        limits = performance["limits"] if performance is not None else None
+
+        cache_key = None
+        # CPU times depend on the machine load: performance-graded exercises are never cached
+        if self.verdict_cache is not None and performance is None:
+            cache_key = verdict_key(
+                suite_name(exo_name, variation), file_path,
+                self.catalog.tests_hash(exo_name, variation),
+                language, self.sandbox.limits(language)
+            )
+            with span("verdict_cache.lookup", "grading"):
+                cached = self.verdict_cache.lookup(cache_key)
+            if cached is not None:
+                log(f"Verdict cache hit for {exo_name}: {cached}")
+                return {"verdicts": cached, "mismatch": None, "compile_error": None,
+                        "cpu_time": None, "efficiency": None, "cached": True}
+
+        # Pre-flight: a submission that does not compile is never spawned
+        failed = self.sandbox.preflight(file_path, language)
+        if failed is not None:
+            verdicts = [self.comparator.verdict(failed, None)]
+            if cache_key is not None and failed.compile_error is not None:
+                self.verdict_cache.store(cache_key, verdicts)
+            return {"verdicts": verdicts, "mismatch": None,
+                    "compile_error": failed.compile_error, "cpu_time": None,
+                    "efficiency": None, "cached": False}
+
+        verdicts = []
+        mismatch = None
+        cpu_times = []
+        cacheable = True
+        results = iter(self.execute_tests(file_path, language, tests))
+
+        for index, test in enumerate(tests):
+            with span("test", "grading", exercise=exo_name, index=index) as test_span:
+                result = next(results, None)
+                if result is None:
+                    break
+                with span("compare", "grading"):
+                    verdict = self.comparator.verdict(result, test["output"])
+                cpu_times.append(result.cpu_time)
+                if verdict == "ok" and limits is not None and limits[index] is not None \
+                        and result.cpu_time > limits[index]:
+                    verdict = "timeout"
+                test_span.set(verdict=verdict)
+            verdicts.append(verdict)
+
+            if verdict == "internal_error":
+                log(f"[SANDBOX ERROR] {exo_name} not graded: {result.stderr}")
+                # Grader fault: the next submission must run again
+                cacheable = False
+            elif verdict == "runtime":
+                log(f"Runtime error: {result.stderr}")
+                if result.stderr == "Cancelled":
+                    cacheable = False
+            elif verdict == "timeout":
+                log(f"Time limit exceeded (cpu {result.cpu_time}s, wall {result.wall_time}s"
+                    + (f", limit {limits[index]}s)" if limits is not None else ")"))
+                # Timeouts depend on the machine load: never cached
+                cacheable = False
+            elif verdict == "memory":
+                log(f"Memory limit exceeded (peak {result.peak_rss_kb} KB)")
+            elif verdict == "wrong_output":
+                log("Wrong output.")
+                if result.mismatch is not None:
+                    log(f"First difference: {result.mismatch}")
+                    mismatch = result.mismatch
+
+            if verdict != "ok":
+                break
+
+        if cache_key is not None and cacheable:
+            self.verdict_cache.store(cache_key, verdicts)
+
+        ratio = None
+        if performance is not None and len(verdicts) == len(tests) \
+                and all(v == "ok" for v in verdicts):
+            ratio = efficiency(cpu_times, performance["calibration"])
+            if ratio is not None:
+                log(f"Efficiency of {exo_name}: x{ratio} the reference CPU time")
+
+        return {"verdicts": verdicts, "mismatch": mismatch, "compile_error": None,
+                "cpu_time": round(sum(cpu_times), 4), "efficiency": ratio, "cached": False}
@@ -0,0 +1,378 @@
+import os
+import re
+import json
+import time
+import queue
+import base64
+import shutil
+import socket
+import itertools
+import threading
+import http.client
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from eval_core.utils import log, logger
+
+SPOOL_DIR = os.path.join(".cache", "spool")
+DEFAULT_ADDRESS = "http://127.0.0.1:8765"
+SAFE_FILENAME_REGEX = r"^[a-zA-Z0-9_\-\.]+$"
+
+
+class GradingServiceError(Exception):
+    """
+    The grading service refused the submission or gave an unusable answer.
+    """
+
+
+class GradingServiceBusy(GradingServiceError):
+    """
+    Queue full or job not graded in time (HTTP 503, read timeout): try again later.
+    """
+
+
+class GradingServiceUnreachable(GradingServiceError):
+    """
+    No connection to the service at all: the client grades locally.
+    """
+
+
+# ---------------------------------------------------------
+# SERVICE (job queue + fixed worker pool)
+# ---------------------------------------------------------
+
+class GradingService:
+    """
+    Grades submissions sent by the interactive clients.
+    - one queue, `workers` threads: at most `workers` submissions run at once
+      on the lab server, whatever the number of students
+    - every worker shares the same SandboxRunner / Comparator / verdict cache
+      (SubmissionGrader, same code path as local grading)
+    - a full queue refuses new jobs instead of piling them up
+    languages: {exercise: language} from exercises.json (never taken from the client)
+    """
+
+    def __init__(self, grader, languages, workers=4, max_queue=256, spool_dir=SPOOL_DIR):
+        self.grader = grader
+        self.languages = languages
+        self.workers = workers
+        self.spool_dir = os.path.abspath(spool_dir)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+        self._ids = itertools.count(1)
+        self._stats_lock = threading.Lock()
+        self.stats = {"submitted": 0, "graded": 0, "failed": 0, "rejected": 0}
+
+    def start(self):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"grader-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        log(f"[SERVICE] {self.workers} grading workers started")
+        return self
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def status(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats.update(workers=self.workers, queued=self._queue.qsize())
+        return stats
+
+    # ---------------------------------------------------------
+    # SUBMIT
+    # ---------------------------------------------------------
+
+    def submit(self, request, timeout=None):
+        """
+        request: {"student", "exercise", "filename", "source" (base64 of the raw bytes),
+                  "variation" (optional)}
+        Blocks until graded; returns the SubmissionGrader report + timings.
+        Raises ValueError (bad request) or GradingServiceBusy (queue full / timeout).
+        """
+        exo_name = request.get("exercise")
+        filename = request.get("filename", "")
+        source = request.get("source")
+        variation = request.get("variation")
+
+        # Security: valid exercise + expected file name only
+        self.grader.catalog.exercise_dir(exo_name)
+        language = self.languages.get(exo_name)
+        if language is None:
+            raise ValueError(f"Exercise {exo_name} is not in exercises.json")
+        if not re.match(SAFE_FILENAME_REGEX, filename) \
+                or filename not in self.grader.catalog.expected_filenames(exo_name):
+            raise ValueError(f"Unexpected file name '{filename}' for {exo_name}")
+        if variation is not None and variation not in self.grader.catalog.variations(exo_name):
+            raise ValueError(f"Variation {variation} of {exo_name} has no tests")
+        if not isinstance(source, str):
+            raise ValueError("Missing submission source")
+        try:
+            # The exact bytes the student wrote, whatever their encoding
+            source = base64.b64decode(source, validate=True)
+        except ValueError:
+            raise ValueError("Submission source is not valid base64")
+
+        job = {
+            "id": next(self._ids),
+            "student": request.get("student", "unknown"),
+            "exercise": exo_name,
+            "language": language,
+            "variation": variation,
+            "filename": filename,
+            "source": source,
+            "queued_at": time.perf_counter(),
+            "cancelled": False,
+            "done": threading.Event(),
+            "report": None,
+            "error": None,
+        }
+
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self._count("rejected")
+            raise GradingServiceBusy("Grading queue is full, try again in a moment")
+        self._count("submitted")
+
+        if not job["done"].wait(timeout):
+            # The client retries: do not grade this copy anymore
+            job["cancelled"] = True
+            raise GradingServiceBusy(f"Job {job['id']} not graded after {timeout}s")
+        if job["error"] is not None:
+            raise GradingServiceError(job["error"])
+        return job["report"]
+
+    # ---------------------------------------------------------
+    # WORKERS
+    # ---------------------------------------------------------
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if job["cancelled"]:
+                job["done"].set()
+                continue
+            try:
+                job["report"] = self._grade(job)
+                self._count("graded")
+            except Exception as e:
+                job["error"] = str(e)
+                self._count("failed")
+                log(f"[SERVICE ERROR] Job {job['id']} ({job['student']}/{job['exercise']}): {e}")
+            finally:
+                job["done"].set()
+
+    def _grade(self, job):
+        started = time.perf_counter()
+        logger.set_session(f"{job['student']}-job{job['id']}")
+
+        # The submission is copied into the spool (inside the sandbox root)
+        job_dir = os.path.join(self.spool_dir, f"job{job['id']}")
+        os.makedirs(job_dir, exist_ok=True)
+        file_path = os.path.join(job_dir, job["filename"])
+        try:
+            with open(file_path, "wb") as f:
+                f.write(job["source"])
+            report = self.grader.grade(job["exercise"], file_path, job["language"],
+                                       job["variation"])
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+        finished = time.perf_counter()
+        log(f"[SERVICE] Job {job['id']} {job['student']}/{job['exercise']}: {report['verdicts']}")
+        return dict(
+            report,
+            job_id=job["id"],
+            queue_wait_ms=round((started - job["queued_at"]) * 1000, 1),
+            grade_ms=round((finished - started) * 1000, 1)
+        )
+
+
+# ---------------------------------------------------------
+# HTTP FRONT (localhost TCP or Unix socket)
+# ---------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+
+    service = None
+    job_timeout = 300
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._reply(200, self.service.status())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/grade":
+            self._reply(404, {"error": "not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length).decode("utf-8"))
+            self._reply(200, self.service.submit(request, timeout=self.job_timeout))
+        except (ValueError, PermissionError, FileNotFoundError, KeyError) as e:
+            self._reply(400, {"error": str(e)})
+        except GradingServiceBusy as e:
+            self._reply(503, {"error": str(e)})
+        except GradingServiceError as e:
+            self._reply(500, {"error": str(e)})
+
+    def address_string(self):
+        # Unix socket clients have no (host, port)
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def make_server(service, address=DEFAULT_ADDRESS, job_timeout=300):
+    """
+    address: "http://127.0.0.1:8765" or "unix:/path/to/grading.sock"
+    """
+    handler = type("GradingHandler", (_Handler,), {"service": service, "job_timeout": job_timeout})
+
+    if address.startswith("unix:"):
+        path = address[len("unix:"):]
+        if os.path.exists(path):
+            os.remove(path)
+        server = _UnixHTTPServer(path, handler)
+        os.chmod(path, 0o660)
+        return server
+
+    host, port = _host_port(address)
+    if host not in ("127.0.0.1", "localhost", "::1"):
+        raise ValueError("[SECURITY] The grading service only listens on localhost")
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def _host_port(address):
+    hostport = address.split("://", 1)[-1].rstrip("/")
+    host, _, port = hostport.rpartition(":")
+    return host, int(port)
+
+
+# ---------------------------------------------------------
+# CLIENT (used by EvaluationEngine)
+# ---------------------------------------------------------
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class GradingClient:
+    """
+    Sends a submission to the grading service and waits for the verdicts.
+    - queue full / job timeout: retried with exponential backoff for up to
+      `retry_for` seconds, then GradingServiceBusy (never graded locally:
+      the daemon is there to cap the number of sandboxes)
+    - no connection: GradingServiceUnreachable (the caller may grade locally)
+    - refused: GradingServiceError
+    timeout: a bit more than the daemon's job timeout, which answers 503 first.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=320, retry_for=600,
+                 base_delay=2.0, max_delay=30.0):
+        self.address = address
+        self.timeout = timeout
+        self.retry_for = retry_for
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _connection(self):
+        if self.address.startswith("unix:"):
+            return _UnixHTTPConnection(self.address[len("unix:"):], self.timeout)
+        host, port = _host_port(self.address)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _call(self, method, path, payload=None):
+        conn = self._connection()
+        try:
+            body = json.dumps(payload).encode("utf-8") if payload is not None else None
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = json.loads(response.read().decode("utf-8"))
+        except socket.timeout:
+            raise GradingServiceBusy(f"Grading service did not answer within {self.timeout}s")
+        except OSError as e:
+            raise GradingServiceUnreachable(f"Grading service unreachable ({self.address}): {e}")
+        except (ValueError, http.client.HTTPException) as e:
+            raise GradingServiceError(f"Bad answer from the grading service: {e}")
+        finally:
+            conn.close()
+
+        if response.status == 503:
+            raise GradingServiceBusy(data.get("error", "HTTP 503"))
+        if response.status != 200:
+            raise GradingServiceError(data.get("error", f"HTTP {response.status}"))
+        return data
+
+    def grade(self, student, exo_name, file_path, variation=None):
+        """
+        The language comes from the daemon's exercises.json, the file is sent as is.
+        """
+        with open(file_path, "rb") as f:
+            source = base64.b64encode(f.read()).decode("ascii")
+        payload = {
+            "student": student,
+            "exercise": exo_name,
+            "filename": os.path.basename(file_path),
+            "source": source,
+        }
+        if variation is not None:
+            payload["variation"] = variation
+
+        deadline = time.monotonic() + self.retry_for
+        delay = self.base_delay
+        while True:
+            try:
+                return self._call("POST", "/grade", payload)
+            except GradingServiceBusy as e:
+                if time.monotonic() + delay > deadline:
+                    raise
+                log(f"[SERVICE] {e} -> retry in {delay:.0f}s")
+                time.sleep(delay)
+                delay = min(self.max_delay, delay * 2)
+
+    def status(self):
+        return self._call("GET", "/status")
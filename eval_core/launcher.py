@@ -0,0 +1,168 @@
+import os
+import sys
+import io
+import types
+import builtins
+import marshal
+
+try:
+    import resource
+except ImportError:  # not POSIX
+    resource = None
+
+# Launcher of one "subprocess" run (SandboxRunner), also the code every
+# forked child of fork_server.py runs. The limits are applied in the new
+# process itself: no preexec_fn in the (threaded) grader.
+# STDLIB ONLY and few imports: this file is started once per test.
+
+LAUNCHER_SCRIPT = os.path.abspath(__file__)
+
+# Written by run_main on its report pipe when the submission died of an
+# uncaught MemoryError (stderr is the student's: never parsed for that)
+REPORT_MEMORY = b"M"
+
+
+# ---------------------------------------------------------
+# LIMITS (applied in the child, before the student code runs)
+# ---------------------------------------------------------
+
+def apply_limits(limits):
+    """
+    Linux rlimits: CPU time, address space, file size (+ process count if set).
+    Must only be called in the process that runs the submission.
+    """
+    if resource is None or not limits:
+        return
+
+    def _set(which, value):
+        try:
+            resource.setrlimit(which, (value, value))
+        except (ValueError, OSError):
+            pass
+
+    if limits.get("cpu_seconds"):
+        cpu = int(limits["cpu_seconds"])
+        try:
+            # soft -> SIGXCPU, hard one second later -> SIGKILL
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+        except (ValueError, OSError):
+            pass
+    if limits.get("memory_mb"):
+        _set(resource.RLIMIT_AS, int(limits["memory_mb"]) * 1024 * 1024)
+    if limits.get("max_processes"):
+        _set(resource.RLIMIT_NPROC, int(limits["max_processes"]))
+    if limits.get("max_output_kb"):
+        _set(resource.RLIMIT_FSIZE, int(limits["max_output_kb"]) * 1024)
+    _set(resource.RLIMIT_CORE, 0)
+
+
+def limits_arg(limits):
+    """
+    {"cpu_seconds": 2, ...} -> "cpu_seconds=2,..." (no json import at launch).
+    """
+    return ",".join(f"{name}={value}" for name, value in limits.items() if value is not None)
+
+
+def parse_limits_arg(text):
+    limits = {}
+    for item in filter(None, text.split(",")):
+        name, _, value = item.partition("=")
+        limits[name] = float(value)
+    return limits
+
+
+# ---------------------------------------------------------
+# RUN the student file as "python3 file.py" would
+# ---------------------------------------------------------
+
+def load_code(pyc_path):
+    """
+    Code object of a .pyc written by preflight.PythonPreflight, or None
+    if it is missing or was compiled by another Python version.
+    """
+    import importlib.util  # magic number only
+
+    try:
+        with open(pyc_path, "rb") as f:
+            data = f.read()
+        if data[:4] != importlib.util.MAGIC_NUMBER:
+            return None
+        return marshal.loads(data[16:])
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+
+def run_main(file_path, code_obj, limits, report_fd=None):
+    """
+    Never returns: runs the submission on fds 0/1/2, then leaves through
+    SystemExit, so the interpreter's own exit steps (threads, atexit, flush)
+    run as after "python3 file.py".
+    Like runpy, the code runs in a fresh module registered as
+    sys.modules["__main__"]: "import __main__" and pickle see it.
+    code_obj: the already compiled submission, or None to compile it here.
+    report_fd: REPORT_MEMORY is written there if it died of a MemoryError.
+    """
+    from importlib.machinery import SourceFileLoader
+
+    sys.stdin = io.TextIOWrapper(io.FileIO(0, "r", closefd=False), encoding="utf-8")
+    sys.stdout = io.TextIOWrapper(io.FileIO(1, "w", closefd=False), encoding="utf-8")
+    sys.stderr = io.TextIOWrapper(io.FileIO(2, "w", closefd=False), encoding="utf-8",
+                                  line_buffering=True)
+    sys.argv = [file_path]
+    sys.path[0] = os.path.dirname(os.path.abspath(file_path))
+
+    # Forked children share the parent's PRNG state: reseed
+    if "random" in sys.modules:
+        sys.modules["random"].seed()
+
+    apply_limits(limits)
+
+    main = types.ModuleType("__main__")
+    main.__file__ = file_path
+    main.__cached__ = None
+    main.__loader__ = SourceFileLoader("__main__", file_path)
+    main.__builtins__ = builtins
+    sys.modules["__main__"] = main
+
+    code = 0
+    memory_error = False
+    try:
+        if code_obj is None:
+            with open(file_path, "rb") as f:
+                code_obj = compile(f.read(), file_path, "exec", dont_inherit=True)
+        exec(code_obj, main.__dict__)
+    except SystemExit as e:
+        code = e.code
+    except BaseException as e:
+        # Printed by sys.excepthook, as for an uncaught exception
+        memory_error = isinstance(e, MemoryError)
+        sys.excepthook(type(e), e, e.__traceback__)
+        code = 1
+
+    if memory_error and report_fd is not None:
+        try:
+            os.write(report_fd, REPORT_MEMORY)
+        except OSError:
+            pass
+    sys.exit(code)
+
+
+def exec_limited(limits, report_fd, kind, path, pyc_path=None):
+    """
+    LIMITS REPORT_FD python|native PATH [PYC]: one run of SandboxRunner's
+    "subprocess" backend, in a fresh session. The limits are set here, then
+    the Python file runs in this interpreter (from the pre-flight bytecode
+    PYC when given) or the binary replaces this process.
+    """
+    # Neither the binary nor the submission's own subprocesses get it
+    os.set_inheritable(report_fd, False)
+    if kind == "native":
+        apply_limits(limits)
+        os.execv(path, [path])
+    run_main(path, load_code(pyc_path) if pyc_path else None, limits, report_fd)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (5, 6):
+        sys.exit("usage: launcher.py LIMITS REPORT_FD python|native PATH [PYC]")
+    exec_limited(parse_limits_arg(sys.argv[1]), int(sys.argv[2]), *sys.argv[3:])
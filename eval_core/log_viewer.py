@@ -0,0 +1,261 @@
+import os
+import re
+import glob
+import gzip
+import json
+from datetime import datetime
+from eval_core.utils import SYSTEM_LOG, TAG_REGEX, archive_pattern
+
+BLOCK_SIZE = 64 * 1024
+TAIL_CHUNK = 8192
+INDEX_SUFFIX = ".idx"
+
+# "[2026-01-31 10:00:00] <alice-20260131-095500> [SANDBOX ERROR] ..."
+LINE_REGEX = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] (?:<([^>]*)> )?(.*)$")
+SESSION_REGEX = r"^{}-\d{{8}}-\d{{6}}$"
+
+
+def parse_line(line):
+    """
+    Returns (time, session, message, tag) or None for a non-log line.
+    """
+    match = LINE_REGEX.match(line)
+    if not match:
+        return None
+    time_str, session, message = match.groups()
+    tag = TAG_REGEX.match(message)
+    return time_str, session, message, tag.group(1) if tag else None
+
+
+def tail(path, n=50):
+    """
+    Last n lines of a file, read backward from the end in small chunks.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(TAIL_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return lines[-n:]
+
+
+class LogIndex:
+    """
+    Sparse index of a log file: one entry per ~64 KB block with the offsets,
+    the time range and the tags / sessions seen in it.
+    Saved next to the file (<file>.idx), extended incrementally for the live log.
+    Searches only read the blocks that can match.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.compressed = path.endswith(".gz")
+        self.blocks = []
+        self.end = 0
+        self.file_id = None
+
+    def _open(self):
+        return gzip.open(self.path, "rb") if self.compressed else open(self.path, "rb")
+
+    def _stat_id(self):
+        st = os.stat(self.path)
+        return [st.st_ino, st.st_size] if self.compressed else [st.st_ino]
+
+    def load(self):
+        """
+        Load the saved index and index whatever was appended since.
+        """
+        file_id = self._stat_id()
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("file_id") == file_id:
+                self.blocks = saved["blocks"]
+                self.end = saved["end"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        # The live log was truncated / replaced: start over
+        if not self.compressed and os.path.getsize(self.path) < self.end:
+            self.blocks, self.end = [], 0
+
+        self.file_id = file_id
+        if self._extend():
+            self._save()
+        return self
+
+    def _extend(self):
+        if self.compressed and self.blocks:
+            return False
+
+        added = False
+        with self._open() as f:
+            f.seek(self.end)
+            pending = b""
+            while True:
+                chunk = f.read(BLOCK_SIZE)
+                if not chunk:
+                    # A last line without "\n" is still being written
+                    break
+                data = pending + chunk
+                cut = data.rfind(b"\n")
+                if cut == -1:
+                    pending = data
+                    continue
+                block, pending = data[:cut + 1], data[cut + 1:]
+                self.blocks.append(self._describe(self.end, block))
+                self.end += len(block)
+                added = True
+        return added
+
+    def _describe(self, offset, data):
+        first = last = None
+        tags, sessions = set(), set()
+        for raw in data.decode("utf-8", errors="replace").splitlines():
+            parsed = parse_line(raw)
+            if parsed is None:
+                continue
+            time_str, session, _, tag = parsed
+            first = first or time_str
+            last = time_str
+            if tag:
+                tags.add(tag)
+            if session:
+                sessions.add(session)
+        return {
+            "offset": offset, "size": len(data), "first": first, "last": last,
+            "tags": sorted(tags), "sessions": sorted(sessions)
+        }
+
+    def _save(self):
+        tmp = self.index_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"file_id": self.file_id, "end": self.end, "blocks": self.blocks}, f)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            pass
+
+    def read_blocks(self, blocks):
+        """
+        Yields (block, lines). A gzip archive can only seek forward cheaply:
+        give its blocks in file order.
+        """
+        with self._open() as f:
+            for block in blocks:
+                f.seek(block["offset"])
+                yield block, f.read(block["size"]).decode("utf-8", errors="replace").splitlines()
+
+
+class LogViewer:
+    """
+    Tail / search over logs/system.log and its gzip archives,
+    newest first, without ever loading a whole file.
+    """
+
+    def __init__(self, log_path=SYSTEM_LOG):
+        self.log_path = log_path
+
+    def files(self):
+        """
+        Newest first: the live log, then the archives.
+        """
+        archives = sorted(glob.glob(archive_pattern(self.log_path)), reverse=True)
+        live = [self.log_path] if os.path.exists(self.log_path) else []
+        return live + archives
+
+    def tail(self, n=50):
+        if not os.path.exists(self.log_path):
+            return []
+        return tail(self.log_path, n)
+
+    # -----------------------------------------
+    # SEARCH
+    # -----------------------------------------
+
+    def search(self, student=None, since=None, until=None, tag=None, limit=50):
+        """
+        Last `limit` lines matching every given filter (oldest first).
+        student: session of that student ("<name>-YYYYmmdd-HHMMSS") or exact session
+        since / until: "YYYY-MM-DD HH:MM[:SS]" or "HH:MM[:SS]" (today)
+        tag: "[SANDBOX ERROR]", "GIT", "ERROR"... (substring of the tag)
+        """
+        since = _parse_time(since)
+        until = _parse_time(until, end=True)
+        tag = tag.strip().strip("[]").upper() if tag else None
+        session_regex = re.compile(SESSION_REGEX.format(re.escape(student))) if student else None
+
+        def session_ok(session):
+            return session is not None and (session == student or session_regex.match(session))
+
+        def block_ok(block):
+            if block["first"] is None:
+                return False
+            if since and block["last"] < since:
+                return False
+            if until and block["first"] > until:
+                return False
+            if tag and not any(tag in t for t in block["tags"]):
+                return False
+            if student and not any(session_ok(s) for s in block["sessions"]):
+                return False
+            return True
+
+        def line_ok(parsed):
+            time_str, session, _, line_tag = parsed
+            if since and time_str < since:
+                return False
+            if until and time_str > until:
+                return False
+            if tag and (line_tag is None or tag not in line_tag):
+                return False
+            if student and not session_ok(session):
+                return False
+            return True
+
+        found = []
+        for path in self.files():
+            index = LogIndex(path).load()
+            candidates = [block for block in index.blocks if block_ok(block)]
+            if not index.compressed:
+                candidates.reverse()
+
+            per_block = {}
+            for block, lines in index.read_blocks(candidates):
+                per_block[block["offset"]] = [
+                    line for line in lines
+                    if (parsed := parse_line(line)) is not None and line_ok(parsed)
+                ]
+                # Live log read backward: stop as soon as enough lines are found
+                if not index.compressed and sum(map(len, per_block.values())) + len(found) >= limit:
+                    break
+
+            matches = [line for offset in sorted(per_block) for line in per_block[offset]]
+            found = matches + found
+            if len(found) >= limit:
+                return found[-limit:]
+        return found
+
+
+def _parse_time(value, end=False):
+    """
+    User input -> "YYYY-MM-DD HH:MM:SS" (comparable as a string), or None.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if len(value) <= 8:
+        value = f"{datetime.now():%Y-%m-%d} {value}"
+    if len(value) == 16:
+        value += ":59" if end else ":00"
+    elif len(value) == 10:
+        value += " 23:59:59" if end else " 00:00:00"
+    datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    return value
@@ -0,0 +1,253 @@
+import os
+import re
+import json
+import marshal
+import hashlib
+import threading
+import traceback
+import subprocess
+import importlib.util
+from eval_core.utils import log
+
+PYC_DIR = os.path.join(".cache", "pyc")
+BUILD_DIR = os.path.join(".cache", "build")
+COMPILE_TIMEOUT = 30
+# Binaries / compile errors kept in BUILD_DIR, least recently used removed first
+BUILD_CACHE_MAX_ENTRIES = 2000
+PYC_CACHE_MAX_ENTRIES = 2000
+
+# Compiled languages (exercises.json "language"), overridable with
+# "compilers" in eval_config.json, e.g. {"cpp": {"flags": ["-O2", "-std=c++20"]}}
+COMPILERS = {
+    "c": {"compiler": "gcc", "flags": ["-O2", "-std=c11", "-pipe"], "libs": ["-lm"]},
+    "cpp": {"compiler": "g++", "flags": ["-O2", "-std=c++17", "-pipe"], "libs": []},
+}
+
+# file.c:12:5: error: expected ';' before 'return'
+GCC_ERROR = re.compile(
+    r"^.*?:(?P<line>\d+):(?P<column>\d+): (?:fatal )?error: (?P<message>.*)$", re.M
+)
+
+class CompileError(Exception):
+    """
+    The submission does not compile.
+    details: {"line", "column", "message"}; str(): python-like error text.
+    """
+
+    def __init__(self, text, details):
+        super().__init__(text)
+        self.details = details
+
+
+class PythonPreflight:
+    """
+    Compiles a Python submission once, before anything is spawned.
+    - syntax error -> CompileError with the line / column
+    - OK -> the code object is kept in .cache/pyc/<magic>/<sha256>.pyc, keyed
+      by the source and its path (tracebacks name the student's file);
+      launcher.py runs it as __main__ instead of recompiling
+    - a hit refreshes the file's mtime; after a write, the oldest files
+      beyond max_entries are removed
+    """
+
+    def __init__(self, cache_dir=PYC_DIR, max_entries=PYC_CACHE_MAX_ENTRIES):
+        self.magic = importlib.util.MAGIC_NUMBER
+        self.cache_dir = os.path.abspath(os.path.join(cache_dir, self.magic.hex()))
+        self.max_entries = max_entries
+
+    def check(self, file_path):
+        """
+        Returns the path of the cached bytecode (None if it could not be
+        written: the source is run instead). Raises CompileError.
+        """
+        with open(file_path, "rb") as f:
+            source = f.read()
+
+        path = os.path.abspath(file_path)
+        digest = hashlib.sha256(source)
+        digest.update(path.encode("utf-8"))
+        pyc = os.path.join(self.cache_dir, digest.hexdigest() + ".pyc")
+        if os.path.exists(pyc):
+            _touch(pyc)
+            return pyc
+
+        try:
+            code = compile(source, file_path, "exec", dont_inherit=True)
+        except SyntaxError as e:
+            text = "".join(traceback.format_exception_only(type(e), e)).rstrip()
+            raise CompileError(text, {
+                "line": e.lineno,
+                "column": e.offset,
+                "message": f"{type(e).__name__}: {e.msg}",
+            })
+        except ValueError as e:
+            # e.g. "source code string cannot contain null bytes"
+            raise CompileError(f"ValueError: {e}", {"line": None, "column": None,
+                                                    "message": f"ValueError: {e}"})
+
+        # Unchecked hash-based pyc (PEP 552): launcher.load_code() only checks the magic
+        data = bytearray(self.magic)
+        data += (0b01).to_bytes(4, "little")
+        data += importlib.util.source_hash(source)
+        data += marshal.dumps(code)
+
+        tmp = f"{pyc}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, pyc)
+        except OSError as e:
+            log(f"[PREFLIGHT] Could not cache bytecode of {file_path}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return None
+        _prune(self.cache_dir, self.max_entries)
+        return pyc
+
+
+class NativePreflight:
+    """
+    Compiles a C / C++ submission once with the local gcc / g++.
+    - the binary is kept in .cache/build/<sha256>, keyed by source + compiler
+      + flags + toolchain version: a resubmission or a regrade never recompiles
+    - compile errors are kept the same way (<sha256>.err) -> CompileError
+    - a hit refreshes the file's mtime; after a build, the oldest files
+      beyond max_entries are removed
+    """
+
+    def __init__(self, compilers=None, cache_dir=BUILD_DIR, max_entries=BUILD_CACHE_MAX_ENTRIES):
+        self.compilers = {language: dict(spec) for language, spec in COMPILERS.items()}
+        for language, spec in (compilers or {}).items():
+            self.compilers[language] = dict(self.compilers.get(language, {}), **spec)
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_entries = max_entries
+        # compiler -> `compiler --version` output ("" if not installed)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def toolchain(self, compiler):
+        with self._lock:
+            if compiler not in self._versions:
+                try:
+                    out = subprocess.run([compiler, "--version"], capture_output=True,
+                                         text=True, shell=False, timeout=10)
+                    self._versions[compiler] = out.stdout.strip() if out.returncode == 0 else ""
+                except (OSError, subprocess.SubprocessError):
+                    self._versions[compiler] = ""
+            return self._versions[compiler]
+
+    def build_config(self, language):
+        """
+        Everything besides the source that changes the binary.
+        """
+        spec = self.compilers[language]
+        return {"compiler": spec["compiler"], "flags": spec.get("flags", []),
+                "libs": spec.get("libs", []), "toolchain": self.toolchain(spec["compiler"])}
+
+    def check(self, file_path, language):
+        """
+        Returns the path of the compiled binary.
+        Raises CompileError, or OSError if the compiler is not installed.
+        """
+        config = self.build_config(language)
+        if not config["toolchain"]:
+            raise FileNotFoundError(f"Compiler not found: {config['compiler']}")
+
+        with open(file_path, "rb") as f:
+            source = f.read()
+        digest = hashlib.sha256(source)
+        digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+        binary = os.path.join(self.cache_dir, digest.hexdigest())
+
+        if os.path.exists(binary):
+            _touch(binary)
+            return binary
+        try:
+            with open(binary + ".err", "r", encoding="utf-8") as f:
+                error = json.load(f)
+            _touch(binary + ".err")
+            raise CompileError(error["text"], error["details"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{binary}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            self._compile(config, file_path, binary, tmp)
+        finally:
+            # _prune() never removes .tmp files: a failed build cleans up its own
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            _prune(self.cache_dir, self.max_entries)
+        return binary
+
+    def _compile(self, config, file_path, binary, tmp):
+        try:
+            out = subprocess.run(
+                [config["compiler"], *config["flags"], os.path.abspath(file_path),
+                 "-o", tmp, *config["libs"]],
+                capture_output=True, text=True, shell=False, timeout=COMPILE_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            raise CompileError("Compilation timed out", {
+                "line": None, "column": None,
+                "message": f"compilation took more than {COMPILE_TIMEOUT}s"
+            })
+
+        if out.returncode != 0:
+            text = out.stderr.strip()[:4000]
+            match = GCC_ERROR.search(out.stderr)
+            details = {
+                "line": int(match["line"]) if match else None,
+                "column": int(match["column"]) if match else None,
+                "message": f"error: {match['message']}" if match
+                           else (text.splitlines() or ["compilation failed"])[-1],
+            }
+            try:
+                with open(binary + ".err", "w", encoding="utf-8") as f:
+                    json.dump({"text": text, "details": details}, f)
+            except OSError as e:
+                log(f"[PREFLIGHT] Could not cache compile error of {file_path}: {e}")
+            raise CompileError(text, details)
+
+        os.replace(tmp, binary)
+
+
+# ---------------------------------------------------------
+# CACHE FOLDERS (.cache/pyc/, .cache/build/)
+# ---------------------------------------------------------
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _prune(cache_dir, max_entries):
+    """
+    Keeps the max_entries most recently used files of a cache folder.
+    """
+    try:
+        entries = []
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+    except OSError as e:
+        log(f"[PREFLIGHT] Could not list {cache_dir}: {e}")
+        return
+    if len(entries) <= max_entries:
+        return
+    entries.sort()
+    for _, path in entries[: len(entries) - max_entries]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    log(f"[PREFLIGHT] Cache {cache_dir} pruned to {max_entries} entries")
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import threading
+from eval_core.utils import log, file_lock
+
+QUEUE_FILE = os.path.join("data", "publish_queue.json")
+
+
+class PublishQueue:
+    """
+    Publishes results to the Git repo in the background.
+    - enqueue() returns at once, the evaluation never waits on the network
+    - students queued close together go out in ONE commit + ONE push
+    - failed pushes are retried with exponential backoff
+    - pending students are saved on disk: a crash / network outage
+      is caught up by the next run of the app
+    - the queue file is shared by every app.py of the machine (one per
+      student): changes are merged under a file lock, and only one process
+      at a time runs git on the clone, publishing everyone's pending results
+    """
+
+    def __init__(self, git_manager, queue_file=QUEUE_FILE, batch_window=1.0,
+                 base_delay=2.0, max_delay=120.0):
+        """
+        batch_window: seconds to wait for more students before publishing.
+        base_delay / max_delay: retry backoff bounds (seconds).
+        """
+        self.git = git_manager
+        self.queue_file = queue_file
+        # Short lock: read-modify-write of the queue file
+        self.queue_lock = queue_file + ".lock"
+        # Long lock: git add / commit / push on the shared clone
+        self.git_lock = queue_file + ".git.lock"
+        self.batch_window = batch_window
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        # Last known content of the shared queue file
+        self._pending = self._load()
+        if self._pending:
+            log(f"[PUBLISH] {len(self._pending)} results left from a previous run: "
+                f"{', '.join(self._pending)}")
+        self._failures = 0
+        self._closed = False
+        self._thread = None
+
+    # ---------------------------------------------------------
+    # PERSISTENCE
+    # ---------------------------------------------------------
+
+    def _load(self):
+        if not os.path.exists(self.queue_file):
+            return []
+        try:
+            with open(self.queue_file, "r", encoding="utf-8") as f:
+                return json.load(f).get("pending", [])
+        except (OSError, ValueError) as e:
+            log(f"[PUBLISH ERROR] Could not read {self.queue_file}: {e}")
+            return []
+
+    def _save(self, pending):
+        """
+        Atomic write of the pending list (queue file lock held).
+        """
+        folder = os.path.dirname(self.queue_file)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder, exist_ok=True)
+
+        tmp = f"{self.queue_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"pending": pending}, f, indent=4)
+        os.replace(tmp, self.queue_file)
+
+    def _update(self, change):
+        """
+        change(pending) -> new pending list, applied to the file as it is on
+        disk now (other processes may have changed it). Returns the new list.
+        """
+        with file_lock(self.queue_lock):
+            pending = self._load()
+            updated = change(pending)
+            if updated != pending:
+                self._save(updated)
+        return updated
+
+    # ---------------------------------------------------------
+    # PUBLIC API
+    # ---------------------------------------------------------
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._worker, name="publish-queue", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def enqueue(self, student_name):
+        pending = self._update(
+            lambda pending: pending if student_name in pending else pending + [student_name]
+        )
+        with self._cond:
+            self._pending = pending
+            self._cond.notify_all()
+        self.start()
+
+    def pending(self):
+        with self._cond:
+            return list(self._pending)
+
+    def flush(self, timeout=None):
+        """
+        Wait until everything queued is published.
+        Returns False if students are still pending after timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._pending and self._thread is not None and self._thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return not self._pending
+
+    def close(self, timeout=None):
+        done = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        return done
+
+    # ---------------------------------------------------------
+    # BACKGROUND PUBLISHER
+    # ---------------------------------------------------------
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+
+            # Let the other students finishing now join the same commit
+            time.sleep(self.batch_window)
+
+            start = time.perf_counter()
+            with file_lock(self.git_lock):
+                # Everyone's pending results, as they are once we hold the clone
+                # (another app.py may have just published ours)
+                batch = self._load()
+                published = self.git.publish_batch(batch) if batch else True
+                if published:
+                    pending = self._update(
+                        lambda pending: [s for s in pending if s not in batch]
+                    )
+                else:
+                    pending = self._load()
+
+            with self._cond:
+                self._pending = pending
+                if published:
+                    self._failures = 0
+                    if batch:
+                        log(f"[PUBLISH] {len(batch)} results pushed in "
+                            f"{(time.perf_counter() - start) * 1000:.0f} ms: {', '.join(batch)}")
+                    self._cond.notify_all()
+                    continue
+
+                self._failures += 1
+                delay = min(self.max_delay, self.base_delay * 2 ** (self._failures - 1))
+                log(f"[PUBLISH ERROR] Push failed (attempt {self._failures}), "
+                    f"retry in {delay:.0f}s for: {', '.join(batch)}")
+                self._cond.notify_all()
+                self._cond.wait(delay)
+                if self._closed:
+                    return
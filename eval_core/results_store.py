@@ -0,0 +1,273 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from eval_core.utils import log
+
+RESULTS_DIR = "results"
+RESULTS_DB = os.path.join("data", "results.db")
+# Bumped when the tables change: an older index is dropped and rebuilt from results/
+SCHEMA_VERSION = 2
+
+
+class ResultsStore:
+    """
+    SQLite index of every results.json (the JSON files stay the source of truth).
+    - updated on each save, one student at a time
+    - listings / filters / leaderboards are indexed queries, no file is opened
+    - import_tree() indexes an existing results/ folder (unchanged files skipped)
+    """
+
+    def __init__(self, db_path=RESULTS_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(db_path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder, exist_ok=True)
+
+        self._db = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        existing = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'students'"
+        ).fetchone() is not None
+        outdated = existing and self._db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION
+        if outdated:
+            self._db.executescript("DROP TABLE IF EXISTS students; DROP TABLE IF EXISTS exercises;")
+        self._db.executescript(
+            """CREATE TABLE IF NOT EXISTS students (
+                   student TEXT PRIMARY KEY,
+                   qcm_score NUMERIC NOT NULL,
+                   total_score NUMERIC NOT NULL,
+                   passed INTEGER NOT NULL,
+                   variant INTEGER,
+                   updated_at REAL NOT NULL,
+                   source TEXT,
+                   source_mtime_ns INTEGER
+               );
+               CREATE TABLE IF NOT EXISTS exercises (
+                   student TEXT NOT NULL,
+                   exercise TEXT NOT NULL,
+                   position INTEGER NOT NULL,
+                   success INTEGER NOT NULL,
+                   points NUMERIC NOT NULL,
+                   variation TEXT,
+                   efficiency REAL,
+                   PRIMARY KEY (student, exercise)
+               );
+               CREATE INDEX IF NOT EXISTS idx_total ON students(total_score DESC, student);
+               CREATE INDEX IF NOT EXISTS idx_passed ON students(passed, total_score DESC);
+               CREATE INDEX IF NOT EXISTS idx_exercise ON exercises(exercise, success);"""
+        )
+        self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._db.commit()
+
+        if outdated:
+            # The JSON files are the source of truth: index them again
+            self.import_tree()
+
+    # ---------------------------------------------------------
+    # WRITE
+    # ---------------------------------------------------------
+
+    def save(self, results, source=None):
+        """
+        Insert / replace one student's results (same dict as results.json).
+        """
+        with self._lock:
+            self._save(results, source)
+            self._db.commit()
+
+    def save_many(self, entries):
+        """
+        entries: iterable of (results, source), written in one transaction.
+        """
+        with self._lock:
+            for results, source in entries:
+                self._save(results, source)
+            self._db.commit()
+
+    def _save(self, results, source):
+        student = results["student"]
+        mtime_ns = None
+        if source is not None and os.path.exists(source):
+            mtime_ns = os.stat(source).st_mtime_ns
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (student, results.get("qcm_score", 0), results.get("total_score", 0),
+             int(bool(results.get("passed", False))), results.get("variant"), time.time(),
+             source, mtime_ns)
+        )
+        self._db.execute("DELETE FROM exercises WHERE student = ?", (student,))
+        # position: the exam order, kept as in results.json
+        self._db.executemany(
+            "INSERT OR REPLACE INTO exercises VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(student, exo["exercise"], position, int(bool(exo["success"])), exo["points"],
+              exo.get("variation"), exo.get("efficiency"))
+             for position, exo in enumerate(results.get("exercises", []))]
+        )
+
+    def delete(self, student):
+        with self._lock:
+            self._db.execute("DELETE FROM students WHERE student = ?", (student,))
+            self._db.execute("DELETE FROM exercises WHERE student = ?", (student,))
+            self._db.commit()
+
+    # ---------------------------------------------------------
+    # IMPORT AN EXISTING results/ TREE
+    # ---------------------------------------------------------
+
+    def import_tree(self, results_dir=RESULTS_DIR):
+        """
+        Index every results/<student>/results.json.
+        Files whose mtime did not change since the last import are skipped.
+        Returns (imported, skipped, errors).
+        """
+        start = time.perf_counter()
+        imported = skipped = errors = 0
+
+        if not os.path.isdir(results_dir):
+            return imported, skipped, errors
+
+        with self._lock:
+            known = dict(self._db.execute(
+                "SELECT source, source_mtime_ns FROM students WHERE source IS NOT NULL"
+            ).fetchall())
+
+            for entry in os.scandir(results_dir):
+                path = os.path.abspath(os.path.join(entry.path, "results.json"))
+                if not entry.is_dir() or not os.path.isfile(path):
+                    continue
+                if known.get(path) == os.stat(path).st_mtime_ns:
+                    skipped += 1
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        results = json.load(f)
+                    results.setdefault("student", entry.name)
+                    self._save(results, path)
+                    imported += 1
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    errors += 1
+                    log(f"[RESULTS ERROR] Could not import {path}: {e}")
+
+            self._db.commit()
+
+        log(f"[RESULTS] Imported {imported} results ({skipped} unchanged, {errors} errors) "
+            f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return imported, skipped, errors
+
+    # ---------------------------------------------------------
+    # QUERIES
+    # ---------------------------------------------------------
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    def get(self, student):
+        """
+        Returns the results dict of a student (results.json schema), or None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT qcm_score, total_score, passed, variant FROM students WHERE student = ?",
+                (student,)
+            ).fetchone()
+            if row is None:
+                return None
+            exercises = self._db.execute(
+                "SELECT exercise, success, points, variation, efficiency FROM exercises "
+                "WHERE student = ? ORDER BY position", (student,)
+            ).fetchall()
+
+        entries = []
+        for name, success, points, variation, ratio in exercises:
+            entry = {"exercise": name, "success": bool(success), "points": points}
+            # Optional keys, only written when set (same as results.json)
+            if variation is not None:
+                entry["variation"] = variation
+            if ratio is not None:
+                entry["efficiency"] = ratio
+            entries.append(entry)
+
+        results = {
+            "student": student,
+            "qcm_score": row[0],
+            "exercises": entries,
+            "total_score": row[1],
+            "passed": bool(row[2])
+        }
+        if row[3] is not None:
+            results["variant"] = row[3]
+        return results
+
+    def students(self, passed=None, exercise=None, exercise_success=None,
+                 order="name", limit=None, offset=0):
+        """
+        Rows (student, total_score, passed) matching the filters.
+        passed: True / False / None (any)
+        exercise + exercise_success: students who passed / failed that exercise
+            (a missing exercise counts as failed)
+        order: "name" or "score" (leaderboard)
+        """
+        query = "SELECT s.student, s.total_score, s.passed FROM students s"
+        where = []
+        params = []
+
+        if passed is not None:
+            where.append("s.passed = ?")
+            params.append(int(passed))
+
+        if exercise is not None:
+            sub = "SELECT 1 FROM exercises e WHERE e.student = s.student " \
+                  "AND e.exercise = ? AND e.success = 1"
+            where.append(("EXISTS" if exercise_success in (True, None) else "NOT EXISTS") + f" ({sub})")
+            params.append(exercise)
+
+        if where:
+            query += " WHERE " + " AND ".join(where)
+
+        if order == "score":
+            query += " ORDER BY s.total_score DESC, s.student"
+        else:
+            query += " ORDER BY s.student"
+
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [(student, total, bool(passed)) for student, total, passed in rows]
+
+    def leaderboard(self, limit=10, passed=None):
+        return self.students(passed=passed, order="score", limit=limit)
+
+    def exercise_stats(self):
+        """
+        {exercise: success count}
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT exercise, SUM(success) FROM exercises GROUP BY exercise ORDER BY exercise"
+            ).fetchall()
+        return dict(rows)
+
+
+# ---------------------------------------------------------
+# SHARED STORE
+# ---------------------------------------------------------
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_results_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultsStore()
+        return _store
@@ -1,21 +1,217 @@
 import subprocess
 import os
+import json
+import time
 import shlex
+import threading
+from collections import OrderedDict
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from eval_core.utils import log
+from eval_core.tracing import traced
+from eval_core.preflight import PythonPreflight, NativePreflight, CompileError
+from eval_core.warm_pool import WarmPythonPool, SERVER_SCRIPT
+from eval_core.fork_server import (
+    DEFAULT_LIMITS, communicate, finish_case, kill_group, max_output_bytes
+)
+from eval_core.launcher import LAUNCHER_SCRIPT, limits_arg
+from eval_core.stream_compare import StreamMatcher
+from eval_core.case_files import open_input, read_text
+
+# Submissions remembered as pre-flighted (least recently used dropped first)
+ARTIFACT_CACHE_SIZE = 512
 
 class SandboxResult:
-    def __init__(self, stdout, stderr, exit_code):
+    def __init__(self, stdout, stderr, exit_code, cpu_time=0.0, peak_rss_kb=0,
+                 wall_time=0.0, limit_exceeded=None, stream_match=None, mismatch=None,
+                 diverged=False, compile_error=None, internal_error=False):
         self.stdout = stdout
         self.stderr = stderr
         self.exit_code = exit_code
+        # Resource accounting of the run
+        self.cpu_time = cpu_time
+        self.peak_rss_kb = peak_rss_kb
+        self.wall_time = wall_time
+        # None, "time", "memory" or "output"
+        self.limit_exceeded = limit_exceeded
+        # Streaming comparison (stdout is not kept in that mode)
+        self.stream_match = stream_match
+        self.mismatch = mismatch
+        self.diverged = diverged
+        # Pre-flight: {"line", "column", "message"} when the submission does not compile
+        self.compile_error = compile_error
+        # The sandbox itself failed (spawn/fork error, lost worker...): not the
+        # submission's fault, such a result is never cached nor penalised
+        self.internal_error = internal_error
+
+    @classmethod
+    def from_dict(cls, res):
+        return cls(
+            res["stdout"], res["stderr"], res["exit_code"],
+            cpu_time=res.get("cpu_time", 0.0),
+            peak_rss_kb=res.get("peak_rss_kb", 0),
+            wall_time=res.get("wall_time", 0.0),
+            limit_exceeded=res.get("limit_exceeded"),
+            stream_match=res.get("stream_match"),
+            mismatch=res.get("mismatch"),
+            diverged=res.get("diverged", False),
+            compile_error=res.get("compile_error"),
+            internal_error=res.get("internal_error", False)
+        )
+
+    @classmethod
+    def failure(cls, error):
+        """
+        Result of a run the sandbox could not carry out.
+        """
+        return cls("", str(error), 1, internal_error=True)
+
+
+class _CaseHandle:
+    """
+    Lets another thread kill a test case that is still running.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self.cancelled = False
+
+    def attach(self, pid):
+        """
+        Returns False if the case was cancelled before it even started.
+        """
+        with self._lock:
+            self._pid = pid
+            return not self.cancelled
+
+    def finish(self):
+        """
+        Called before the child is reaped: its pid must not be signalled anymore.
+        """
+        with self._lock:
+            self._pid = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._pid is not None:
+                kill_group(self._pid)
 
 
 class SandboxRunner:
     #regex security
     SAFE_REGEX = r"^[a-zA-Z0-9_\-\.\/]+$"
 
-    def __init__(self, timeout=2):
+    def __init__(self, timeout=2, backend="subprocess", pool_size=2, limits=None,
+                 compilers=None):
+        """
+        backend (Python):
+        - "subprocess" : one fresh python3 process per test (default)
+        - "warm"       : fork from a pool of pre-started interpreters (POSIX only)
+        limits: cpu_seconds / memory_mb / max_output_kb, optional max_processes
+                (Linux rlimits, see DEFAULT_LIMITS)
+        compilers: overrides of preflight.COMPILERS (C / C++ binaries always
+                   run as one process per test)
+        """
         self.timeout = timeout
+        self.backend = backend
+        self.pool = None
+        self.sandbox_limits = dict(DEFAULT_LIMITS)
+        self.sandbox_limits.update(limits or {})
+        self.python_preflight = PythonPreflight()
+        self.native_preflight = NativePreflight(compilers)
+        # abspath -> ((mtime_ns, size), compiled artifact or None), LRU order
+        self._artifacts = OrderedDict()
+        self._artifacts_lock = threading.Lock()
+
+        if backend == "warm":
+            try:
+                self.pool = WarmPythonPool(size=pool_size)
+            except Exception as e:
+                log(f"[SANDBOX ERROR] Warm pool unavailable, using subprocess: {e}")
+                self.backend = "subprocess"
+
+    def limits(self, language="python"):
+        """
+        Execution limits that can change a verdict (part of the verdict cache key),
+        plus the compiler, flags and toolchain version for a compiled language.
+        """
+        limits = dict(self.sandbox_limits, timeout=self.timeout)
+        if language in self.native_preflight.compilers:
+            limits["build"] = self.native_preflight.build_config(language)
+        return limits
+
+    def _runner(self, language):
+        """
+        One-case runner of a language: run(file_path, input_data, handle, expected).
+        """
+        if language == "python":
+            return self._run_python
+        if language in self.native_preflight.compilers:
+            return partial(self._run_native, language=language)
+        raise ValueError(f"Language not supported: {language}")
+
+    # -----------------------------------------
+    # PRE-FLIGHT (compile once, before any run)
+    # -----------------------------------------
+
+    @traced("sandbox.preflight", "sandbox")
+    def preflight(self, file_path, language):
+        """
+        None if the submission can be run, otherwise a SandboxResult with
+        compile_error set (nothing is spawned).
+        The C / C++ binary / Python bytecode is kept for the following runs.
+        """
+        if language == "python":
+            check = self.python_preflight.check
+        elif language in self.native_preflight.compilers:
+            check = partial(self.native_preflight.check, language=language)
+        else:
+            return None
+
+        try:
+            st = os.stat(file_path)
+            path = os.path.abspath(file_path)
+            with self._artifacts_lock:
+                entry = self._artifacts.get(path)
+                if entry is not None:
+                    self._artifacts.move_to_end(path)
+            if entry is not None and entry[0] == (st.st_mtime_ns, st.st_size) \
+                    and (entry[1] is None or os.path.exists(entry[1])):
+                return None
+            artifact = check(file_path)
+        except CompileError as e:
+            log(f"[PREFLIGHT] Compile error in {file_path}: {e.details['message']} "
+                f"(line {e.details['line']})")
+            return SandboxResult("", str(e), 1, compile_error=e.details)
+        except OSError as e:
+            log(f"[SANDBOX ERROR] {e}")
+            return SandboxResult.failure(e)
+
+        with self._artifacts_lock:
+            self._artifacts[path] = ((st.st_mtime_ns, st.st_size), artifact)
+            self._artifacts.move_to_end(path)
+            while len(self._artifacts) > ARTIFACT_CACHE_SIZE:
+                self._artifacts.popitem(last=False)
+        return None
+
+    def _artifact(self, file_path):
+        """
+        Compiled artifact of file_path if it did not change since the pre-flight.
+        """
+        path = os.path.abspath(file_path)
+        with self._artifacts_lock:
+            entry = self._artifacts.get(path)
+        if entry is None or entry[1] is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if entry[0] != (st.st_mtime_ns, st.st_size) or not os.path.exists(entry[1]):
+            return None
+        return entry[1]
 
     # -----------------------------------------
     # SAFETY: validate file path
@@ -45,15 +241,171 @@ class SandboxRunner:
     # -----------------------------------------
 
 
-    def _run_python(self, file_path, input_data):
+    @traced("sandbox.python", "sandbox")
+    def _run_python(self, file_path, input_data, handle=None, expected=None):
         if input_data is None:
             input_data = ""
 
-        cmd = ["python3", file_path]
+        if handle is not None and handle.cancelled:
+            return SandboxResult("", "Cancelled", 1)
+
+        if self.pool is not None and handle is None:
+            res = self.pool.run(file_path, input_data, self.timeout, self.sandbox_limits,
+                                expected)
+            return SandboxResult.from_dict(res)
+
+        # sys.path[0] / __file__ stay the student's folder / file, even when
+        # the launcher starts from the pre-flight bytecode
+        try:
+            if os.name != "posix":
+                return self._run_process_portable(["python3", file_path], input_data)
+            return self._run_process("python", file_path, input_data, handle, expected,
+                                     pyc=self._artifact(file_path))
+        except Exception as e:
+            log(f"[SANDBOX ERROR] {e}")
+            return SandboxResult.failure(e)
+
+    # -----------------------------------------
+    # C / C++ Runner (compiled once, see preflight.NativePreflight)
+    # -----------------------------------------
+
+    @traced("sandbox.native", "sandbox")
+    def _run_native(self, file_path, input_data, handle=None, expected=None, language="c"):
+        if input_data is None:
+            input_data = ""
+
+        if handle is not None and handle.cancelled:
+            return SandboxResult("", "Cancelled", 1)
+
+        binary = self._artifact(file_path)
+        if binary is None:
+            # Not pre-flighted (or changed since): build it now, from the cache if possible
+            failed = self.preflight(file_path, language)
+            if failed is not None:
+                return failed
+            binary = self._artifact(file_path)
+
+        try:
+            if os.name != "posix":
+                return self._run_process_portable([binary], input_data)
+            return self._run_process("native", binary, input_data, handle, expected)
+        except Exception as e:
+            log(f"[SANDBOX ERROR] {e}")
+            return SandboxResult.failure(e)
+
+    # -----------------------------------------
+    # Process launcher (rlimits + resource accounting, Linux)
+    # -----------------------------------------
+
+    def _launcher(self, kind, path, report_fd, pyc=None):
+        """
+        Command that applies the rlimits in the new process, then runs path
+        (launcher.py): no preexec_fn, which is unsafe with threads.
+        report_fd: write end of the pipe a MemoryError is reported on.
+        pyc: compiled Python source, run instead of recompiling path.
+        """
+        cmd = ["python3", LAUNCHER_SCRIPT, limits_arg(self.sandbox_limits),
+               str(report_fd), kind, os.path.abspath(path)]
+        return cmd + [pyc] if pyc is not None else cmd
+
+    def _run_process(self, kind, path, input_data, handle=None, expected=None, pyc=None):
+        """
+        Runs path ("python" file or "native" binary) through the launcher.
+        expected: streaming comparison, the child is killed as soon as
+        its stdout diverges (stdout is then not kept in memory).
+        """
+        limits = self.sandbox_limits
+        matcher = StreamMatcher(expected) if expected is not None else None
+        in_r, in_w = os.pipe()
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        report_r, report_w = os.pipe()
+
+        started = time.monotonic()
+        try:
+            process = subprocess.Popen(
+                self._launcher(kind, path, report_w, pyc),
+                stdin=in_r,
+                stdout=out_w,
+                stderr=err_w,
+                pass_fds=(report_w,),
+                start_new_session=True
+            )
+        except Exception:
+            for fd in (in_w, out_r, err_r, report_r):
+                os.close(fd)
+            raise
+        finally:
+            for fd in (in_r, out_w, err_w, report_w):
+                os.close(fd)
+
+        if handle is not None and not handle.attach(process.pid):
+            kill_group(process.pid)
+
+        with open_input(input_data) as input_bytes:
+            stdout, stderr, timed_out, stop = communicate(
+                process.pid, in_w, out_r, err_r, input_bytes, self.timeout,
+                max_output_bytes(limits), matcher.feed if matcher else None
+            )
+
+        if handle is not None:
+            handle.finish()
+
+        res = finish_case(process.pid, stdout, stderr, timed_out, stop, started, limits, matcher,
+                          report_r)
+        # Reaped by wait4: Popen must not wait for it again
+        process.returncode = res["exit_code"]
+        return SandboxResult.from_dict(res)
+
+    def _run_process_portable(self, cmd, input_data):
+        """
+        Fallback without rlimits / wait4 (non POSIX systems).
+        """
+        started = time.monotonic()
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+
+        try:
+            stdout, stderr = process.communicate(
+                read_text(input_data), timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            return SandboxResult("", "Timeout", 1, limit_exceeded="time",
+                                 wall_time=time.monotonic() - started)
+
+        return SandboxResult(stdout, stderr, process.returncode,
+                             wall_time=time.monotonic() - started)
+
+    # -----------------------------------------
+    # Python multi-case runner (one launch, all inputs)
+    # -----------------------------------------
+
+    @traced("sandbox.run_many", "sandbox")
+    def _run_python_many(self, file_path, inputs, stop_on_error, expected):
+        if self.pool is not None:
+            results = self.pool.run_many(file_path, inputs, self.timeout, stop_on_error,
+                                         self.sandbox_limits, expected)
+            return [SandboxResult.from_dict(r) for r in results]
+
+        if os.name != "posix":
+            # No fork: one process per case
+            return self._run_sequential(self._run_python, file_path, inputs, stop_on_error,
+                                        expected)
+
+        request = {"file": os.path.abspath(file_path), "inputs": list(inputs),
+                   "timeout": self.timeout, "stop_on_error": stop_on_error,
+                   "limits": self.sandbox_limits, "expected": expected}
 
         try:
             process = subprocess.Popen(
-                cmd,
+                ["python3", SERVER_SCRIPT, "--once"],
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
@@ -61,30 +413,126 @@ class SandboxRunner:
             )
 
             stdout, stderr = process.communicate(
-                input_data, timeout=self.timeout
+                json.dumps(request), timeout=self.timeout * len(request["inputs"]) + 5
             )
+            response = json.loads(stdout)
+            if "error" in response:
+                raise RuntimeError(response["error"])
 
-            return SandboxResult(stdout, stderr, process.returncode)
+            return [SandboxResult.from_dict(r) for r in response["results"]]
         except subprocess.TimeoutExpired:
             process.kill()
-            return SandboxResult("", "Timeout", 1)
+            process.communicate()
+            return [SandboxResult("", "Timeout", 1, limit_exceeded="time")]
 
         except Exception as e:
-            return SandboxResult("", str(e), 1)
+            log(f"[SANDBOX ERROR] {e}")
+            return [SandboxResult.failure(e)]
+
+    def _run_sequential(self, runner, file_path, inputs, stop_on_error, expected):
+        """
+        One process per case, in order (compiled binaries, non-POSIX Python).
+        """
+        results = []
+        for index, input_data in enumerate(inputs):
+            result = runner(file_path, input_data,
+                            expected=expected[index] if expected is not None else None)
+            results.append(result)
+            if stop_on_error and (result.exit_code != 0 or result.stderr.strip() != ""
+                                  or result.stream_match is False):
+                break
+        return results
+
+    # -----------------------------------------
+    # Concurrent runner (bounded thread pool)
+    # -----------------------------------------
+
+    @traced("sandbox.run_concurrent", "sandbox")
+    def _run_concurrent(self, runner, file_path, inputs, check, max_workers, expected):
+        """
+        Every case is its own process, several run at the same time.
+        As soon as case i fails, all the cases after i are cancelled/killed;
+        the cases before i still finish (an earlier one may fail first).
+        """
+        inputs = list(inputs)
+        if not inputs:
+            return []
+
+        handles = [_CaseHandle() for _ in inputs]
+        results = [None] * len(inputs)
+        first_failure = len(inputs)
+        workers = max_workers or min(len(inputs), os.cpu_count() or 1)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(runner, file_path, input_data, handle,
+                            expected[index] if expected is not None else None): index
+                for index, (input_data, handle) in enumerate(zip(inputs, handles))
+            }
+
+            for future in as_completed(futures):
+                index = futures[future]
+                if index > first_failure:
+                    continue
+
+                results[index] = future.result()
+                if not check(index, results[index]):
+                    first_failure = index
+                    for later in range(index + 1, len(inputs)):
+                        handles[later].cancel()
+                    for other, other_index in futures.items():
+                        if other_index > index:
+                            other.cancel()
+
+        return results[: first_failure + 1]
 
     # -----------------------------------------
     # MAIN SANDBOX EXECUTION
     # -----------------------------------------
 
-    def run(self, file_path, language, input_data):
+    def run(self, file_path, language, input_data, expected=None):
+        """
+        input_data: string, or {"file": path} for a file-backed case.
+        expected: optional streaming comparison (kill on first divergence,
+        see result.stream_match / result.mismatch).
+        """
+        try:
+            return self._runner(language)(file_path, input_data, expected=expected)
+        except Exception as e:
+            log(f"[SANDBOX ERROR] {e}")
+            return SandboxResult.failure(e)
+
+    def run_many(self, file_path, language, inputs, stop_on_error=True, expected=None):
+        """
+        Multi-case mode: one sandbox launch for all the inputs of an exercise.
+        Every case keeps its own stdin/stdout capture and its own result.
+        expected: list of expected outputs for streaming comparison.
+        Returns the SandboxResults in order (may stop early on a failure).
+        """
         try:
             if language == "python":
-                return self._run_python(file_path, input_data)
-            else:
-                raise ValueError(f"Language not supported: {language}")
+                return self._run_python_many(file_path, inputs, stop_on_error, expected)
+            # Compiled binary: starting it is cheap, one process per case
+            return self._run_sequential(self._runner(language), file_path, inputs,
+                                        stop_on_error, expected)
         except Exception as e:
             log(f"[SANDBOX ERROR] {e}")
-            return SandboxResult("", str(e), 1)
+            return [SandboxResult.failure(e)]
+
+    def run_concurrent(self, file_path, language, inputs, check=None, max_workers=None,
+                       expected=None):
+        """
+        Concurrent mode: all the cases of an exercise run in parallel.
+        check(index, result) -> True when the case passed (default: no crash).
+        expected: list of expected outputs for streaming comparison.
+        Returns the SandboxResults in order, up to the first failing case.
+        """
+        if check is None:
+            check = lambda index, result: result.exit_code == 0 and result.stderr.strip() == ""
 
-    #TODO: add memory quota (linux only), add cpu limit, add audit stderr to detect file
-    #add other langage runner
\ No newline at end of file
+        try:
+            return self._run_concurrent(self._runner(language), file_path, inputs, check,
+                                        max_workers, expected)
+        except Exception as e:
+            log(f"[SANDBOX ERROR] {e}")
+            return [SandboxResult.failure(e)]
@@ -0,0 +1,430 @@
+import io
+import os
+import re
+import time
+import keyword
+import sqlite3
+import builtins
+import hashlib
+import tokenize
+import threading
+from itertools import combinations
+from collections import Counter
+from eval_core.utils import log
+
+RESULTS_DIR = "results"
+SIMILARITY_DB = os.path.join("data", "similarity.db")
+
+KGRAM = 10             # normalised tokens per k-gram (shorter matches are noise)
+WINDOW = 5             # winnowing window: any match of KGRAM + WINDOW - 1 tokens is found
+COMMON_FRACTION = 0.3  # fingerprints shared by more submissions are boilerplate
+COMMON_MIN = 3         # ...but always keep those shared by up to 3 submissions
+MIN_FINGERPRINTS = 5   # submissions too short to judge are left out of the report
+
+PYTHON_NAMES = set(keyword.kwlist) | set(dir(builtins))
+
+C_KEYWORDS = {
+    "auto", "break", "case", "char", "const", "continue", "default", "do", "double",
+    "else", "enum", "extern", "float", "for", "goto", "if", "inline", "int", "long",
+    "register", "return", "short", "signed", "sizeof", "static", "struct", "switch",
+    "typedef", "union", "unsigned", "void", "volatile", "while", "bool", "true", "false",
+    "class", "namespace", "using", "template", "typename", "public", "private",
+    "protected", "new", "delete", "this", "include", "define", "std",
+    "printf", "scanf", "puts", "main", "cout", "cin", "endl", "string", "vector",
+}
+
+C_TOKEN = re.compile(r"""
+      (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+    | (?P<number>\b\d[\w.]*)
+    | (?P<name>[A-Za-z_]\w*)
+    | (?P<op><<=|>>=|->|\+\+|--|<<|>>|<=|>=|==|!=|&&|\|\||::|[-+*/%=<>!&|^~?:;,.(){}\[\]#])
+""", re.S | re.X)
+
+
+# ---------------------------------------------------------
+# TOKENS (identifiers, literals and layout do not matter)
+# ---------------------------------------------------------
+
+def _python_tokens(source):
+    """
+    [(token, line)]: keywords / builtins / operators kept,
+    other names -> V, numbers -> N, strings -> S, blocks -> { }.
+    """
+    tokens = []
+    for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+        kind, text, line = tok.type, tok.string, tok.start[0]
+        if kind == tokenize.NAME:
+            tokens.append((text if text in PYTHON_NAMES else "V", line))
+        elif kind == tokenize.NUMBER:
+            tokens.append(("N", line))
+        elif kind == tokenize.STRING or tokenize.tok_name[kind].startswith("FSTRING"):
+            if not tokens or tokens[-1][0] != "S":
+                tokens.append(("S", line))
+        elif kind == tokenize.OP:
+            tokens.append((text, line))
+        elif kind == tokenize.NEWLINE:
+            tokens.append((";", line))
+        elif kind == tokenize.INDENT:
+            tokens.append(("{", line))
+        elif kind == tokenize.DEDENT:
+            tokens.append(("}", line))
+    return tokens
+
+
+def _c_tokens(source):
+    """
+    Same normalisation for C / C++ (and the fallback for anything else).
+    """
+    tokens = []
+    line, last = 1, 0
+    for match in C_TOKEN.finditer(source):
+        line += source.count("\n", last, match.start())
+        last = match.start()
+        kind, text = match.lastgroup, match.group()
+        if kind == "comment":
+            continue
+        if kind == "name":
+            tokens.append((text if text in C_KEYWORDS else "V", line))
+        elif kind == "number":
+            tokens.append(("N", line))
+        elif kind == "string":
+            tokens.append(("S", line))
+        else:
+            tokens.append((text, line))
+    return tokens
+
+
+def tokens_of(source, path):
+    if path.endswith(".py"):
+        try:
+            return _python_tokens(source)
+        except (tokenize.TokenError, IndentationError, SyntaxError):
+            pass  # does not even tokenize: the generic tokenizer still works
+    return _c_tokens(source)
+
+
+# ---------------------------------------------------------
+# WINNOWING (Schleimer, Wilkerson, Aiken 2003)
+# ---------------------------------------------------------
+
+def _kgram_hash(tokens):
+    digest = hashlib.blake2b("\x1f".join(tokens).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)  # fits a SQLite INTEGER
+
+
+def fingerprints(tokens, k=KGRAM, window=WINDOW):
+    """
+    {hash: first line}: the minimum hash of every window of `window`
+    consecutive k-gram hashes (rightmost on ties, each selection once).
+    """
+    texts = [text for text, _ in tokens]
+    hashes = [(_kgram_hash(texts[i:i + k]), tokens[i][1]) for i in range(len(texts) - k + 1)]
+    if not hashes:
+        return {}
+
+    selected = {}
+    last = -1
+    for start in range(max(1, len(hashes) - window + 1)):
+        end = min(start + window, len(hashes))
+        best = start
+        for i in range(start, end):
+            if hashes[i][0] <= hashes[best][0]:
+                best = i
+        if best != last:
+            value, line = hashes[best]
+            selected.setdefault(value, line)
+            last = best
+    return selected
+
+
+def line_ranges(lines):
+    """
+    [3, 4, 5, 9] -> "3-5, 9"
+    """
+    ranges = []
+    for line in sorted(set(lines)):
+        if ranges and line == ranges[-1][1] + 1:
+            ranges[-1][1] = line
+        else:
+            ranges.append([line, line])
+    return ", ".join(f"{a}-{b}" if a != b else str(a) for a, b in ranges)
+
+
+# ---------------------------------------------------------
+# INVERTED INDEX (fingerprint -> submissions)
+# ---------------------------------------------------------
+
+class SimilarityIndex:
+    """
+    SQLite inverted index of the winnowed fingerprints of every submission.
+    - add() re-fingerprints one submission only if its file changed
+    - suspicious_pairs() only walks the postings of the shared fingerprints:
+      cost ~ number of fingerprints, not number of pairs of students
+    """
+
+    def __init__(self, db_path=SIMILARITY_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(db_path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder, exist_ok=True)
+
+        self._db = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """CREATE TABLE IF NOT EXISTS submissions (
+                   id INTEGER PRIMARY KEY,
+                   student TEXT NOT NULL,
+                   exercise TEXT NOT NULL,
+                   path TEXT NOT NULL,
+                   sha256 TEXT NOT NULL,
+                   mtime_ns INTEGER,
+                   size INTEGER,
+                   fingerprints INTEGER NOT NULL,
+                   indexed_at REAL NOT NULL,
+                   UNIQUE (student, exercise)
+               );
+               CREATE TABLE IF NOT EXISTS fingerprints (
+                   exercise TEXT NOT NULL,
+                   hash INTEGER NOT NULL,
+                   submission INTEGER NOT NULL,
+                   line INTEGER NOT NULL,
+                   PRIMARY KEY (exercise, hash, submission)
+               ) WITHOUT ROWID;
+               CREATE INDEX IF NOT EXISTS idx_fp_submission ON fingerprints(submission);"""
+        )
+        self._db.commit()
+
+    # ---------------------------------------------------------
+    # WRITE (incremental)
+    # ---------------------------------------------------------
+
+    def add(self, student, exercise, path):
+        """
+        Index (or re-index) one submission. Returns False if it did not change.
+        """
+        with self._lock:
+            changed = self._add(student, exercise, path)
+            self._db.commit()
+        return changed
+
+    def add_many(self, entries):
+        """
+        entries: iterable of (student, exercise, path), written in one transaction.
+        Returns the number of submissions (re-)indexed.
+        """
+        indexed = 0
+        with self._lock:
+            for student, exercise, path in entries:
+                try:
+                    indexed += self._add(student, exercise, path)
+                except (OSError, ValueError) as e:
+                    log(f"[SIMILARITY ERROR] Could not index {path}: {e}")
+            self._db.commit()
+        return indexed
+
+    def _add(self, student, exercise, path):
+        st = os.stat(path)
+        row = self._db.execute(
+            "SELECT id, sha256, mtime_ns, size FROM submissions WHERE student = ? AND exercise = ?",
+            (student, exercise)
+        ).fetchone()
+        if row is not None and (row[2], row[3]) == (st.st_mtime_ns, st.st_size):
+            return False
+
+        with open(path, "rb") as f:
+            data = f.read()
+        sha = hashlib.sha256(data).hexdigest()
+        if row is not None and row[1] == sha:
+            # Touched, not modified
+            self._db.execute("UPDATE submissions SET path = ?, mtime_ns = ?, size = ? WHERE id = ?",
+                             (path, st.st_mtime_ns, st.st_size, row[0]))
+            return False
+
+        prints = fingerprints(tokens_of(data.decode("utf-8", errors="replace"), path))
+        if row is not None:
+            self._db.execute("DELETE FROM fingerprints WHERE submission = ?", (row[0],))
+            self._db.execute("DELETE FROM submissions WHERE id = ?", (row[0],))
+
+        cur = self._db.execute(
+            "INSERT INTO submissions (student, exercise, path, sha256, mtime_ns, size, "
+            "fingerprints, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (student, exercise, path, sha, st.st_mtime_ns, st.st_size, len(prints), time.time())
+        )
+        self._db.executemany(
+            "INSERT INTO fingerprints VALUES (?, ?, ?, ?)",
+            [(exercise, value, cur.lastrowid, line) for value, line in prints.items()]
+        )
+        return True
+
+    def remove(self, student, exercise):
+        with self._lock:
+            self._remove(student, exercise)
+            self._db.commit()
+
+    def _remove(self, student, exercise):
+        self._db.execute(
+            "DELETE FROM fingerprints WHERE submission IN "
+            "(SELECT id FROM submissions WHERE student = ? AND exercise = ?)", (student, exercise)
+        )
+        self._db.execute("DELETE FROM submissions WHERE student = ? AND exercise = ?",
+                         (student, exercise))
+
+    def index_tree(self, catalog, results_dir=RESULTS_DIR):
+        """
+        Index every results/<student>/<expected file> of the catalog's exercises.
+        Unchanged files are skipped, vanished ones are dropped.
+        Returns (indexed, unchanged, removed).
+        """
+        start = time.perf_counter()
+        indexed = unchanged = removed = 0
+        if not os.path.isdir(results_dir):
+            return indexed, unchanged, removed
+
+        expected = {}
+        for name in catalog.names():
+            try:
+                expected[name] = catalog.expected_filenames(name)
+            except (FileNotFoundError, KeyError, ValueError):
+                continue
+
+        with self._lock:
+            seen = set()
+            for entry in os.scandir(results_dir):
+                if not entry.is_dir():
+                    continue
+                for exercise, filenames in expected.items():
+                    for filename in filenames:
+                        path = os.path.abspath(os.path.join(entry.path, filename))
+                        if not os.path.isfile(path):
+                            continue
+                        seen.add((entry.name, exercise))
+                        try:
+                            if self._add(entry.name, exercise, path):
+                                indexed += 1
+                            else:
+                                unchanged += 1
+                        except (OSError, ValueError) as e:
+                            log(f"[SIMILARITY ERROR] Could not index {path}: {e}")
+                        break
+
+            root = os.path.abspath(results_dir) + os.sep
+            for student, exercise, path in self._db.execute(
+                "SELECT student, exercise, path FROM submissions"
+            ).fetchall():
+                if path.startswith(root) and (student, exercise) not in seen:
+                    self._remove(student, exercise)
+                    removed += 1
+
+            self._db.commit()
+
+        log(f"[SIMILARITY] Indexed {indexed} submissions ({unchanged} unchanged, "
+            f"{removed} removed) in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return indexed, unchanged, removed
+
+    # ---------------------------------------------------------
+    # QUERIES
+    # ---------------------------------------------------------
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+    def suspicious_pairs(self, exercise=None, min_similarity=0.5, limit=20):
+        """
+        Pairs of submissions of the same exercise sharing fingerprints, best first:
+        [{"exercise", "students", "paths", "shared", "similarity"}].
+        similarity = shared / fingerprints of the smaller submission
+        (1.0 = one is entirely contained in the other).
+        Fingerprints shared by too many submissions (boilerplate) are ignored.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            if exercise is None:
+                exercises = [row[0] for row in self._db.execute(
+                    "SELECT DISTINCT exercise FROM submissions ORDER BY exercise")]
+            else:
+                exercises = [exercise]
+
+            pairs = []
+            for name in exercises:
+                submissions = {
+                    row[0]: row[1:] for row in self._db.execute(
+                        "SELECT id, student, path, fingerprints FROM submissions "
+                        "WHERE exercise = ?", (name,))
+                }
+                common = max(COMMON_MIN, int(COMMON_FRACTION * len(submissions)))
+                shared = self._shared_counts(name, common)
+
+                for (a, b), count in shared.items():
+                    if submissions[a][0] > submissions[b][0]:
+                        a, b = b, a
+                    smaller = min(submissions[a][2], submissions[b][2])
+                    if smaller < MIN_FINGERPRINTS:
+                        continue
+                    similarity = round(count / smaller, 3)
+                    if similarity >= min_similarity:
+                        pairs.append({
+                            "exercise": name,
+                            "ids": (a, b),
+                            "students": (submissions[a][0], submissions[b][0]),
+                            "paths": (submissions[a][1], submissions[b][1]),
+                            "shared": count,
+                            "similarity": similarity,
+                        })
+
+        pairs.sort(key=lambda p: (-p["similarity"], -p["shared"], p["exercise"], p["students"]))
+        log(f"[SIMILARITY] {len(pairs)} pairs >= {min_similarity} in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms")
+        return pairs[:limit] if limit is not None else pairs
+
+    def _shared_counts(self, exercise, common):
+        """
+        {(submission a, submission b): shared fingerprints}, a < b.
+        One ordered scan of the exercise's postings (primary key order):
+        every posting list of 2..common submissions adds 1 to each of its pairs.
+        """
+        counts = Counter()
+        current, posting = None, []
+        for value, submission in self._db.execute(
+            "SELECT hash, submission FROM fingerprints WHERE exercise = ? ORDER BY hash, submission",
+            (exercise,)
+        ):
+            if value != current:
+                if 2 <= len(posting) <= common:
+                    counts.update(combinations(posting, 2))
+                current, posting = value, []
+            posting.append(submission)
+        if 2 <= len(posting) <= common:
+            counts.update(combinations(posting, 2))
+        return counts
+
+    def shared_lines(self, a, b):
+        """
+        (lines of submission a, lines of submission b) covered by shared fingerprints.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                """SELECT fa.line, fb.line FROM fingerprints fa
+                   JOIN fingerprints fb ON fb.exercise = fa.exercise AND fb.hash = fa.hash
+                   WHERE fa.submission = ? AND fb.submission = ?""", (a, b)
+            ).fetchall()
+        return [row[0] for row in rows], [row[1] for row in rows]
+
+
+# ---------------------------------------------------------
+# SHARED INDEX
+# ---------------------------------------------------------
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_similarity_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SimilarityIndex()
+        return _index
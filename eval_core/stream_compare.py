@@ -0,0 +1,146 @@
+# Incremental output comparison (stdlib only: also imported by fork_server.py).
+# Same rule as Comparator.compare: got.rstrip() == expected.rstrip(),
+# checked chunk by chunk while the child is still running.
+# Whitespace is str.isspace() on the decoded text, Unicode included, and
+# any amount of it may follow the expected output (bounded only by the
+# sandbox output limit): nothing is accepted here that rstrip() would not.
+
+import codecs
+
+try:
+    from eval_core.case_files import expected_core
+except ImportError:  # executed as a script from eval_core/
+    from case_files import expected_core
+
+LINE_PREVIEW = 200
+
+
+class StreamMatcher:
+    """
+    feed() the child's stdout as it arrives; it returns False as soon as
+    the output can no longer match (divergence or output too long).
+    finish() gives the final answer once the child is done.
+    mismatch: {"line", "column", "expected", "got"} of the first difference.
+    expected: string, or {"file": path} read through a memory map.
+    """
+
+    def __init__(self, expected):
+        self.core, self.size = expected_core(expected)
+        self.pos = 0
+        # Output past the expected one, decoded across chunk borders
+        self._tail = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.mismatch = None
+        self._pending_cr = False
+        # Position in the student's output (for the report)
+        self._line = 1
+        self._column = 0
+        self._current = b""
+
+    # -----------------------------------------
+    # FEED
+    # -----------------------------------------
+
+    def _newlines(self, data):
+        """
+        Universal newlines across chunk borders (\\r\\n -> \\n).
+        """
+        if self._pending_cr:
+            data = b"\r" + data
+            self._pending_cr = False
+        if data.endswith(b"\r"):
+            data = data[:-1]
+            self._pending_cr = True
+        return data.replace(b"\r\n", b"\n")
+
+    def _advance(self, data):
+        nl = data.rfind(b"\n")
+        if nl == -1:
+            self._column += len(data)
+            self._current = (self._current + data)[-LINE_PREVIEW:]
+        else:
+            self._line += data.count(b"\n")
+            self._column = len(data) - nl - 1
+            self._current = data[nl + 1:][-LINE_PREVIEW:]
+
+    def feed(self, data):
+        if self.mismatch is not None:
+            return False
+
+        data = self._newlines(data)
+        core = self.core
+        size = self.size
+
+        # Part of the chunk still inside the expected output
+        if self.pos < size and data:
+            n = min(len(data), size - self.pos)
+            if data[:n] != core[self.pos:self.pos + n]:
+                i = next(k for k in range(n) if data[k] != core[self.pos + k])
+                self._advance(data[:i])
+                self._diverge(self.pos + i, data[i:])
+                return False
+            self._advance(data[:n])
+            self.pos += n
+            data = data[n:]
+
+        # Beyond the expected output: only trailing whitespace is allowed
+        if data:
+            return self._feed_tail(data)
+
+        return True
+
+    def _feed_tail(self, data, final=False):
+        carried = len(self._tail.getstate()[0])
+        text = self._tail.decode(data, final)
+        stripped = text.lstrip()
+        if stripped:
+            # Byte offset of the first non-whitespace character
+            n = max(0, len(text[:len(text) - len(stripped)].encode("utf-8")) - carried)
+            self._advance(data[:n])
+            self._diverge(self.size, data[n:] or stripped.encode("utf-8"))
+            return False
+        self._advance(data)
+        return True
+
+    def finish(self):
+        """
+        True if everything fed matches the expected output.
+        """
+        if self._pending_cr:
+            self._pending_cr = False
+            self.feed(b"\n")
+        if self.mismatch is None:
+            # An unfinished UTF-8 sequence is not whitespace
+            self._feed_tail(b"", final=True)
+        if self.mismatch is None and self.pos < self.size:
+            self._diverge(self.pos, b"")
+        return self.mismatch is None
+
+    # -----------------------------------------
+    # MISMATCH REPORT (1-based line / column of the student's output)
+    # -----------------------------------------
+
+    def _diverge(self, offset, rest):
+        core = self.core
+
+        if offset < self.size:
+            line_start = core.rfind(b"\n", 0, offset) + 1
+            line_end = core.find(b"\n", offset, self.size)
+            if line_end == -1:
+                line_end = self.size
+            expected = core[line_start:min(line_end, line_start + LINE_PREVIEW)]
+            expected = expected.decode("utf-8", errors="replace")
+        else:
+            expected = "<end of output>"
+
+        if rest:
+            got = self._current + rest.split(b"\n", 1)[0]
+            got = got[:LINE_PREVIEW].decode("utf-8", errors="replace")
+        else:
+            got = "<end of output>"
+
+        self.mismatch = {
+            "line": self._line,
+            "column": self._column + 1,
+            "expected": expected,
+            "got": got,
+        }
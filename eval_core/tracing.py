@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import threading
+import functools
+from eval_core.utils import log
+
+TRACE_DIR = os.path.join("logs", "traces")
+
+
+class _NullSpan:
+    """
+    Returned when tracing is off: entering / leaving it costs nothing.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self.name, self.cat, self.start, end, self.args)
+        return False
+
+    def set(self, **args):
+        """
+        Attach values known only at the end (verdict, exit code...).
+        """
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    Nested timing spans for one evaluation session.
+    - span("name", cat, **args) is a context manager, @traced a decorator
+    - export() writes a Chrome trace-event file (chrome://tracing, Perfetto)
+      plus an aggregated summary per span name
+    - disabled: span() returns a shared no-op object, nothing is recorded
+    """
+
+    def __init__(self, enabled=False, trace_dir=TRACE_DIR):
+        self.enabled = enabled
+        self.trace_dir = trace_dir
+        self._lock = threading.Lock()
+        self.reset()
+
+    def configure(self, enabled=None, trace_dir=None):
+        if enabled is not None:
+            self.enabled = enabled
+        if trace_dir is not None:
+            self.trace_dir = trace_dir
+
+    def reset(self):
+        with self._lock:
+            self._events = []
+            self._threads = {}
+            self._origin = time.perf_counter_ns()
+
+    # -----------------------------------------
+    # RECORDING
+    # -----------------------------------------
+
+    def span(self, name, cat="eval", **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def _record(self, name, cat, start, end, args):
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start - self._origin) / 1000,
+            "dur": (end - start) / 1000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": args,
+        }
+        with self._lock:
+            self._events.append(event)
+            self._threads[thread.ident] = thread.name
+
+    # -----------------------------------------
+    # EXPORT
+    # -----------------------------------------
+
+    def summary(self):
+        """
+        {name: {"cat", "count", "total_ms", "mean_ms", "max_ms"}}, slowest total first.
+        """
+        with self._lock:
+            events = list(self._events)
+
+        stats = {}
+        for e in events:
+            entry = stats.setdefault(e["name"], {"cat": e["cat"], "count": 0,
+                                                 "total_ms": 0.0, "max_ms": 0.0})
+            ms = e["dur"] / 1000
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+
+        for entry in stats.values():
+            entry["mean_ms"] = round(entry["total_ms"] / entry["count"], 3)
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+
+        return dict(sorted(stats.items(), key=lambda item: -item[1]["total_ms"]))
+
+    def export(self, session_id):
+        """
+        Writes <trace_dir>/<session>.trace.json and <session>.summary.json.
+        Returns the trace path (None when disabled or empty).
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        if not events:
+            return None
+
+        pid = os.getpid()
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+
+        os.makedirs(self.trace_dir, exist_ok=True)
+        trace_path = os.path.join(self.trace_dir, f"{session_id}.trace.json")
+        summary_path = os.path.join(self.trace_dir, f"{session_id}.summary.json")
+
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump({"session": session_id, "spans": self.summary()}, f, indent=4)
+
+        log(f"[TRACE] Saved {len(events)} spans to {trace_path}")
+        return trace_path
+
+
+# ---------------------------------------------------------
+# GLOBAL TRACER INSTANCE
+# ---------------------------------------------------------
+
+tracer = Tracer()
+
+
+def span(name, cat="eval", **args):
+    """
+    with span("git push", "git"): ...
+    """
+    if not tracer.enabled:
+        return NULL_SPAN
+    return _Span(tracer, name, cat, args)
+
+
+def traced(name=None, cat="eval"):
+    """
+    Decorator version of span(); the check is done at call time.
+    """
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with _Span(tracer, span_name, cat, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def configure_tracing(config):
+    """
+    Apply the "tracing" key of eval_config.json.
+    """
+    tracer.configure(enabled=config.get("tracing", False))
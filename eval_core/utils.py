@@ -1,35 +1,317 @@
 import os
+import re
+import sys
+import glob
+import json
+import queue
+import shutil
+import atexit
+import threading
 from datetime import datetime
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: one app.py per machine
+    fcntl = None
 
 LOG_DIR = "logs"
 SYSTEM_LOG = os.path.join(LOG_DIR, "system.log")
+JSON_LOG = os.path.join(LOG_DIR, "system.jsonl")
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+# "[SANDBOX ERROR] ..." -> ERROR, "[WARNING] ..." -> WARNING, etc.
+TAG_REGEX = re.compile(r"^\[([A-Z ]+)\]")
+
 
 class Logger:
     """
-    Simple logger with timestamp + automatic log directory creation.
-    Suitable for your engine, silent for students.
+    Buffered logger: log() only queues the record,
+    a background thread writes the queue to disk in batches.
+    - logs/system.log   : human readable lines (always)
+    - logs/system.jsonl : structured records (optional)
+    - console echo can be turned off
+    - files above max_bytes are rotated into gzip archives (backups kept)
+    Everything still queued is flushed at exit.
     """
 
-    def __init__(self):
-        if not os.path.isdir(LOG_DIR):
-            os.mkdir(LOG_DIR)
+    def __init__(self, console=True, json_lines=False, level="INFO",
+                 flush_interval=0.5, batch_size=500, max_bytes=10 * 1024 * 1024, backups=5):
+        self.console = console
+        self.json_lines = json_lines
+        self.level = LEVELS.get(level, 20)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+        self._session = threading.local()
+        self.default_session = None
+        self._start_lock = threading.Lock()
+        self._reset()
+
+        atexit.register(self.close)
+        if hasattr(os, "register_at_fork"):
+            # A forked worker does not inherit the writer thread
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _reset(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._closed = False
+
+    def _after_fork(self):
+        self._reset()
+        mp_util = sys.modules.get("multiprocessing.util")
+        if mp_util is not None:
+            # multiprocessing workers leave through os._exit(): atexit never runs
+            mp_util.Finalize(None, self.close, exitpriority=10)
+
+    # -----------------------------------------
+    # CONFIG / SESSION
+    # -----------------------------------------
+
+    def configure(self, console=None, json_lines=None, level=None, max_bytes=None, backups=None):
+        if console is not None:
+            self.console = console
+        if json_lines is not None:
+            self.json_lines = json_lines
+        if level is not None:
+            self.level = LEVELS.get(level, self.level)
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if backups is not None:
+            self.backups = backups
+
+    def set_session(self, session_id):
+        """
+        Session ID for the current thread (default for all threads if none set).
+        """
+        self._session.id = session_id
+        if self.default_session is None:
+            self.default_session = session_id
+
+    def session(self):
+        return getattr(self._session, "id", self.default_session)
+
+    # -----------------------------------------
+    # LOG (never touches the disk)
+    # -----------------------------------------
+
+    def _guess_level(self, message):
+        match = TAG_REGEX.match(message)
+        if match:
+            tag = match.group(1)
+            if "CRITICAL" in tag:
+                return "CRITICAL"
+            if "ERROR" in tag or "EXCEPTION" in tag:
+                return "ERROR"
+            if "WARNING" in tag:
+                return "WARNING"
+        return "INFO"
+
+    def log(self, message, level=None):
+        level = level or self._guess_level(message)
+        if LEVELS.get(level, 20) < self.level:
+            return
+
+        now = datetime.now()
+        stamp = now.strftime('[%Y-%m-%d %H:%M:%S]')
+        session = self.session()
+        # "<session>" lets the log viewer filter by student
+        line = f"{stamp} <{session}> {message}" if session else f"{stamp} {message}"
+
+        # Optional: also print to dev console
+        if self.console:
+            print(f"[LOG] {line}")
+
+        if self._closed:
+            return
+
+        self._ensure_writer()
+        self._queue.put({
+            "time": now.isoformat(timespec="milliseconds"),
+            "level": level,
+            "session": session,
+            "message": message,
+            "line": line
+        })
+
+    # -----------------------------------------
+    # BACKGROUND WRITER
+    # -----------------------------------------
+
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._writer, name="log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _open_files(self, system_log, json_log):
+        os.makedirs(os.path.dirname(system_log), exist_ok=True)
 
         # Create system.log if missing
-        if not os.path.exists(SYSTEM_LOG):
-            with open(SYSTEM_LOG, "w", encoding="utf-8") as f:
+        if not os.path.exists(system_log):
+            with open(system_log, "w", encoding="utf-8") as f:
                 f.write("=== SYSTEM LOG ===\n")
 
-    def log(self, message):
-        timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
-        line = f"{timestamp} {message}"
+        text_file = open(system_log, "a", encoding="utf-8")
+        json_file = open(json_log, "a", encoding="utf-8") if self.json_lines else None
+        return text_file, json_file
 
-        # Append to log file
-        with open(SYSTEM_LOG, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
+    def _writer(self):
+        # Resolved once: a later chdir() does not scatter logs/ directories
+        system_log = os.path.abspath(SYSTEM_LOG)
+        json_log = os.path.abspath(JSON_LOG)
+        text_file = json_file = None
+        stop = False
 
-        # Optional: also print to dev console
-        # (CAN BE DISABLED IN V2 VIA CONFIG)
-        print(f"[LOG] {line}")
+        while not stop:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [r for r in batch if r is not None]
+            stop = len(records) != len(batch)
+            if not records:
+                # Shutdown sentinel alone: nothing to write, no file to open
+                for _ in batch:
+                    self._queue.task_done()
+                continue
+
+            try:
+                # Another process rotated the file: follow the new one
+                if text_file is not None and self._rotated_away(text_file, system_log):
+                    text_file.close()
+                    text_file = None
+                if json_file is not None and self._rotated_away(json_file, json_log):
+                    json_file.close()
+                    json_file = None
+
+                if text_file is None:
+                    text_file, json_file = self._open_files(system_log, json_log)
+                if self.json_lines and json_file is None:
+                    json_file = open(json_log, "a", encoding="utf-8")
+
+                text_file.write("".join(r["line"] + "\n" for r in records))
+                text_file.flush()
+
+                if json_file is not None:
+                    json_file.write("".join(
+                        json.dumps({k: v for k, v in r.items() if k != "line"}) + "\n"
+                        for r in records
+                    ))
+                    json_file.flush()
+
+                if self.max_bytes and text_file.tell() >= self.max_bytes:
+                    text_file.close()
+                    text_file = None
+                    rotate_file(system_log, self.backups)
+                if self.max_bytes and json_file is not None and json_file.tell() >= self.max_bytes:
+                    json_file.close()
+                    json_file = None
+                    rotate_file(json_log, self.backups)
+            except OSError as e:
+                print(f"[LOG] Failed to write logs: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+        for f in (text_file, json_file):
+            if f is not None:
+                f.close()
+
+    def _rotated_away(self, f, path):
+        try:
+            return os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def flush(self):
+        """
+        Blocks until every queued record is on disk.
+        """
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+
+# ---------------------------------------------------------
+# ROTATION (logs/system.log -> logs/system-YYYYmmdd-HHMMSS.log.gz)
+# ---------------------------------------------------------
+
+def archive_pattern(path):
+    root, ext = os.path.splitext(path)
+    return f"{root}-*{ext}.gz"
+
+
+def rotate_file(path, backups=5):
+    """
+    Compress path into a timestamped archive and keep the newest `backups` ones.
+    """
+    root, ext = os.path.splitext(path)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    pending = f"{root}-{stamp}{ext}"
+
+    try:
+        os.replace(path, pending)
+    except FileNotFoundError:
+        return None
+
+    import gzip  # rotation only
+
+    archive = pending + ".gz"
+    with open(pending, "rb") as src, gzip.open(archive, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(pending)
+
+    archives = sorted(glob.glob(archive_pattern(path)))
+    for old in archives[:max(0, len(archives) - backups)]:
+        for stale in (old, old + ".idx"):
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    return archive
+
+
+# ---------------------------------------------------------
+# FILE LOCK (data/ files shared by every app.py of the machine)
+# ---------------------------------------------------------
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive lock shared by every process (and thread) opening the same file.
+    """
+    folder = os.path.dirname(path)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # releases the lock
 
 
 # ---------------------------------------------------------
@@ -38,12 +320,25 @@ class Logger:
 
 logger = Logger()
 
-def log(message):
+def log(message, level=None):
     """
     Global helper function to log messages.
     Used everywhere in the engine.
     """
-    logger.log(message)
+    logger.log(message, level)
+
+
+def configure_logger(config):
+    """
+    Apply the logging keys of eval_config.json.
+    """
+    logger.configure(
+        console=config.get("log_console"),
+        json_lines=config.get("log_json"),
+        level=config.get("log_level"),
+        max_bytes=int(config["log_max_mb"] * 1024 * 1024) if "log_max_mb" in config else None,
+        backups=config.get("log_backups")
+    )
 
 
 # ---------------------------------------------------------
@@ -0,0 +1,314 @@
+import os
+import json
+import math
+import time
+import random
+import struct
+import hashlib
+from eval_core.utils import log
+
+VARIANTS_FILE = os.path.join("data", "exam_variants.bin")
+MAGIC = b"EXVAR\x00\x01\x00"
+PREFIX = struct.Struct("<8sII")  # magic, header length, record size
+NO_VARIATION = 0xFF
+MAX_CHOICES = 8                  # 8! permutations fit in 2 bytes
+
+
+class VariantError(Exception):
+    """
+    The variants file is missing, corrupt or does not match the banks.
+    """
+
+
+# ---------------------------------------------------------
+# CHOICE ORDER (permutation <-> 2-byte rank)
+# ---------------------------------------------------------
+
+def permutation_rank(perm):
+    """
+    Lehmer code of a permutation of range(n): 0 <= rank < n!.
+    """
+    rank = 0
+    remaining = sorted(perm)
+    for i, value in enumerate(perm):
+        index = remaining.index(value)
+        rank += index * math.factorial(len(perm) - 1 - i)
+        remaining.pop(index)
+    return rank
+
+
+def permutation_unrank(rank, n):
+    remaining = list(range(n))
+    perm = []
+    for i in range(n - 1, -1, -1):
+        index, rank = divmod(rank, math.factorial(i))
+        perm.append(remaining.pop(index))
+    return perm
+
+
+def shuffled_choices(question, order):
+    """
+    Choices of a QCM question shown in `order`, relabelled A, B, C...
+    Returns (choices, answer letter): the answer key moves with the shuffle.
+    """
+    choices = []
+    answer = None
+    for position, original in enumerate(order):
+        label = chr(ord("A") + position)
+        letter, _, text = question["choices"][original].partition(":")
+        choices.append(f"{label}: {text.strip()}")
+        if letter.strip().upper() == question["answer"].strip().upper():
+            answer = label
+    return choices, answer
+
+
+# ---------------------------------------------------------
+# GENERATION (deterministic: seed + variant number)
+# ---------------------------------------------------------
+
+def exam_bank(qcm_data, exercises_data, catalog):
+    """
+    What a variant is drawn from: QCM question ids with their number of
+    choices, exercises (present in the catalog) with the meta.json variations
+    that have their own tests; both with their points.
+    """
+    questions = []
+    for q in qcm_data["questions"]:
+        if len(q["choices"]) > MAX_CHOICES:
+            raise VariantError(f"Question {q['id']} has more than {MAX_CHOICES} choices")
+        questions.append({"id": q["id"], "choices": len(q["choices"]),
+                          "points": q.get("points", 0)})
+
+    exercises = []
+    for exo in exercises_data["exercises"]:
+        if exo["name"] not in catalog:
+            log(f"[VARIANTS] Exercise folder missing, skipped: {exo['name']}")
+            continue
+        variations = catalog.variations(exo["name"])
+        exercises.append({"name": exo["name"], "variations": variations[:NO_VARIATION],
+                          "points": exo.get("points", 0)})
+
+    if len(questions) > 0xFF or len(exercises) > 0xFF:
+        raise VariantError("At most 255 questions and 255 exercises per bank")
+    return {"questions": questions, "exercises": exercises}
+
+
+def _draw_same_points(rng, entries, count):
+    """
+    `count` bank indices worth the same points as the first `count` entries
+    (the exam without variants): one draw per points value, so every variant
+    has the same maximum score against the single passing_score.
+    Entries without points (files made before) all share one bucket.
+    """
+    buckets = {}
+    for index, entry in enumerate(entries):
+        buckets.setdefault(entry.get("points"), []).append(index)
+
+    needed = {}
+    for entry in entries[:count]:
+        needed[entry.get("points")] = needed.get(entry.get("points"), 0) + 1
+
+    drawn = []
+    for points, n in needed.items():
+        drawn += rng.sample(buckets[points], n)
+    if len(needed) > 1:
+        rng.shuffle(drawn)
+    return drawn
+
+
+def draw_variant(bank, number, seed, qcm_count, exercise_count):
+    """
+    Variant `number` of the exam: always the same for the same seed and bank.
+    Returns {"questions": [(bank index, choice order)], "exercises": [(bank index, variation index)]}.
+    """
+    rng = random.Random(f"{seed}:{number}")
+
+    questions = []
+    for index in _draw_same_points(rng, bank["questions"], qcm_count):
+        order = list(range(bank["questions"][index]["choices"]))
+        rng.shuffle(order)
+        questions.append((index, order))
+
+    exercises = []
+    # Bank order is kept: exercises stay in increasing difficulty
+    for index in sorted(_draw_same_points(rng, bank["exercises"], exercise_count)):
+        variations = bank["exercises"][index]["variations"]
+        exercises.append((index, rng.randrange(len(variations)) if variations else NO_VARIATION))
+
+    return {"questions": questions, "exercises": exercises}
+
+
+def _record_struct(qcm_count, exercise_count):
+    # per question: bank index (B) + choice order rank (H); per exercise: index (B) + variation (B)
+    return struct.Struct("<" + "BH" * qcm_count + "BB" * exercise_count)
+
+
+def _record_fields(variant):
+    fields = []
+    for index, order in variant["questions"]:
+        fields += [index, permutation_rank(order)]
+    for index, variation in variant["exercises"]:
+        fields += [index, variation]
+    return tuple(fields)
+
+
+def generate_variants(path, qcm_data, exercises_data, catalog, count, seed,
+                      qcm_count, exercise_count):
+    """
+    Writes `count` variants to `path`:
+    [magic | header length | record size] [JSON header] [fixed-size records]
+    """
+    if count < 1:
+        raise VariantError(f"At least one variant is needed (got {count})")
+
+    bank = exam_bank(qcm_data, exercises_data, catalog)
+    qcm_count = min(qcm_count, len(bank["questions"]))
+    exercise_count = min(exercise_count, len(bank["exercises"]))
+    record = _record_struct(qcm_count, exercise_count)
+
+    header = json.dumps({
+        "seed": seed,
+        "count": count,
+        "qcm_count": qcm_count,
+        "exercise_count": exercise_count,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "bank": bank,
+    }, separators=(",", ":")).encode("utf-8")
+
+    start = time.perf_counter()
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(PREFIX.pack(MAGIC, len(header), record.size))
+        f.write(header)
+        for number in range(count):
+            variant = draw_variant(bank, number, seed, qcm_count, exercise_count)
+            f.write(record.pack(*_record_fields(variant)))
+    os.replace(tmp, path)
+
+    log(f"[VARIANTS] {count} variants ({record.size} bytes each) written to {path} "
+        f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return path
+
+
+# ---------------------------------------------------------
+# LOOKUP (header + one record, whatever the number of variants)
+# ---------------------------------------------------------
+
+class VariantFile:
+    """
+    Read side of a variants file: reads the header once,
+    then each lookup is a single seek + read of a fixed-size record.
+    """
+
+    def __init__(self, path=VARIANTS_FILE):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                magic, header_len, record_size = PREFIX.unpack(f.read(PREFIX.size))
+                if magic != MAGIC:
+                    raise VariantError(f"{path} is not a variants file")
+                self.header = json.loads(f.read(header_len).decode("utf-8"))
+        except (OSError, struct.error, ValueError) as e:
+            raise VariantError(f"Cannot read variants file {path}: {e}")
+
+        self.count = self.header["count"]
+        if not isinstance(self.count, int) or self.count < 1:
+            raise VariantError(f"{path} holds no variants")
+        self.seed = self.header["seed"]
+        self.bank = self.header["bank"]
+        self.record = _record_struct(self.header["qcm_count"], self.header["exercise_count"])
+        self.offset = PREFIX.size + header_len
+        if self.record.size != record_size:
+            raise VariantError(f"{path}: record size mismatch")
+
+    def number_for(self, student):
+        """
+        Variant assigned to a student: stable hash of the name.
+        """
+        digest = hashlib.sha256(student.strip().lower().encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % self.count
+
+    def _fields(self, number):
+        if not 0 <= number < self.count:
+            raise VariantError(f"Variant {number} out of range (0..{self.count - 1})")
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset + number * self.record.size)
+            data = f.read(self.record.size)
+        if len(data) != self.record.size:
+            raise VariantError(f"{self.path} is truncated (variant {number})")
+        return self.record.unpack(data)
+
+    def variant(self, number):
+        """
+        {"number", "seed", "questions": [{"id", "order"}], "exercises": [{"name", "variation"}]}
+        """
+        fields = self._fields(number)
+
+        questions = []
+        q_fields = 2 * self.header["qcm_count"]
+        for i in range(0, q_fields, 2):
+            entry = self.bank["questions"][fields[i]]
+            questions.append({"id": entry["id"],
+                              "order": permutation_unrank(fields[i + 1], entry["choices"])})
+
+        exercises = []
+        for i in range(q_fields, len(fields), 2):
+            entry = self.bank["exercises"][fields[i]]
+            variation = fields[i + 1]
+            exercises.append({"name": entry["name"],
+                              "variation": None if variation == NO_VARIATION
+                              else entry["variations"][variation]})
+
+        return {"number": number, "seed": self.seed, "questions": questions, "exercises": exercises}
+
+    def for_student(self, student):
+        return self.variant(self.number_for(student))
+
+    def verify(self, number):
+        """
+        Audit: the stored record is the one the seed reproduces.
+        """
+        expected = draw_variant(self.bank, number, self.seed,
+                                self.header["qcm_count"], self.header["exercise_count"])
+        return _record_fields(expected) == self._fields(number)
+
+
+def resolve_questions(variant, qcm_data):
+    """
+    Questions of a variant, taken from the current qcm.json by id,
+    with their choices shuffled and relabelled: [(question, choices, answer)].
+    """
+    by_id = {q["id"]: q for q in qcm_data["questions"]}
+    resolved = []
+    for entry in variant["questions"]:
+        question = by_id.get(entry["id"])
+        if question is None or len(question["choices"]) != len(entry["order"]):
+            raise VariantError(f"Question {entry['id']} changed since the variants were generated")
+        choices, answer = shuffled_choices(question, entry["order"])
+        resolved.append((question, choices, answer))
+    return resolved
+
+
+def resolve_exercises(variant, exercises_data, catalog):
+    """
+    exercises.json entries of a variant, with the chosen variation
+    (None if it has no tests of its own, e.g. a file made before they existed).
+    """
+    by_name = {exo["name"]: exo for exo in exercises_data["exercises"]}
+    resolved = []
+    for entry in variant["exercises"]:
+        exo = by_name.get(entry["name"])
+        if exo is None:
+            raise VariantError(f"Exercise {entry['name']} is no longer in exercises.json")
+        variation = entry["variation"]
+        if variation is not None and (exo["name"] not in catalog
+                                      or variation not in catalog.variations(exo["name"])):
+            log(f"[VARIANTS] Variation {variation} of {exo['name']} has no tests, ignored")
+            variation = None
+        resolved.append(dict(exo, variation=variation))
+    return resolved
@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from eval_core.utils import log
+
+CACHE_DB = os.path.join(".cache", "verdicts.db")
+
+
+def file_hash(path):
+    """
+    sha256 of the raw bytes of a file.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def suite_name(exo_name, variation=None):
+    """
+    Exercise field of the cache: a variation has its own tests, so its own
+    entries (a lookup never invalidates the base exercise or another variation).
+    """
+    return f"{exo_name}/{variation}" if variation is not None else exo_name
+
+
+def verdict_key(exo_name, submission_path, tests_hash, language, limits):
+    """
+    Returns (key, exercise, tests_hash) for VerdictCache.lookup()/store().
+    exo_name: suite_name() of the exercise and variation.
+    tests_hash: sha256 of the exercise's test.json (ExerciseCatalog.tests_hash).
+    Two identical submissions of the same exercise get the same key.
+    """
+    payload = json.dumps({
+        "submission": file_hash(submission_path),
+        "tests": tests_hash,
+        "language": language,
+        "limits": limits
+    }, sort_keys=True)
+    key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return key, exo_name, tests_hash
+
+
+class VerdictCache:
+    """
+    Persistent cache of per-test verdicts, keyed by content:
+    submission bytes + test.json bytes + language + sandbox limits.
+    - same file resubmitted / same solution in a cohort -> instant verdicts
+    - test.json edited -> the old entries of that exercise are dropped
+    - LRU eviction above max_entries
+    """
+
+    def __init__(self, db_path=CACHE_DB, max_entries=5000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(db_path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder, exist_ok=True)
+
+        import sqlite3  # only when the cache is enabled: verdict_key() does not need it
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS verdicts (
+                   key TEXT PRIMARY KEY,
+                   exercise TEXT NOT NULL,
+                   tests_hash TEXT NOT NULL,
+                   verdicts TEXT NOT NULL,
+                   last_used REAL NOT NULL
+               )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON verdicts(last_used)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_exercise ON verdicts(exercise)")
+        self._db.commit()
+
+    # ---------------------------------------------------------
+    # LOOKUP / STORE
+    # ---------------------------------------------------------
+
+    def lookup(self, cache_key):
+        """
+        Returns the stored verdict list, or None on a miss.
+        """
+        key, exo_name, tests_hash = cache_key
+
+        with self._lock:
+            self._invalidate(exo_name, tests_hash)
+            row = self._db.execute(
+                "SELECT verdicts FROM verdicts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._db.commit()
+                return None
+
+            self._db.execute(
+                "UPDATE verdicts SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._db.commit()
+
+        return json.loads(row[0])
+
+    def store(self, cache_key, verdicts):
+        key, exo_name, tests_hash = cache_key
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?)",
+                (key, exo_name, tests_hash, json.dumps(verdicts), time.time())
+            )
+            self._evict()
+            self._db.commit()
+
+    # ---------------------------------------------------------
+    # INVALIDATION / EVICTION (lock held)
+    # ---------------------------------------------------------
+
+    def _invalidate(self, exo_name, tests_hash):
+        """
+        Drop the entries computed with an older test.json of this exercise.
+        """
+        cur = self._db.execute(
+            "DELETE FROM verdicts WHERE exercise = ? AND tests_hash != ?",
+            (exo_name, tests_hash)
+        )
+        if cur.rowcount:
+            log(f"[CACHE] test.json changed for {exo_name}: {cur.rowcount} verdicts dropped")
+
+    def _evict(self):
+        count = self._db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+        extra = count - self.max_entries
+        if extra > 0:
+            self._db.execute(
+                "DELETE FROM verdicts WHERE key IN "
+                "(SELECT key FROM verdicts ORDER BY last_used ASC LIMIT ?)",
+                (extra,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM verdicts")
+            self._db.commit()
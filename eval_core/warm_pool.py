@@ -0,0 +1,172 @@
+import os
+import json
+import queue
+import atexit
+import threading
+import subprocess
+from eval_core.utils import log
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fork_server.py")
+
+
+class WarmPythonPool:
+    """
+    Pool of pre-started Python interpreters (see fork_server.py).
+    Each test case runs in a fresh fork of a warm worker,
+    so the interpreter startup is paid once per worker, not once per test.
+    Linux / POSIX only.
+    """
+
+    def __init__(self, size=2, python="python3"):
+        if os.name != "posix":
+            raise OSError("WarmPythonPool needs os.fork (POSIX only)")
+
+        self.size = size
+        self.python = python
+        self._idle = queue.Queue()
+        self._workers = []
+        self._starting = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+        atexit.register(self.close)
+        log(f"[SANDBOX] Warm pool started with {size} workers")
+
+    # -----------------------------------------
+    # WORKER LIFECYCLE
+    # -----------------------------------------
+
+    def _spawn(self):
+        worker = subprocess.Popen(
+            [self.python, SERVER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=os.getcwd()
+        )
+
+        ready = worker.stdout.readline()
+        if not ready:
+            worker.kill()
+            worker.wait()
+            raise RuntimeError("[SANDBOX] Warm worker failed to start")
+
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _discard(self, worker):
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        try:
+            worker.kill()
+            worker.wait()
+        except OSError:
+            pass
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+
+        for worker in workers:
+            try:
+                worker.stdin.close()
+                worker.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                worker.kill()
+
+    # -----------------------------------------
+    # REQUESTS
+    # -----------------------------------------
+
+    def _acquire(self):
+        """
+        An idle worker, or a new one if the pool lost some (a failed
+        restart must not leave it short for good). Raises if it cannot start.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            replace = len(self._workers) + self._starting < self.size
+            if replace:
+                self._starting += 1
+        if not replace:
+            return self._idle.get()
+        try:
+            return self._spawn()
+        finally:
+            with self._lock:
+                self._starting -= 1
+
+    def _request(self, request, error_response):
+        try:
+            worker = self._acquire()
+        except Exception as e:
+            log(f"[SANDBOX ERROR] No warm worker available: {e}")
+            return error_response(str(e))
+
+        try:
+            worker.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+            worker.stdin.flush()
+            line = worker.stdout.readline()
+            if not line:
+                raise RuntimeError("warm worker died")
+            response = json.loads(line)
+        except Exception as e:
+            log(f"[SANDBOX ERROR] Warm worker lost: {e}")
+            self._discard(worker)
+            worker = None
+            response = error_response(str(e))
+            try:
+                worker = self._spawn()
+            except Exception as spawn_error:
+                # Replaced on a later request by _acquire()
+                log(f"[SANDBOX ERROR] Could not restart a warm worker: {spawn_error}")
+        finally:
+            # Only a live worker goes back to the pool
+            if worker is not None:
+                self._idle.put(worker)
+
+        return response
+
+    def run(self, file_path, input_data, timeout, limits=None, expected=None):
+        """
+        Run one test case (streaming comparison if expected is given).
+        Returns a dict {stdout, stderr, exit_code, ...} (SandboxResult contract).
+        """
+        request = {"file": os.path.abspath(file_path), "input": input_data or "",
+                   "timeout": timeout, "limits": limits, "expected": expected}
+        return self._request(
+            request, lambda err: {"stdout": "", "stderr": err, "exit_code": 1,
+                                  "internal_error": True}
+        )
+
+    def run_many(self, file_path, inputs, timeout, stop_on_error=True, limits=None,
+                 expected=None):
+        """
+        Run all the cases of an exercise in one worker session.
+        Returns a list of dicts, stops after the first crash if stop_on_error.
+        """
+        request = {"file": os.path.abspath(file_path), "inputs": list(inputs),
+                   "timeout": timeout, "stop_on_error": stop_on_error, "limits": limits,
+                   "expected": expected}
+        response = self._request(
+            request, lambda err: {"results": [{"stdout": "", "stderr": err, "exit_code": 1,
+                                               "internal_error": True}]}
+        )
+        if "results" not in response:
+            # Worker answered with a single-case error: same failure, list shape
+            return [dict(response, internal_error=True)]
+        return response["results"]
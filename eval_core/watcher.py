@@ -0,0 +1,177 @@
+import os
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+from eval_core.utils import log
+from eval_core.verdict_cache import file_hash
+
+# inotify(7) flags
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _inotify_fd(directory):
+    """
+    inotify file descriptor watching `directory`, or None if unavailable.
+    """
+    if not hasattr(os, "uname") or os.uname().sysname != "Linux":
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+class SubmissionWatcher:
+    """
+    Waits until one of the expected files is saved in the student folder.
+    - inotify on Linux, otherwise stat() polling of the expected names only
+    - editor save bursts are debounced (quiet period before reporting)
+    - a save that does not change the content (same sha256) is ignored
+    """
+
+    def __init__(self, directory, debounce=0.3, poll_interval=0.25):
+        self.directory = os.path.abspath(directory)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._seen = {}  # path -> sha256 of the last reported content
+        self._fd = _inotify_fd(self.directory)
+        self.backend = "inotify" if self._fd is not None else "polling"
+        log(f"[WATCH] Watching {self.directory} ({self.backend})")
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    # -----------------------------------------
+    # CHANGE DETECTION
+    # -----------------------------------------
+
+    def _changed(self, filenames):
+        """
+        First expected file whose content differs from the last report.
+        """
+        for name in filenames:
+            path = os.path.join(self.directory, name)
+            try:
+                if not os.path.isfile(path) or os.path.getsize(path) == 0:
+                    continue
+                digest = file_hash(path)
+            except OSError:
+                continue
+            if self._seen.get(path) != digest:
+                self._seen[path] = digest
+                return path
+        return None
+
+    def _stamps(self, filenames):
+        stamps = {}
+        for name in filenames:
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+                stamps[name] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stamps[name] = None
+        return stamps
+
+    def _read_events(self, filenames, timeout):
+        """
+        True if an event on an expected file arrived within timeout.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+
+        hit = False
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return False
+
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", errors="replace")
+            offset += length
+            if name in filenames:
+                hit = True
+        return hit
+
+    def _wait_event(self, filenames, deadline):
+        """
+        Blocks until an expected file is touched, then until it is quiet
+        for `debounce` seconds. False on timeout.
+        """
+        def left():
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        if self._fd is not None:
+            while not self._read_events(filenames, left()):
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+            # Debounce: swallow the rest of the burst
+            while self._read_events(filenames, self.debounce):
+                pass
+            return True
+
+        stamps = self._stamps(filenames)
+        while True:
+            time.sleep(self.poll_interval)
+            current = self._stamps(filenames)
+            if current != stamps:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        # Debounce: wait until the stamps stop moving
+        while True:
+            time.sleep(self.debounce)
+            settled = self._stamps(filenames)
+            if settled == current:
+                return True
+            current = settled
+
+    # -----------------------------------------
+    # PUBLIC
+    # -----------------------------------------
+
+    def mark_seen(self, path):
+        """
+        Records the content about to be graded: a save made in between
+        (e.g. during a cooldown) is not reported a second time.
+        """
+        path = os.path.abspath(path)
+        try:
+            self._seen[path] = file_hash(path)
+        except OSError:
+            self._seen.pop(path, None)
+
+    def wait(self, filenames, timeout=None):
+        """
+        Path of the saved file once its content changed, None on timeout.
+        A file already present with content never reported counts as a change.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            path = self._changed(filenames)
+            if path is not None:
+                return path
+            if not self._wait_event(filenames, deadline):
+                return None
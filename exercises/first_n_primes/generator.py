@@ -0,0 +1,10 @@
+# Inputs for first_n_primes (see meta.json "generated_tests").
+# generate(rng, index) -> stdin of case `index`; rng is seeded per case.
+# Sizes grow so that the CPU time measures the algorithm, not the interpreter startup.
+
+SIZES = [1000, 5000, 20000]
+
+
+def generate(rng, index):
+    base = SIZES[index % len(SIZES)]
+    return f"{base + rng.randint(0, base // 10)}\n"
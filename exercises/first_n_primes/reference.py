@@ -0,0 +1,20 @@
+# Reference solution: calibrates the time limits (meta.json "performance")
+# and computes the expected outputs of the generated tests.
+import sys
+
+data = sys.stdin.read().split()
+count = int(data[0])
+
+primes = []
+n = 2
+while len(primes) < count:
+    for p in primes:
+        if p * p > n:
+            primes.append(n)
+            break
+        if n % p == 0:
+            break
+    else:
+        primes.append(n)
+    n += 1
+print(" ".join(map(str, primes)))
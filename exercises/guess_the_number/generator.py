@@ -0,0 +1,10 @@
+# Random inputs for guess_the_number (see meta.json "generated_tests").
+# generate(rng, index) -> stdin of case `index`; rng is seeded per case.
+
+EDGES = [41, 42, 43, 0, -1, 1000000]
+
+
+def generate(rng, index):
+    if index < len(EDGES):
+        return f"{EDGES[index]}\n"
+    return f"{rng.randint(-1000, 1000)}\n"
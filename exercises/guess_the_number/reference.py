@@ -0,0 +1,8 @@
+# Reference solution: its output is the expected output of the generated cases.
+n = int(input())
+if n < 42:
+    print("too low")
+elif n > 42:
+    print("too high")
+else:
+    print("correct")
@@ -0,0 +1,49 @@
+import sys
+import json
+import argparse
+from eval_core.utils import safe_print, logger, configure_logger
+from eval_core.catalog import get_catalog
+from eval_core.case_generator import (
+    GenerationError, generation_spec, generate_cases, generated_cases
+)
+
+# Pre-generates the test cases of the exercises with a "generated_tests" entry
+# in meta.json (otherwise the first grading of the exercise generates them).
+# Usage: python3 generate_tests.py [exercise ...]
+
+def main():
+    with open("config/eval_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    parser = argparse.ArgumentParser(description="Pre-generate the generated test cases.")
+    parser.add_argument("exercises", nargs="*", help="exercise names (default: all)")
+    args = parser.parse_args()
+
+    configure_logger(config)
+    logger.configure(console=False)
+    catalog = get_catalog()
+
+    failed = False
+    for name in args.exercises or catalog.names():
+        if name not in catalog:
+            safe_print(f"❌ {name}: unknown exercise")
+            failed = True
+            continue
+        spec = generation_spec(catalog.meta(name))
+        if spec is None:
+            if args.exercises:
+                safe_print(f"– {name}: no \"generated_tests\" in meta.json")
+            continue
+        try:
+            directory = generate_cases(name, catalog.exercise_dir(name), spec)
+        except (GenerationError, OSError) as e:
+            safe_print(f"❌ {e}")
+            failed = True
+            continue
+        safe_print(f"🧪 {name}: {len(generated_cases(directory))} cases in {directory}")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
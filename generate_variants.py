@@ -0,0 +1,71 @@
+import sys
+import json
+import secrets
+import argparse
+from eval_core.utils import safe_print, logger, configure_logger
+from eval_core.catalog import get_catalog
+from eval_core.variants import (
+    VARIANTS_FILE, VariantFile, VariantError, generate_variants, resolve_questions
+)
+
+# Pre-generates the per-student exam variants (questions, choice order,
+# exercises, variation) before the exam; the sessions only read one record.
+# Usage: python3 generate_variants.py [--count 5000] [--seed N] [--output data/exam_variants.bin]
+#        python3 generate_variants.py --show STUDENT   (audit: the exam a student got)
+
+def _load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def show(path, student, qcm_data):
+    variants = VariantFile(path)
+    variant = variants.for_student(student)
+    safe_print(f"Student  : {student}")
+    safe_print(f"Variant  : {variant['number']} / {variants.count} (seed {variants.seed})")
+    safe_print(f"Verified : {'yes' if variants.verify(variant['number']) else 'NO (file altered)'}")
+    for question, choices, answer in resolve_questions(variant, qcm_data):
+        safe_print(f"\n[{question['id']}] {question['question']}  -> {answer}")
+        for choice in choices:
+            safe_print("  " + choice)
+    safe_print("")
+    for exo in variant["exercises"]:
+        safe_print(f"- {exo['name']}" + (f" ({exo['variation']})" if exo["variation"] else ""))
+
+
+def main():
+    config = _load_json("config/eval_config.json")
+
+    parser = argparse.ArgumentParser(description="Pre-generate per-student exam variants.")
+    parser.add_argument("--count", type=int, default=5000, help="number of variants")
+    parser.add_argument("--seed", type=int, default=None, help="seed (default: random, saved in the file)")
+    parser.add_argument("--output", default=config.get("exam_variants") or VARIANTS_FILE,
+                        help="variants file")
+    parser.add_argument("--show", metavar="STUDENT", default=None, help="print the exam of a student")
+    args = parser.parse_args()
+
+    configure_logger(config)
+    logger.configure(console=False)
+    qcm_data = _load_json("config/qcm.json")
+
+    try:
+        if args.show:
+            show(args.output, args.show, qcm_data)
+            return
+
+        seed = args.seed if args.seed is not None else secrets.randbits(32)
+        generate_variants(
+            args.output, qcm_data, _load_json("config/exercises.json"), get_catalog(),
+            count=args.count, seed=seed,
+            qcm_count=config["qcm_count"], exercise_count=config["exercise_count"]
+        )
+    except (VariantError, FileNotFoundError) as e:
+        safe_print(f"❌ {e}")
+        sys.exit(1)
+
+    safe_print(f"🎲 {args.count} variants written to {args.output} (seed {seed})")
+    if not config.get("exam_variants"):
+        safe_print(f'Set "exam_variants": "{args.output}" in config/eval_config.json to use them.')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import sys
+import json
+import argparse
+from eval_core.utils import safe_print, log, logger, configure_logger
+from eval_core.sandbox_runner import SandboxRunner
+from eval_core.comparator import Comparator
+from eval_core.catalog import get_catalog
+from eval_core.verdict_cache import VerdictCache
+from eval_core.grader import SubmissionGrader
+from eval_core.grading_service import GradingService, make_server, DEFAULT_ADDRESS
+
+# Lab server grading daemon: the students' app.py send their submissions here
+# ("grading_service" in eval_config.json) instead of running them locally.
+# Usage: python3 grading_daemon.py [--listen unix:/tmp/grading.sock] [--workers 4]
+
+def main():
+    with open("config/eval_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    with open("config/exercises.json", "r", encoding="utf-8") as f:
+        # The language of a submission is never taken from the client
+        languages = {exo["name"]: exo["language"] for exo in json.load(f)["exercises"]}
+
+    parser = argparse.ArgumentParser(description="Local grading service.")
+    parser.add_argument("--listen", default=config.get("grading_service") or DEFAULT_ADDRESS,
+                        help="http://127.0.0.1:PORT or unix:/path/to/socket")
+    parser.add_argument("--workers", type=int, default=config.get("service_workers", 4),
+                        help="submissions graded at the same time")
+    parser.add_argument("--queue", type=int, default=256, help="max queued submissions")
+    args = parser.parse_args()
+
+    configure_logger(config)
+    logger.set_session("daemon")
+
+    sandbox = SandboxRunner(
+        backend=config.get("sandbox_backend", "subprocess"),
+        pool_size=args.workers,
+        limits=config.get("sandbox_limits"),
+        compilers=config.get("compilers")
+    )
+    verdict_cache = None
+    if config.get("verdict_cache", False):
+        verdict_cache = VerdictCache(max_entries=config.get("verdict_cache_max_entries", 5000))
+    grader = SubmissionGrader(config, sandbox, Comparator(), get_catalog(), verdict_cache)
+    # Calibrations are done before the first submissions are accepted
+    grader.performance.warm_up([(name, variation) for name in languages
+                                for variation in [None] + grader.catalog.variations(name)],
+                               wait=True)
+
+    service = GradingService(grader, languages, workers=args.workers,
+                             max_queue=args.queue).start()
+    try:
+        server = make_server(service, args.listen)
+    except (OSError, ValueError) as e:
+        safe_print(f"❌ {e}")
+        sys.exit(1)
+
+    safe_print(f"🟢 Grading service listening on {args.listen} ({args.workers} workers)")
+    log(f"[SERVICE] Listening on {args.listen}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        safe_print("\n🔴 Grading service stopped.")
+    finally:
+        server.server_close()
+        service.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import json
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from eval_core.utils import logger  # noqa: E402
+
+# Keep the pytest output readable: logs still go to logs/system.log
+# (in the folder of the first test that logs)
+logger.configure(console=False)
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """
+    Every test runs in its own folder: .cache/, data/, logs/ and results/
+    never touch the repository.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+@pytest.fixture
+def make_exercise(workdir):
+    """
+    make_exercise(name, tests, filename=None, meta=None, files=None) ->
+    exercises/<name>/ with test.json, expected_files.json and extra files.
+    """
+    def make(name, tests, filename=None, meta=None, files=None):
+        exo_dir = os.path.join(workdir, "exercises", name)
+        write_json(os.path.join(exo_dir, "test.json"), {"tests": tests})
+        write_json(os.path.join(exo_dir, "expected_files.json"),
+                   {"filenames": [filename or f"{name}.py"]})
+        if meta is not None:
+            write_json(os.path.join(exo_dir, "meta.json"), meta)
+        for relative, content in (files or {}).items():
+            path = os.path.join(exo_dir, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+        return exo_dir
+
+    return make
+
+
+@pytest.fixture
+def write_file(workdir):
+    """
+    write_file("results/alice/x.py", source) -> absolute path.
+    """
+    def write(relative, content):
+        path = os.path.join(workdir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    return write
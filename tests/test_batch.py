@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from conftest import write_json
+import eval_core.batch as batch
+import eval_core.results_store as results_store
+from eval_core.batch import BatchGrader
+
+
+@pytest.fixture
+def cohort(make_exercise, write_file, monkeypatch):
+    monkeypatch.setattr(results_store, "_store", None)
+    make_exercise("double", [{"input": "2\n", "output": "4\n"},
+                             {"input": "5\n", "output": "10\n"}])
+    make_exercise("hello", [{"input": "", "output": "hello\n"}])
+    write_json("config/eval_config.json", {
+        "exercise_count": 2, "passing_score": 30,
+        "sandbox_limits": {"cpu_seconds": 2, "memory_mb": 256},
+    })
+    write_json("config/exercises.json", {"exercises": [
+        {"name": "double", "language": "python", "points": 20},
+        {"name": "hello", "language": "python", "points": 10},
+    ]})
+    write_file("results/alice/double.py", "print(int(input()) * 2)\n")
+    write_file("results/alice/hello.py", "print('hello')\n")
+    write_file("results/bob/double.py", "print(int(input()) + 2)\n")  # only the first test passes
+    write_json("results/bob/results.json", {"qcm_score": 15})
+
+
+def test_batch_grades_every_student_and_keeps_the_qcm_score(cohort):
+    summary = BatchGrader("results", workers=2).run()
+
+    assert summary["students"] == 2
+    assert summary["scores"] == {"alice": 30, "bob": 15}
+    assert summary["exercise_success"] == {"double": 1, "hello": 1}
+
+    with open("results/bob/results.json", encoding="utf-8") as f:
+        bob = json.load(f)
+    assert bob["qcm_score"] == 15
+    # Only the passed exercises are written, as by a session
+    assert bob["exercises"] == []
+    assert bob["passed"] is False
+
+
+def test_batch_grades_identical_submissions_once(cohort, write_file, monkeypatch):
+    messages = []
+    monkeypatch.setattr(batch, "log", messages.append)
+    write_file("results/carol/double.py", "print(int(input()) * 2)\n")
+    grader = BatchGrader("results", workers=1)
+    summary = grader.run()
+
+    assert summary["scores"]["carol"] == 20
+    assert any("3 distinct submissions" in message for message in messages)
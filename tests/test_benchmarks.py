@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import bench_end_to_end  # noqa: E402
+import run_all  # noqa: E402
+
+
+def test_flatten_labels_list_items_by_backend_or_case():
+    results = {"end_to_end": [{"backend": "warm", "elapsed_s": 2.0, "ok": True}],
+               "comparator": [{"case": "small", "mb_per_s": 40}, {"rate": 3}]}
+
+    assert run_all._flatten(results) == {
+        "end_to_end.warm.elapsed_s": 2.0,
+        "comparator.small.mb_per_s": 40,
+        "comparator.1.rate": 3,
+    }
+
+
+def test_compare_reports_ratios_of_shared_metrics():
+    baseline = {"results": {"catalog": {"cold_ms": 4.0, "zero": 0, "gone": 1}}}
+    report = {"results": {"catalog": {"cold_ms": 2.0, "zero": 1, "new": 1}}}
+
+    assert run_all.compare(baseline, report) == [
+        {"metric": "catalog.cold_ms", "old": 4.0, "new": 2.0, "ratio": 0.5}
+    ]
+
+
+@pytest.mark.parametrize("backend", ["subprocess", "warm"])
+def test_end_to_end_only_passes_the_correct_solutions(backend):
+    result = bench_end_to_end.run(students=3, backend=backend, seed=1)
+
+    assert result["submissions"] > 0
+    assert result["passed_submissions"] == result["expected_passed"]
+    assert not [name for name in os.listdir(bench_end_to_end.REPO_ROOT) if name.startswith("tmp")]
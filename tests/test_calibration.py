@@ -0,0 +1,149 @@
+import threading
+
+import pytest
+
+from eval_core.calibration import (
+    PerformanceLimits, efficiency, performance_points, performance_spec, time_limits
+)
+from eval_core.catalog import ExerciseCatalog
+from eval_core.comparator import Comparator
+from eval_core.sandbox_runner import SandboxResult
+
+TESTS = [{"input": "1\n", "output": "1\n"}, {"input": "2\n", "output": "2\n"}]
+STARTUP_CPU = 0.02
+
+
+class FakeExecute:
+    """
+    Reference runs with known CPU times; the empty startup program takes STARTUP_CPU.
+    """
+
+    def __init__(self, cpu_times, gate=None):
+        self.cpu_times = cpu_times
+        self.gate = gate
+        self.calls = 0
+
+    def __call__(self, path, language, tests):
+        if path.endswith("startup.py"):
+            return [SandboxResult("", "", 0, cpu_time=STARTUP_CPU)]
+        if self.gate is not None:
+            self.gate.wait()
+        self.calls += 1
+        return [SandboxResult(test["output"], "", 0, cpu_time=cpu)
+                for test, cpu in zip(tests, self.cpu_times)]
+
+
+@pytest.fixture
+def catalog(make_exercise):
+    make_exercise("echo", TESTS, meta={"performance": {"runs": 3, "multiplier": 3,
+                                                       "bonus_ratio": 0.5, "bonus_points": 5,
+                                                       "slow_ratio": 2, "slow_penalty": 4}},
+                  files={"reference.py": "print(input())\n"})
+    make_exercise("plain", TESTS)
+    return ExerciseCatalog("exercises", check_interval=0)
+
+
+def limits(catalog, execute, **kwargs):
+    return PerformanceLimits(catalog, Comparator(), execute, "test", root="calibration", **kwargs)
+
+
+def test_limits_multiply_the_work_not_the_startup(catalog):
+    performance = limits(catalog, FakeExecute([0.22, 0.05])).for_exercise("echo")
+    calibration = performance["calibration"]
+
+    assert calibration["baseline_cpu"] == STARTUP_CPU
+    assert calibration["reference_cpu"] == [0.22, 0.05]
+    # 0.02 + 3 x 0.2, and the 0.1 s floor for the tiny test
+    assert performance["limits"] == [0.62, 0.12]
+    assert limits(catalog, FakeExecute([0.22, 0.05])).for_exercise("plain") is None
+
+
+def test_efficiency_is_net_of_startup(catalog):
+    calibration = limits(catalog, FakeExecute([0.22, 0.52])).for_exercise("echo")["calibration"]
+
+    assert efficiency([0.22, 0.52], calibration) == 1.0
+    assert efficiency([0.42, 1.02], calibration) == 2.0
+    assert efficiency([0.01, 0.01], calibration) == 0.0
+    assert efficiency([0.0, 0.0], calibration) is None
+    assert efficiency([0.22], calibration) is None
+
+    tiny = dict(calibration, reference_cpu=[0.03, 0.04])
+    assert efficiency([0.5, 0.5], tiny) is None
+
+
+def test_points_and_limit_precedence():
+    spec = performance_spec({"performance": {"bonus_ratio": 0.5, "bonus_points": 5,
+                                             "slow_ratio": 2, "slow_penalty": 4}})
+    assert performance_points(10, 0.4, spec) == 15
+    assert performance_points(10, 1.0, spec) == 10
+    assert performance_points(3, 2.5, spec) == 0
+    assert performance_points(10, None, spec) == 10
+
+    calibration = {"limits": [0.5, 0.6]}
+    tests = [{"cpu_seconds": 2}, {}]
+    assert time_limits(tests, spec, calibration) == [2, 0.6]
+    assert time_limits(tests, dict(spec, cpu_seconds=1), calibration) == [2, 1]
+    assert time_limits(tests, spec, None) == [2, None]
+
+
+def test_grading_waits_for_the_background_calibration(catalog):
+    gate = threading.Event()
+    execute = FakeExecute([0.22, 0.52], gate)
+    performance = limits(catalog, execute)
+
+    # Returns at once: the calibration runs in its own thread
+    performance.warm_up([("echo", None), ("plain", None)])
+    results = []
+    grading = threading.Thread(target=lambda: results.append(performance.for_exercise("echo")))
+    grading.start()
+    grading.join(timeout=0.2)
+    assert grading.is_alive() and results == []
+
+    gate.set()
+    grading.join(timeout=5)
+    assert results[0]["limits"] == [0.62, 1.52]
+    assert performance.for_exercise("echo")["limits"] == [0.62, 1.52]
+    assert execute.calls == 3
+
+    # Read back from disk: the reference is not run again
+    reloaded = limits(catalog, FakeExecute([9, 9]))
+    reloaded.warm_up([("echo", None)], wait=True)
+    assert reloaded.for_exercise("echo")["limits"] == [0.62, 1.52]
+    assert reloaded.execute.calls == 0
+
+
+def test_the_warm_up_generates_cases_off_the_caller_thread(catalog, make_exercise, monkeypatch):
+    make_exercise("gen", TESTS, meta={"generated_tests": {"count": 2, "seed": 1}},
+                  files={"generator.py": "def generate(rng, index):\n    return f'{index}\\n'\n",
+                         "reference.py": "print(input())\n"})
+    gate = threading.Event()
+    tests = catalog.tests
+    callers = []
+
+    def gated_tests(name, variation=None):
+        callers.append(threading.current_thread().name)
+        gate.wait()
+        return tests(name, variation)
+
+    monkeypatch.setattr(catalog, "tests", gated_tests)
+    execute = FakeExecute([0.22, 0.52])
+    performance = limits(catalog, execute)
+
+    # Returns at once, although neither the cases nor the calibration are ready
+    performance.warm_up([("echo", None), ("gen", None), ("gen", "v"), ("plain", None)])
+    gate.set()
+    performance.warm_up([("echo", None), ("gen", None)], wait=True)
+
+    assert set(callers) == {"calibrate-echo", "calibrate-gen"}
+    assert len(tests("gen")) == 4
+    assert performance.for_exercise("echo")["limits"] == [0.62, 1.52]
+    # One calibration (3 reference runs), not one per warm-up
+    assert execute.calls == 3
+
+
+def test_a_wrong_reference_gives_no_calibration(catalog):
+    def execute(path, language, tests):
+        return [SandboxResult("wrong\n", "", 0, cpu_time=0.1) for _ in tests]
+
+    performance = limits(catalog, execute).for_exercise("echo")
+    assert performance["calibration"] is None and performance["limits"] == [None, None]
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from eval_core.case_files import expected_core, list_case_files, open_input
+from eval_core.catalog import ExerciseCatalog
+from eval_core.comparator import Comparator
+from eval_core.grader import SubmissionGrader
+from eval_core.sandbox_runner import SandboxRunner
+
+SUM = "import sys\nprint(sum(int(x) for x in sys.stdin.read().split()))\n"
+
+
+@pytest.fixture
+def catalog(make_exercise):
+    numbers = "\n".join(str(i) for i in range(200000)) + "\n"
+    make_exercise("sum", [{"input": "1 2\n", "output": "3\n"}], files={
+        "tests/2.in": numbers,
+        "tests/2.out": f"{sum(range(200000))}\n",
+        "tests/10.in": "5 5\n",
+        "tests/10.out": "10\r\n\r\n",
+        "tests/1.out": "0\n",
+    })
+    return ExerciseCatalog("exercises", check_interval=0)
+
+
+def test_cases_are_listed_in_numeric_order(catalog):
+    directory = os.path.join("exercises", "sum", "tests")
+
+    assert [(name, inp is not None) for name, inp, _ in list_case_files(directory)] == [
+        ("1", False), ("2", True), ("10", True)
+    ]
+    assert list_case_files("nowhere") == []
+
+    tests = catalog.tests("sum")
+    assert tests[0] == {"input": "1 2\n", "output": "3\n"}
+    assert tests[1]["input"] == "" and tests[2]["input"] == {"file": os.path.abspath(directory + "/2.in")}
+
+
+def test_expected_output_ignores_trailing_whitespace_and_crlf(write_file):
+    path = write_file("a.out", "1\n2  \n\n")
+    data, length = expected_core({"file": path})
+    assert bytes(data[:length]) == b"1\n2"
+
+    path = write_file("b.out", "1\r\n2\r\n")
+    data, length = expected_core({"file": path})
+    assert bytes(data[:length]) == b"1\n2"
+
+    empty = write_file("c.out", "")
+    assert expected_core({"file": empty}) == (b"", 0)
+    with open_input({"file": empty}) as data:
+        assert bytes(data) == b""
+
+    comparator = Comparator(".")
+    assert comparator.compare("1\n2\n", {"file": path})
+    assert not comparator.compare("1\n3\n", {"file": path})
+
+
+def test_file_cases_are_graded_and_hashed(catalog, write_file):
+    grader = SubmissionGrader({"test_mode": "single"}, SandboxRunner(timeout=10), Comparator(),
+                              catalog)
+    path = write_file("results/alice/sum.py", SUM)
+
+    assert grader.grade("sum", path, "python")["verdicts"] == ["ok"] * 4
+
+    old_hash = catalog.tests_hash("sum")
+    with open("exercises/sum/tests/10.out", "w", encoding="utf-8") as f:
+        f.write("11\n")
+    assert catalog.tests_hash("sum") != old_hash
+    assert grader.grade("sum", path, "python")["verdicts"] == ["ok", "ok", "ok", "wrong_output"]
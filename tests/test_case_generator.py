@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+
+import pytest
+
+from eval_core.case_generator import (
+    GenerationError, generate_cases, generated_cases, generation_spec
+)
+from eval_core.catalog import ExerciseCatalog
+
+GENERATOR = "def generate(rng, index):\n    return f'{rng.randint(1, 1000)} {index}\\n'\n"
+REFERENCE = "a, b = map(int, input().split())\nprint(a + b)\n"
+
+
+@pytest.fixture
+def exercise(make_exercise):
+    make_exercise("add", [{"input": "1 2\n", "output": "3\n"}],
+                  meta={"generated_tests": {"count": 4, "seed": 7}},
+                  files={"generator.py": GENERATOR, "reference.py": REFERENCE})
+    return os.path.abspath("exercises/add")
+
+
+def read_cases(directory):
+    cases = []
+    for case in generated_cases(directory):
+        with open(case["input"]["file"], encoding="utf-8") as f_in, \
+                open(case["output"]["file"], encoding="utf-8") as f_out:
+            cases.append((f_in.read(), f_out.read()))
+    return cases
+
+
+def test_cases_come_from_the_seed_and_the_reference(exercise):
+    spec = generation_spec({"generated_tests": {"count": 4, "seed": 7}})
+    directory = generate_cases("add", exercise, spec, root="gen")
+    cases = read_cases(directory)
+
+    assert len(cases) == 4
+    for index, (data, expected) in enumerate(cases):
+        a, b = map(int, data.split())
+        assert b == index and expected == f"{a + b}\n"
+
+    # Cached: the same folder, nothing regenerated
+    assert generate_cases("add", exercise, spec, root="gen") == directory
+    # More cases: the first ones do not change, the old generation is removed
+    bigger = generate_cases("add", exercise, dict(spec, count=6), root="gen")
+    assert read_cases(bigger)[:4] == cases
+    assert os.listdir(os.path.join("gen", "add")) == [os.path.basename(bigger)]
+
+
+def test_a_failing_reference_produces_no_case(exercise):
+    with open(os.path.join(exercise, "reference.py"), "w", encoding="utf-8") as f:
+        f.write("raise SystemExit('broken')\n")
+
+    with pytest.raises(GenerationError, match="reference failed"):
+        generate_cases("add", exercise, generation_spec({"generated_tests": {"count": 2}}),
+                       root="gen")
+    assert os.listdir(os.path.join("gen", "add")) == []
+
+
+def test_the_catalog_serves_generated_cases_after_test_json(exercise):
+    catalog = ExerciseCatalog("exercises", check_interval=0)
+
+    tests = catalog.tests("add")
+    assert len(tests) == 5 and tests[0] == {"input": "1 2\n", "output": "3\n"}
+    assert tests[1]["name"] == "gen-00"
+
+    old_hash = catalog.tests_hash("add")
+    with open(os.path.join(exercise, "generator.py"), "a", encoding="utf-8") as f:
+        f.write("# edited\n")
+    assert catalog.tests_hash("add") != old_hash
+
+
+def test_a_new_working_directory_gets_its_own_cases(exercise, tmp_path, monkeypatch):
+    catalog = ExerciseCatalog(exercise.rsplit(os.sep, 1)[0], check_interval=0)
+    first = catalog.tests("add")[1]["input"]["file"]
+
+    monkeypatch.chdir(tmp_path / "exercises")
+    moved = catalog.tests("add")[1]["input"]["file"]
+    assert moved.startswith(str(tmp_path / "exercises")) and os.path.exists(moved)
+    assert first != moved
+
+
+def test_generating_one_exercise_does_not_block_the_others(exercise, make_exercise):
+    make_exercise("slow", [], meta={"generated_tests": {"count": 1}},
+                  files={"generator.py": "import time\ntime.sleep(1.5)\n" + GENERATOR,
+                         "reference.py": REFERENCE})
+    catalog = ExerciseCatalog("exercises", check_interval=0)
+    catalog.tests("add")
+
+    slow = threading.Thread(target=catalog.tests, args=("slow",))
+    slow.start()
+    time.sleep(0.2)
+    start = time.monotonic()
+    assert len(catalog.tests("add")) == 5
+    assert catalog.meta("slow")["generated_tests"] == {"count": 1}
+    assert time.monotonic() - start < 0.5 and slow.is_alive()
+    slow.join()
+    assert len(catalog.tests("slow")) == 1
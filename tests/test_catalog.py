@@ -0,0 +1,44 @@
+import pytest
+
+from conftest import write_json
+from eval_core.catalog import ExerciseCatalog
+
+
+@pytest.fixture
+def catalog(make_exercise):
+    make_exercise("hello", [{"input": "", "output": "hello\n"}], meta={"points": 10},
+                  files={"description.md": "# Hello\n"})
+    make_exercise("other", [{"input": "1\n", "output": "1\n"}])
+    return ExerciseCatalog("exercises", check_interval=0)
+
+
+def test_lookups_are_served_from_the_index(catalog):
+    assert catalog.names() == ["hello", "other"]
+    assert "hello" in catalog and "missing" not in catalog
+    assert catalog.tests("hello") == [{"input": "", "output": "hello\n"}]
+    assert catalog.meta("hello") == {"points": 10}
+    assert catalog.meta("other") == {}
+    assert catalog.description("other") is None
+    assert catalog.expected_filenames("hello") == ["hello.py"]
+
+
+def test_a_changed_file_is_reloaded(catalog):
+    old_hash = catalog.tests_hash("hello")
+    write_json("exercises/hello/test.json",
+               {"tests": [{"input": "", "output": "hello world\n"}]})
+
+    assert catalog.tests("hello") == [{"input": "", "output": "hello world\n"}]
+    assert catalog.tests_hash("hello") != old_hash
+
+
+def test_unchanged_files_are_not_reparsed(catalog, monkeypatch):
+    catalog.tests("hello")
+    monkeypatch.setattr("eval_core.catalog.json.loads",
+                        lambda *args: pytest.fail("test.json parsed again"))
+    assert catalog.tests("hello")[0]["output"] == "hello\n"
+
+
+@pytest.mark.parametrize("name", ["../hello", "hello/../other", "", None])
+def test_unsafe_names_are_rejected(catalog, name):
+    with pytest.raises(ValueError):
+        catalog.tests(name)
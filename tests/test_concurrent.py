@@ -0,0 +1,40 @@
+import time
+
+from eval_core.sandbox_runner import SandboxRunner
+
+PROGRAM = """
+import sys, time
+value = input()
+if value == "fail":
+    sys.exit(1)
+if value == "slow":
+    time.sleep(10)
+print(value)
+"""
+
+
+def test_results_stay_in_test_order(write_file):
+    path = write_file("prog.py", PROGRAM)
+    results = SandboxRunner(timeout=5).run_concurrent(path, "python", [f"{i}\n" for i in range(6)],
+                                                      max_workers=3)
+    assert [r.stdout for r in results] == [f"{i}\n" for i in range(6)]
+
+
+def test_first_failure_kills_the_later_cases(write_file):
+    path = write_file("prog.py", PROGRAM)
+    start = time.monotonic()
+    results = SandboxRunner(timeout=20).run_concurrent(
+        path, "python", ["ok\n", "fail\n", "slow\n", "slow\n"], max_workers=4
+    )
+
+    assert [r.exit_code for r in results] == [0, 1]
+    assert time.monotonic() - start < 8
+
+
+def test_custom_check_decides_what_fails(write_file):
+    path = write_file("prog.py", PROGRAM)
+    results = SandboxRunner(timeout=5).run_concurrent(
+        path, "python", ["a\n", "b\n", "c\n"], max_workers=1,
+        check=lambda index, result: result.stdout != "b\n"
+    )
+    assert [r.stdout for r in results] == ["a\n", "b\n"]
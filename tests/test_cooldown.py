@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from conftest import ROOT, write_json
+from eval_core.cooldown import CooldownManager, CooldownStore, is_expired
+
+CONFIG = {"penalty_start_seconds": 10, "penalty_increment_seconds": 5, "duration_minutes": 90}
+
+
+def manager(student="alice", config=CONFIG, path="cooldowns.json"):
+    return CooldownManager(config, student, store=CooldownStore(path))
+
+
+def test_the_penalty_is_a_deadline_not_a_sleep():
+    cooldown = manager()
+
+    start = time.monotonic()
+    assert cooldown.apply_penalty(2, "hello") == 15
+    assert time.monotonic() - start < 1
+    assert 14 < cooldown.remaining("hello") <= 15
+    assert cooldown.remaining("other") == 0
+    assert cooldown.attempts("hello") == 2
+
+    exponential = manager(config=dict(CONFIG, penalty_mode="exponential"))
+    assert exponential.apply_penalty(3, "hello") == 40
+
+
+def test_the_deadline_survives_a_restart_and_is_shared():
+    manager().apply_penalty(1, "hello")
+
+    restarted = manager()
+    assert restarted.attempts("hello") == 1 and restarted.remaining("hello") > 9
+    assert manager(student="bob").remaining("hello") == 0
+
+    restarted.clear("hello")
+    assert manager().remaining("hello") == 0 and manager().attempts("hello") == 0
+
+
+def test_attempts_of_a_previous_exam_expire():
+    now = time.time()
+    old = {"deadline": now - 7200, "attempts": 4, "updated": now - 7200}
+    legacy = {"deadline": now - 10, "attempts": 2}
+    write_json("cooldowns.json", {"alice/hello": old, "bob/hello": legacy,
+                                  "carol/hello": {"deadline": now + 60, "attempts": 1}})
+
+    assert is_expired(old, 5400, now) and is_expired(legacy, 5400, now)
+    assert manager().attempts("hello") == 0
+    assert manager(student="carol").attempts("hello") == 1
+
+    cooldown = manager(student="dave")
+    cooldown.apply_penalty(1, "hello")
+    assert set(cooldown.store._read()) == {"carol/hello", "dave/hello"}
+
+
+def test_wait_is_woken_by_clear():
+    cooldown = manager()
+    cooldown.apply_penalty(1, "hello")
+    assert cooldown.wait("hello", timeout=0.05) is False
+
+    done = []
+    waiter = threading.Thread(target=lambda: done.append(cooldown.wait("hello", timeout=5)))
+    waiter.start()
+    time.sleep(0.05)
+    cooldown.clear("hello")
+    waiter.join(timeout=2)
+    assert done == [True]
+
+
+WRITER = """
+import sys, time
+from eval_core.utils import logger
+from eval_core.cooldown import CooldownStore
+logger.configure(console=False)
+store = CooldownStore("cooldowns.json")
+for i in range(100):
+    store.update(f"{sys.argv[1]}/exo{i}", {"deadline": time.time() + 60, "attempts": 1,
+                                            "updated": time.time()})
+"""
+
+
+def test_processes_sharing_the_file_lose_no_deadline():
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    writers = [subprocess.Popen([sys.executable, "-c", WRITER, student], env=env)
+               for student in ("alice", "bob", "carol")]
+    assert [writer.wait(timeout=60) for writer in writers] == [0, 0, 0]
+
+    with open("cooldowns.json", encoding="utf-8") as f:
+        entries = json.load(f)
+    assert len(entries) == 300
@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+
+from eval_core.catalog import ExerciseCatalog
+from eval_core.grading_service import (
+    GradingClient, GradingService, GradingServiceBusy, GradingServiceUnreachable, make_server
+)
+
+
+class FakeGrader:
+    """
+    Same interface as SubmissionGrader; reports the exact bytes it was given.
+    """
+
+    def __init__(self):
+        self.catalog = ExerciseCatalog("exercises")
+        self.calls = []
+
+    def grade(self, exo_name, file_path, language, variation=None):
+        with open(file_path, "rb") as f:
+            data = f.read()
+        self.calls.append((exo_name, language, variation))
+        return {"verdicts": ["OK"], "hex": data.hex()}
+
+
+@pytest.fixture
+def grader(make_exercise):
+    make_exercise("hello", [{"input": "", "output": "hello\n"}],
+                  meta={"variations": ["v1", "v2"]},
+                  files={"variations/v1.json": '{"tests": []}'})
+    return FakeGrader()
+
+
+@pytest.fixture
+def server(grader, tmp_path):
+    service = GradingService(grader, {"hello": "python"}, workers=2,
+                             spool_dir=str(tmp_path / "spool")).start()
+    address = f"unix:{tmp_path}/grading.sock"
+    httpd = make_server(service, address, job_timeout=5)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield service, address
+    httpd.shutdown()
+    httpd.server_close()
+    service.stop()
+
+
+def test_the_raw_bytes_are_graded_through_the_socket(server, write_file, grader):
+    service, address = server
+    path = write_file("sub/hello.py", "")
+    raw = "print('café')\r\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(raw)
+
+    report = GradingClient(address).grade("alice", "hello", path, variation="v1")
+
+    assert report["hex"] == raw.hex()
+    assert report["job_id"] == 1 and "queue_wait_ms" in report
+    assert grader.calls == [("hello", "python", "v1")]
+    assert GradingClient(address).status()["graded"] == 1
+
+
+def test_bad_requests_are_refused(server, write_file):
+    service, address = server
+    client = GradingClient(address, retry_for=0)
+
+    for exercise, filename, variation in [("missing", "hello.py", None),
+                                          ("../hello", "hello.py", None),
+                                          ("hello", "other.py", None),
+                                          ("hello", "hello.py", "v2")]:
+        with pytest.raises(ValueError):
+            service.submit({"exercise": exercise, "filename": filename,
+                            "source": "", "variation": variation})
+    with pytest.raises(ValueError, match="base64"):
+        service.submit({"exercise": "hello", "filename": "hello.py", "source": "%%"})
+
+    path = write_file("sub/missing.py", "print(1)\n")
+    with pytest.raises(Exception, match="not in exercises.json") as error:
+        client.grade("alice", "missing", path)
+    assert not isinstance(error.value, (GradingServiceBusy, GradingServiceUnreachable))
+    assert service.status()["submitted"] == 0
+
+
+def test_a_full_queue_is_refused_and_a_timed_out_job_is_never_graded(grader, tmp_path):
+    service = GradingService(grader, {"hello": "python"}, workers=1, max_queue=1,
+                             spool_dir=str(tmp_path / "spool"))
+    request = {"student": "alice", "exercise": "hello", "filename": "hello.py", "source": ""}
+
+    with pytest.raises(GradingServiceBusy, match="not graded"):
+        service.submit(request, timeout=0.01)
+    with pytest.raises(GradingServiceBusy, match="full"):
+        service.submit(request, timeout=0.01)
+    assert service.status()["rejected"] == 1
+
+    service.start()
+    service.stop()
+    assert grader.calls == []
+
+
+def test_the_client_retries_busy_and_reports_unreachable(monkeypatch, write_file, tmp_path):
+    path = write_file("hello.py", "print(1)\n")
+    client = GradingClient("unix:" + str(tmp_path / "none.sock"), base_delay=0.01, retry_for=5)
+
+    with pytest.raises(GradingServiceUnreachable):
+        client.grade("alice", "hello", path)
+
+    answers = [GradingServiceBusy("full"), GradingServiceBusy("full"), {"verdicts": ["OK"]}]
+
+    def call(method, route, payload=None):
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(client, "_call", call)
+    assert client.grade("alice", "hello", path) == {"verdicts": ["OK"]}
+    assert answers == []
+
+    client.retry_for = 0
+    answers[:] = [GradingServiceBusy("still full"), {"verdicts": ["OK"]}]
+    with pytest.raises(GradingServiceBusy, match="still full"):
+        client.grade("alice", "hello", path)
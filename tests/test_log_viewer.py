@@ -0,0 +1,88 @@
+import os
+
+from eval_core import log_viewer
+from eval_core.log_viewer import LogIndex, LogViewer, tail
+from eval_core.utils import rotate_file
+
+LOG = os.path.join("logs", "system.log")
+
+
+def write_log(lines, path=LOG):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(line + "\n" for line in lines))
+
+
+def line(minute, session, message):
+    prefix = f"<{session}> " if session else ""
+    return f"[2026-01-31 10:{minute:02d}:00] {prefix}{message}"
+
+
+def test_tail_reads_backward_across_chunks(monkeypatch):
+    monkeypatch.setattr(log_viewer, "TAIL_CHUNK", 16)
+    write_log([f"line {i}" for i in range(100)])
+
+    assert tail(LOG, 3) == ["line 97", "line 98", "line 99"]
+    assert LogViewer(LOG).tail(200) == [f"line {i}" for i in range(100)]
+    assert LogViewer("logs/missing.log").tail() == []
+
+
+def test_search_filters_by_student_time_and_tag():
+    write_log([
+        line(0, "alice-20260131-095500", "[SANDBOX ERROR] timeout"),
+        line(1, "alicia-20260131-095500", "[SANDBOX ERROR] timeout"),
+        line(2, "bob-20260131-095600", "[GIT] pushed"),
+        line(3, None, "[CALIBRATION] done"),
+        "not a log line",
+        line(4, "alice-20260131-095500", "[GIT] pushed"),
+    ])
+    viewer = LogViewer(LOG)
+
+    assert viewer.search(student="alice") == [
+        line(0, "alice-20260131-095500", "[SANDBOX ERROR] timeout"),
+        line(4, "alice-20260131-095500", "[GIT] pushed"),
+    ]
+    assert viewer.search(tag="[git]") == [
+        line(2, "bob-20260131-095600", "[GIT] pushed"),
+        line(4, "alice-20260131-095500", "[GIT] pushed"),
+    ]
+    assert viewer.search(tag="ERROR", since="2026-01-31 10:01") == [
+        line(1, "alicia-20260131-095500", "[SANDBOX ERROR] timeout"),
+    ]
+    assert viewer.search(until="2026-01-31 10:00", limit=5) == [
+        line(0, "alice-20260131-095500", "[SANDBOX ERROR] timeout"),
+    ]
+    assert viewer.search(limit=2) == [line(3, None, "[CALIBRATION] done"),
+                                      line(4, "alice-20260131-095500", "[GIT] pushed")]
+
+
+def test_search_reads_rotated_archives_newest_last():
+    write_log([line(0, "alice-20260131-095500", "[GIT] old")])
+    rotate_file(LOG)
+    write_log([line(5, "alice-20260131-095500", "[GIT] new")])
+
+    viewer = LogViewer(LOG)
+    assert len(viewer.files()) == 2
+    assert viewer.search(student="alice") == [
+        line(0, "alice-20260131-095500", "[GIT] old"),
+        line(5, "alice-20260131-095500", "[GIT] new"),
+    ]
+
+
+def test_index_is_extended_incrementally_and_reset_on_truncation(monkeypatch):
+    monkeypatch.setattr(log_viewer, "BLOCK_SIZE", 64)
+    write_log([line(i, None, "[GIT] x") for i in range(5)])
+    index = LogIndex(LOG).load()
+    first_blocks = index.blocks
+    assert index.end == os.path.getsize(LOG) and len(first_blocks) > 1
+
+    write_log([line(10, None, "[GIT] y")])
+    index = LogIndex(LOG).load()
+    assert index.blocks[:len(first_blocks)] == first_blocks
+    assert index.end == os.path.getsize(LOG) and len(index.blocks) > len(first_blocks)
+
+    with open(LOG, "w", encoding="utf-8") as f:
+        f.write(line(20, None, "[GIT] z") + "\n")
+    index = LogIndex(LOG).load()
+    assert index.end == os.path.getsize(LOG)
+    assert [b["first"] for b in index.blocks] == ["2026-01-31 10:20:00"]
@@ -0,0 +1,95 @@
+import gzip
+import json
+import os
+import threading
+
+import pytest
+
+from eval_core.utils import Logger, JSON_LOG, SYSTEM_LOG, archive_pattern, rotate_file
+
+
+@pytest.fixture
+def quiet_logger():
+    logger = Logger(console=False, json_lines=True, flush_interval=0.05)
+    yield logger
+    logger.close()
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_records_are_written_in_order_by_the_background_thread(quiet_logger):
+    quiet_logger.set_session("alice")
+    for i in range(50):
+        quiet_logger.log(f"line {i}")
+    quiet_logger.flush()
+
+    lines = read_lines(SYSTEM_LOG)
+    assert lines[0] == "=== SYSTEM LOG ==="
+    assert [line.split("> ", 1)[1] for line in lines[1:]] == [f"line {i}" for i in range(50)]
+    assert all("<alice>" in line for line in lines[1:])
+    assert quiet_logger._thread.name == "log-writer"
+
+
+def test_levels_come_from_the_tag_and_are_filtered(quiet_logger):
+    quiet_logger.configure(level="WARNING")
+    quiet_logger.log("[SANDBOX ERROR] fork failed")
+    quiet_logger.log("[CATALOG] Indexed 3 exercises")
+    quiet_logger.log("[WARNING] disk almost full")
+    quiet_logger.flush()
+
+    records = [json.loads(line) for line in read_lines(JSON_LOG)]
+    assert [(r["level"], r["message"]) for r in records] == [
+        ("ERROR", "[SANDBOX ERROR] fork failed"),
+        ("WARNING", "[WARNING] disk almost full"),
+    ]
+
+
+def test_the_log_path_is_fixed_when_the_writer_starts(quiet_logger, tmp_path, monkeypatch):
+    quiet_logger.log("first")
+    quiet_logger.flush()
+
+    other = tmp_path / "elsewhere"
+    other.mkdir()
+    monkeypatch.chdir(other)
+    quiet_logger.log("second")
+    quiet_logger.close()
+
+    lines = read_lines(tmp_path / SYSTEM_LOG)
+    assert [line.split("] ", 1)[1] for line in lines[1:]] == ["first", "second"]
+    # Neither the records nor the shutdown sentinel touch the new cwd
+    assert not os.path.exists(other / "logs")
+
+
+def test_every_thread_keeps_its_session(quiet_logger):
+    def worker(name):
+        quiet_logger.set_session(name)
+        quiet_logger.log(f"hello from {name}")
+
+    threads = [threading.Thread(target=worker, args=(f"s{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    quiet_logger.flush()
+
+    for line in read_lines(SYSTEM_LOG)[1:]:
+        session = line.split("<", 1)[1].split(">", 1)[0]
+        assert line.endswith(f"hello from {session}")
+
+
+def test_rotation_compresses_and_keeps_the_newest_backups(workdir):
+    os.makedirs("logs")
+    for i in range(4):
+        with open(SYSTEM_LOG, "w", encoding="utf-8") as f:
+            f.write(f"generation {i}\n")
+        rotate_file(SYSTEM_LOG, backups=2)
+
+    archives = sorted(p for p in os.listdir("logs") if p.endswith(".gz"))
+    assert len(archives) == 2
+    with gzip.open(os.path.join("logs", archives[-1]), "rt", encoding="utf-8") as f:
+        assert f.read() == "generation 3\n"
+    assert not os.path.exists(SYSTEM_LOG)
+    assert archive_pattern(SYSTEM_LOG).endswith("system-*.log.gz")
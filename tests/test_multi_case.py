@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from eval_core.sandbox_runner import SandboxRunner
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="multi-case mode forks per case")
+
+PROGRAM = """
+import sys
+seen = globals().setdefault("seen", [])
+seen.append(1)
+value = input()
+if value == "crash":
+    sys.exit(3)
+print(value, len(seen))
+"""
+
+
+def test_one_launch_keeps_every_case_isolated(write_file):
+    path = write_file("prog.py", PROGRAM)
+    results = SandboxRunner(timeout=5).run_many(path, "python", ["a\n", "b\n", "c\n"])
+
+    # Each case starts from a fresh module: no state leaks between cases
+    assert [r.stdout for r in results] == ["a 1\n", "b 1\n", "c 1\n"]
+    assert all(r.exit_code == 0 for r in results)
+
+
+def test_stops_after_the_first_failing_case(write_file):
+    path = write_file("prog.py", PROGRAM)
+    runner = SandboxRunner(timeout=5)
+
+    results = runner.run_many(path, "python", ["a\n", "crash\n", "c\n"])
+    assert [r.exit_code for r in results] == [0, 3]
+
+    results = runner.run_many(path, "python", ["a\n", "crash\n", "c\n"], stop_on_error=False)
+    assert [r.exit_code for r in results] == [0, 3, 0]
+
+
+def test_cases_run_in_a_real_main_module(write_file):
+    path = write_file("pick.py", "import pickle, __main__\n"
+                                 "class P:\n    pass\n"
+                                 "print(hasattr(__main__, 'P'), type(pickle.loads(pickle.dumps(P()))).__name__)\n")
+    results = SandboxRunner(timeout=5).run_many(path, "python", ["", ""])
+
+    assert [(r.stdout, r.exit_code) for r in results] == [("True P\n", 0)] * 2
@@ -0,0 +1,84 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from eval_core.preflight import CompileError, NativePreflight
+from eval_core.sandbox_runner import SandboxRunner
+
+pytestmark = pytest.mark.skipif(shutil.which("gcc") is None or shutil.which("g++") is None,
+                                reason="gcc / g++ are not installed")
+
+C_DOUBLE = "#include <stdio.h>\nint main(void) { int n; scanf(\"%d\", &n); printf(\"%d\\n\", 2 * n); return 0; }\n"
+CPP_SUM = ("#include <iostream>\nint main() { long a, b; std::cin >> a >> b;\n"
+           "  std::cout << a + b << std::endl; }\n")
+
+
+def test_c_and_cpp_submissions_run(write_file):
+    runner = SandboxRunner(timeout=10)
+
+    res = runner.run(write_file("double.c", C_DOUBLE), "c", "21\n")
+    assert (res.stdout, res.exit_code) == ("42\n", 0)
+    assert runner.run_many(write_file("sum.cpp", CPP_SUM), "cpp",
+                           ["1 2\n", "40 2\n"], stop_on_error=False)[1].stdout == "42\n"
+
+
+def test_compile_errors_are_reported_with_their_line(write_file):
+    path = write_file("bad.c", "int main(void) {\n  return 0\n}\n")
+    res = SandboxRunner(timeout=10).run(path, "c", "")
+
+    assert res.compile_error["line"] in (2, 3)
+    assert res.compile_error["message"].startswith("error:")
+    assert res.exit_code == 1
+
+
+def test_builds_and_errors_are_cached(write_file, monkeypatch):
+    preflight = NativePreflight(cache_dir="build")
+    path = write_file("double.c", C_DOUBLE)
+    binary = preflight.check(path, "c")
+
+    # Same source elsewhere: the cached binary, no compiler run
+    monkeypatch.setattr("eval_core.preflight.subprocess.run",
+                        lambda *a, **k: pytest.fail("recompiled"))
+    assert preflight.check(write_file("other/double.c", C_DOUBLE), "c") == binary
+    monkeypatch.undo()
+
+    bad = write_file("bad.c", "int main(void) { return x; }\n")
+    with pytest.raises(CompileError) as first:
+        preflight.check(bad, "c")
+    monkeypatch.setattr("eval_core.preflight.subprocess.run",
+                        lambda *a, **k: pytest.fail("recompiled"))
+    with pytest.raises(CompileError) as again:
+        preflight.check(bad, "c")
+    assert again.value.details == first.value.details
+
+
+def test_flags_change_the_build_and_the_cache_is_bounded(write_file):
+    path = write_file("double.c", C_DOUBLE)
+    default = NativePreflight(cache_dir="build", max_entries=2)
+    custom = NativePreflight({"c": {"flags": ["-O0"]}}, cache_dir="build", max_entries=2)
+
+    assert custom.build_config("c")["libs"] == ["-lm"]
+    assert NativePreflight({"rust": {"compiler": "rustc"}}).build_config("rust")["flags"] == []
+    assert default.check(path, "c") != custom.check(path, "c")
+
+    for i in range(3):
+        default.check(write_file(f"p{i}.c", C_DOUBLE.replace("2 *", f"{i + 3} *")), "c")
+    assert len(os.listdir("build")) == 2
+
+
+def test_a_timed_out_build_leaves_no_temp_file(write_file, monkeypatch):
+    preflight = NativePreflight(cache_dir="build")
+    preflight.toolchain("gcc")
+
+    def slow_compiler(command, **kwargs):
+        output = command[command.index("-o") + 1]
+        with open(output, "wb") as f:
+            f.write(b"half a binary")
+        raise subprocess.TimeoutExpired(command, kwargs["timeout"])
+
+    monkeypatch.setattr("eval_core.preflight.subprocess.run", slow_compiler)
+    with pytest.raises(CompileError, match="timed out"):
+        preflight.check(write_file("double.c", C_DOUBLE), "c")
+    assert os.listdir("build") == []
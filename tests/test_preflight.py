@@ -0,0 +1,99 @@
+import os
+import marshal
+
+import pytest
+
+from eval_core import sandbox_runner
+from eval_core.preflight import CompileError, PythonPreflight
+from eval_core.sandbox_runner import SandboxRunner
+
+
+def test_python_syntax_errors_carry_the_position(write_file):
+    path = write_file("bad.py", "print('ok')\nif True\n    pass\n")
+
+    with pytest.raises(CompileError) as error:
+        PythonPreflight().check(path)
+    assert error.value.details["line"] == 2
+    assert error.value.details["message"].startswith("SyntaxError:")
+    assert "bad.py" in str(error.value)
+
+    with open(path, "wb") as f:
+        f.write(b"print(1)\0\n")
+    with pytest.raises(CompileError):
+        PythonPreflight().check(path)
+
+
+def test_the_bytecode_is_cached_away_from_the_source(write_file):
+    path = write_file("sub/ok.py", "print(1)\n")
+    pyc = PythonPreflight(cache_dir="pyc", max_entries=2).check(path)
+
+    assert pyc.startswith(os.path.abspath("pyc")) and os.path.exists(pyc)
+    assert os.listdir(os.path.dirname(path)) == ["ok.py"]
+    # Same source, other student: its own code object (tracebacks name its file)
+    assert PythonPreflight(cache_dir="pyc").check(write_file("other/ok.py", "print(1)\n")) != pyc
+
+    for i in range(3):
+        PythonPreflight(cache_dir="pyc", max_entries=2).check(write_file(f"p{i}.py", f"print({i})\n"))
+    assert len(os.listdir(os.path.dirname(pyc))) == 2
+
+
+def test_runs_start_from_the_preflight_bytecode(write_file):
+    runner = SandboxRunner(timeout=5)
+    path = write_file("sub/main.py", "import os\nprint(__name__, os.path.basename(__file__))\n")
+
+    assert runner.preflight(path, "python") is None
+    assert runner.run(path, "python", "").stdout == "__main__ main.py\n"
+
+    # Swap the cached code object: the next run executes it, not the source
+    pyc = runner._artifact(path)
+    with open(pyc, "r+b") as f:
+        f.seek(16)
+        f.truncate()
+        f.write(marshal.dumps(compile("print('cached', __name__, __file__)", path, "exec")))
+    assert runner.run(path, "python", "").stdout == f"cached __main__ {path}\n"
+
+
+def test_the_preflight_bytecode_runs_like_the_source(write_file):
+    runner = SandboxRunner(timeout=5)
+    write_file("sub/case_files.py", "WHO = 'student'\n")
+    path = write_file("sub/main.py", "import pickle, __main__\nfrom case_files import WHO\n"
+                                     "class P:\n    pass\n"
+                                     "print(WHO, hasattr(__main__, 'P'), bool(pickle.dumps(P())))\n")
+
+    assert runner.preflight(path, "python") is None
+    assert runner._artifact(path) is not None
+    res = runner.run(path, "python", "")
+    assert (res.stdout, res.exit_code) == ("student True True\n", 0)
+
+
+def test_preflight_results_are_cached_per_file_version(write_file, monkeypatch):
+    runner = SandboxRunner(timeout=5)
+    checked = []
+    check = runner.python_preflight.check
+    monkeypatch.setattr(runner.python_preflight, "check",
+                        lambda path: checked.append(path) or check(path))
+
+    path = write_file("ok.py", "print(1)\n")
+    assert runner.preflight(path, "python") is None
+    assert runner.preflight(path, "python") is None
+    assert len(checked) == 1
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("print(\n")
+    os.utime(path, ns=(1, 10 ** 18))
+    failed = runner.preflight(path, "python")
+    assert failed.compile_error["line"] == 1 and failed.exit_code == 1
+    assert len(checked) == 2
+
+
+def test_the_artifact_cache_is_bounded(write_file, monkeypatch):
+    monkeypatch.setattr(sandbox_runner, "ARTIFACT_CACHE_SIZE", 2)
+    runner = SandboxRunner(timeout=5)
+    paths = [write_file(f"s{i}.py", "print(1)\n") for i in range(3)]
+
+    for path in paths:
+        runner.preflight(path, "python")
+    runner.preflight(paths[1], "python")
+    runner.preflight(write_file("s3.py", "print(1)\n"), "python")
+
+    assert [os.path.basename(p) for p in runner._artifacts] == ["s1.py", "s3.py"]
@@ -0,0 +1,122 @@
+import os
+import json
+import shutil
+import threading
+import subprocess
+
+import pytest
+
+from eval_core.git_manager import GitManager
+from eval_core.publish_queue import PublishQueue
+
+
+class FakeGit:
+    """
+    GitManager stand-in: publish_batch() fails `failures` times, then succeeds.
+    """
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def publish_batch(self, students):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                return False
+            self.batches.append(list(students))
+            return True
+
+
+def saved_pending(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["pending"]
+
+
+def test_students_queued_together_share_one_push(workdir):
+    git = FakeGit()
+    queue = PublishQueue(git, queue_file="q.json", batch_window=0.3)
+    for student in ("alice", "bob", "carol"):
+        queue.enqueue(student)
+
+    assert queue.close(timeout=10) is True
+    assert git.batches == [["alice", "bob", "carol"]]
+    assert saved_pending("q.json") == []
+
+
+def test_a_failed_push_is_retried(workdir):
+    git = FakeGit(failures=2)
+    queue = PublishQueue(git, queue_file="q.json", batch_window=0, base_delay=0.05)
+    queue.enqueue("alice")
+
+    assert queue.close(timeout=10) is True
+    assert git.batches == [["alice"]]
+
+
+def test_pending_results_survive_a_restart(workdir):
+    offline = FakeGit(failures=10 ** 6)
+    first = PublishQueue(offline, queue_file="q.json", batch_window=0, base_delay=60)
+    first.enqueue("alice")
+    first.enqueue("bob")
+    assert first.close(timeout=0.5) is False
+    assert saved_pending("q.json") == ["alice", "bob"]
+
+    # Next run of the app: caught up without anyone enqueuing again
+    online = FakeGit()
+    second = PublishQueue(online, queue_file="q.json", batch_window=0)
+    assert second.pending() == ["alice", "bob"]
+    second.start()
+    assert second.close(timeout=10) is True
+    assert online.batches == [["alice", "bob"]]
+    assert saved_pending("q.json") == []
+
+
+def test_queues_sharing_the_file_lose_nobody(workdir):
+    git = FakeGit()
+    queues = [PublishQueue(git, queue_file="q.json", batch_window=0.05) for _ in range(4)]
+    threads = [threading.Thread(target=queue.enqueue, args=(f"s{i}",))
+               for i, queue in enumerate(queues)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(queue.close(timeout=10) for queue in queues)
+    published = [student for batch in git.batches for student in batch]
+    assert sorted(published) == ["s0", "s1", "s2", "s3"]
+    assert saved_pending("q.json") == []
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_republishing_unchanged_results_is_a_success(workdir, write_file):
+    def git(*args, cwd=None):
+        subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+    git("init", "--bare", "-b", "main", "remote.git")
+    git("clone", "remote.git", "submissions")
+    for key, value in (("user.email", "t@example.com"), ("user.name", "t")):
+        git("config", key, value, cwd="submissions")
+    write_file("results/alice/results.json", "{}")
+
+    manager = GitManager(os.path.abspath("remote.git"))
+    queue = PublishQueue(manager, queue_file="q.json", batch_window=0)
+    queue.enqueue("alice")
+    assert queue.flush(timeout=30) is True
+
+    # Already committed and pushed, or no folder at all: nothing stays queued
+    queue.enqueue("alice")
+    queue.enqueue("nobody")
+    assert queue.close(timeout=30) is True
+    assert saved_pending("q.json") == []
+
+
+def test_a_missing_repository_keeps_the_results_queued(workdir, write_file, monkeypatch):
+    write_file("results/alice/results.json", "{}")
+    manager = GitManager("unreachable", repo_dir="submissions")
+    clones = []
+    monkeypatch.setattr(manager, "clone_if_needed", lambda: clones.append(1))
+
+    # Failed clone: retried once, nothing counts as published
+    assert manager.publish_batch(["alice", "nobody"]) is False
+    assert clones == [1]
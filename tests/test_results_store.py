@@ -0,0 +1,100 @@
+import os
+import sqlite3
+
+import pytest
+
+from conftest import write_json
+from eval_core.results_store import ResultsStore
+
+
+def results(student, total, passed, exercises):
+    return {
+        "student": student,
+        "qcm_score": 5,
+        "exercises": [{"exercise": name, "success": ok, "points": points}
+                      for name, ok, points in exercises],
+        "total_score": total,
+        "passed": passed
+    }
+
+
+@pytest.fixture
+def store():
+    store = ResultsStore(os.path.join("data", "results.db"))
+    store.save_many([
+        (results("alice", 80, True, [("01_hello", True, 10), ("02_sum", True, 20)]), None),
+        (results("bob", 40, False, [("01_hello", True, 10), ("02_sum", False, 0)]), None),
+        (results("carol", 60, True, [("01_hello", False, 0)]), None),
+    ])
+    return store
+
+
+def test_get_returns_the_results_json_schema(store):
+    assert store.count() == 3
+    assert store.get("bob") == results("bob", 40, False,
+                                       [("01_hello", True, 10), ("02_sum", False, 0)])
+    assert store.get("nobody") is None
+
+
+def test_saving_again_replaces_the_student(store):
+    store.save(results("bob", 70, True, [("02_sum", True, 20)]))
+
+    assert store.count() == 3
+    assert store.get("bob")["exercises"] == [{"exercise": "02_sum", "success": True, "points": 20}]
+    store.delete("bob")
+    assert store.get("bob") is None and store.count() == 2
+
+
+def test_filters_and_leaderboard(store):
+    assert [row[0] for row in store.students(passed=True)] == ["alice", "carol"]
+    assert [row[0] for row in store.students(exercise="02_sum")] == ["alice"]
+    # A missing exercise counts as failed
+    assert [row[0] for row in store.students(exercise="02_sum", exercise_success=False)] == ["bob", "carol"]
+    assert store.leaderboard(limit=2) == [("alice", 80, True), ("carol", 60, True)]
+    assert store.exercise_stats() == {"01_hello": 2, "02_sum": 1}
+
+
+def test_import_tree_skips_unchanged_files():
+    write_json("results/dave/results.json",
+               results("dave", 90, True, [("01_hello", True, 10)]))
+    os.makedirs("results/erin")
+    with open("results/erin/results.json", "w", encoding="utf-8") as f:
+        f.write("{ not json")
+
+    store = ResultsStore(os.path.join("data", "results.db"))
+    assert store.import_tree("results") == (1, 0, 1)
+    assert store.get("dave")["total_score"] == 90
+
+    assert store.import_tree("results") == (0, 1, 1)
+
+    write_json("results/dave/results.json",
+               results("dave", 95, True, [("01_hello", True, 10)]))
+    os.utime("results/dave/results.json", ns=(1, 10 ** 18))
+    assert store.import_tree("results") == (1, 0, 1)
+    assert store.get("dave")["total_score"] == 95
+
+
+def test_get_keeps_the_exam_order_and_the_optional_keys():
+    store = ResultsStore(os.path.join("data", "results.db"))
+    saved = results("alice", 75, True, [("05_zeta", True, 20), ("01_alpha", False, 0)])
+    saved["variant"] = 12
+    saved["exercises"][0].update(variation="plus", efficiency=0.8)
+    store.save(saved)
+
+    assert store.get("alice") == saved
+
+
+def test_an_index_with_the_old_schema_is_rebuilt_from_results():
+    write_json("results/dave/results.json",
+               results("dave", 90, True, [("02_b", True, 10), ("01_a", True, 10)]))
+    os.makedirs("data")
+    db = sqlite3.connect(os.path.join("data", "old.db"))
+    db.executescript("""CREATE TABLE students (student TEXT PRIMARY KEY, qcm_score NUMERIC,
+                            total_score NUMERIC, passed INTEGER, updated_at REAL, source TEXT,
+                            source_mtime_ns INTEGER);
+                        CREATE TABLE exercises (student TEXT, exercise TEXT, success INTEGER,
+                            points NUMERIC);""")
+    db.close()
+
+    store = ResultsStore(os.path.join("data", "old.db"))
+    assert [e["exercise"] for e in store.get("dave")["exercises"]] == ["02_b", "01_a"]
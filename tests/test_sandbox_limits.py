@@ -0,0 +1,106 @@
+import sys
+
+import pytest
+
+from eval_core.comparator import Comparator
+from eval_core.fork_server import DEFAULT_LIMITS
+from eval_core.sandbox_runner import SandboxRunner
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"),
+                                reason="rlimits and wait4 accounting are Linux only")
+
+
+def test_cpu_limit_gives_a_timeout(write_file):
+    path = write_file("spin.py", "while True:\n    pass\n")
+    res = SandboxRunner(timeout=10, limits={"cpu_seconds": 1}).run(path, "python", "")
+
+    assert res.limit_exceeded == "time"
+    assert 0.9 <= res.cpu_time < 3
+
+
+def test_memory_limit_gives_a_memory_verdict(write_file):
+    path = write_file("hog.py", "data = bytearray(512 * 1024 * 1024)\n")
+    res = SandboxRunner(timeout=10, limits={"memory_mb": 128}).run(path, "python", "")
+
+    assert res.exit_code != 0
+    assert res.limit_exceeded == "memory"
+
+
+@pytest.mark.parametrize("backend", ["subprocess", "warm"])
+def test_only_a_real_memory_error_is_a_memory_verdict(backend, write_file, make_exercise):
+    make_exercise("any", [])
+    fake = write_file("fake.py", "import sys\nprint('MemoryError', file=sys.stderr)\nsys.exit(1)\n")
+    hog = write_file("hog.py", "data = bytearray(512 * 1024 * 1024)\n")
+    runner = SandboxRunner(timeout=10, backend=backend, pool_size=1, limits={"memory_mb": 128})
+    try:
+        fakes = [runner.run(fake, "python", "")] + runner.run_many(fake, "python", [""])
+        hogs = [runner.run(hog, "python", "")] + runner.run_many(hog, "python", [""])
+    finally:
+        if runner.pool is not None:
+            runner.pool.close()
+
+    comparator = Comparator()
+    assert [comparator.verdict(r, "") for r in fakes] == ["runtime", "runtime"]
+    assert [comparator.verdict(r, "") for r in hogs] == ["memory", "memory"]
+
+
+def test_output_limit_stops_the_run(write_file):
+    path = write_file("flood.py", "while True:\n    print('x' * 1000)\n")
+    res = SandboxRunner(timeout=10, limits={"max_output_kb": 64}).run(path, "python", "")
+
+    assert res.limit_exceeded == "output"
+    assert len(res.stdout) <= 64 * 1024
+
+
+def test_resources_are_reported(write_file):
+    path = write_file("ok.py", "print(sum(range(10 ** 6)))\n")
+    res = SandboxRunner(timeout=10).run(path, "python", "")
+
+    assert res.exit_code == 0
+    assert res.cpu_time > 0 and res.peak_rss_kb > 0 and res.wall_time > 0
+
+
+def test_the_launcher_runs_the_file_like_python3_does(write_file):
+    write_file("pkg/helper.py", "VALUE = 7\n")
+    path = write_file("pkg/main.py", "import os, sys\nfrom helper import VALUE\n"
+                                     "print(VALUE, os.path.basename(__file__), __name__)\n"
+                                     "print(__spec__, type(__loader__).__name__, __cached__)\n"
+                                     "sys.exit(4)\n")
+    res = SandboxRunner(timeout=10).run(path, "python", "")
+
+    assert res.stdout == "7 main.py __main__\nNone SourceFileLoader None\n"
+    assert res.exit_code == 4
+
+    # Same exit as python3 for a message and for an exception
+    path = write_file("bye.py", "import sys\nsys.exit('bye')\n")
+    res = SandboxRunner(timeout=10).run(path, "python", "")
+    assert (res.stderr, res.exit_code) == ("bye\n", 1)
+    path = write_file("boom.py", "raise ValueError('boom')\n")
+    res = SandboxRunner(timeout=10).run(path, "python", "")
+    assert res.stderr.endswith("ValueError: boom\n") and res.exit_code == 1
+
+
+def test_process_count_is_only_limited_when_configured(write_file):
+    assert "max_processes" not in DEFAULT_LIMITS
+    assert "max_processes" not in SandboxRunner().limits()
+
+    path = write_file("nproc.py", "import resource\nprint(resource.getrlimit(resource.RLIMIT_NPROC)[0])\n")
+    unlimited = SandboxRunner(timeout=10).run(path, "python", "")
+    limited = SandboxRunner(timeout=10, limits={"max_processes": 4096}).run(path, "python", "")
+
+    import resource
+    assert unlimited.stdout == f"{resource.getrlimit(resource.RLIMIT_NPROC)[0]}\n"
+    assert limited.stdout == "4096\n"
+
+
+def test_exit_runs_threads_and_atexit_handlers(write_file):
+    path = write_file("bye.py", "import atexit, sys, threading, time\n"
+                                "atexit.register(lambda: print('bye'))\n"
+                                "def late():\n"
+                                "    time.sleep(0.2)\n"
+                                "    print('thread')\n"
+                                "threading.Thread(target=late).start()\n"
+                                "sys.stdout.write('main ')\n")
+    res = SandboxRunner(timeout=10).run(path, "python", "")
+
+    assert (res.stdout, res.exit_code) == ("main thread\nbye\n", 0)
@@ -0,0 +1,100 @@
+import os
+import random
+
+from eval_core.catalog import ExerciseCatalog
+from eval_core.similarity import (
+    KGRAM, WINDOW, SimilarityIndex, fingerprints, line_ranges, tokens_of
+)
+
+ORIGINAL = '''def count_primes(limit):
+    # sieve of Eratosthenes
+    sieve = [True] * (limit + 1)
+    sieve[0] = sieve[1] = False
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            for j in range(i * i, limit + 1, i):
+                sieve[j] = False
+    return sum(sieve)
+
+
+n = int(input())
+print(count_primes(n))
+'''
+
+# Same program: names, literals, comments and spacing changed
+DISGUISED = '''def how_many(maximum):
+    flags = [True]*(maximum+1)
+    flags[0] = flags[1] = False
+
+
+    for k in range(3, int(maximum**0.5)+7):
+        if flags[k]:
+            for m in range(k*k, maximum+1, k):   # cross out
+                flags[m] = False
+    return sum(flags)
+value = int(input())
+print(how_many(value))
+'''
+
+UNRELATED = '''words = input().split()
+seen = {}
+for word in words:
+    seen[word] = seen.get(word, 0) + 1
+best = max(seen, key=seen.get)
+print(best, seen[best])
+'''
+
+
+def prints_of(source, path="x.py"):
+    return fingerprints(tokens_of(source, path))
+
+
+def test_a_disguised_copy_has_the_same_fingerprints():
+    original, disguised = prints_of(ORIGINAL), prints_of(DISGUISED)
+
+    assert len(original) >= 5
+    assert set(original) == set(disguised)
+    assert not set(original) & set(prints_of(UNRELATED))
+    assert prints_of("x = 1\n") == {}
+
+
+def test_every_long_enough_match_is_found():
+    rng = random.Random(3)
+    vocabulary = [chr(c) for c in range(ord("a"), ord("z") + 1)]
+    for _ in range(50):
+        shared = [rng.choice(vocabulary) for _ in range(KGRAM + WINDOW - 1)]
+        a = [rng.choice(vocabulary) for _ in range(rng.randrange(30))] + shared
+        b = shared + [rng.choice(vocabulary) for _ in range(rng.randrange(30))]
+        prints_a = fingerprints([(t, 1) for t in a])
+        prints_b = fingerprints([(t, 1) for t in b])
+        assert set(prints_a) & set(prints_b)
+
+
+def test_fingerprints_keep_the_first_line_and_c_is_normalised_too():
+    source = "int main(void) {\n  int total = 0;\n  for (int i = 0; i < 10; i++) total += i;\n" \
+             "  printf(\"%d\\n\", total);\n  return 0;\n}\n"
+    renamed = "int main(void)\n{\n  int acc = 0; /* sum */\n  for (int k = 0; k < 99; k++) acc += k;\n" \
+              "  printf(\"%d\\n\", acc);\n  return 0;\n}\n"
+
+    assert set(prints_of(source, "a.c")) == set(prints_of(renamed, "b.c"))
+    assert min(prints_of(source, "a.c").values()) == 1
+    assert line_ranges([9, 3, 4, 5, 4]) == "3-5, 9"
+
+
+def test_the_index_reports_the_copied_pair(make_exercise, write_file):
+    make_exercise("primes", [], filename="primes.py")
+    write_file("results/alice/primes.py", ORIGINAL)
+    write_file("results/bob/primes.py", DISGUISED)
+    write_file("results/carol/primes.py", UNRELATED)
+    catalog = ExerciseCatalog("exercises")
+    index = SimilarityIndex(os.path.join("data", "similarity.db"))
+
+    assert index.index_tree(catalog, "results") == (3, 0, 0)
+    pairs = index.suspicious_pairs()
+    assert [(p["students"], p["similarity"]) for p in pairs] == [(("alice", "bob"), 1.0)]
+    lines_a, lines_b = index.shared_lines(*pairs[0]["ids"])
+    assert lines_a and max(lines_b) <= len(DISGUISED.splitlines())
+
+    os.remove("results/carol/primes.py")
+    assert index.index_tree(catalog, "results") == (0, 2, 1)
+    assert index.count() == 2
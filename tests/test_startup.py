@@ -0,0 +1,83 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from conftest import ROOT, write_json
+from eval_core.git_manager import GitManager
+from eval_core.utils import logger
+
+OPTIONAL_MODULES = ["sqlite3", "gzip", "ctypes", "asyncio", "eval_core.admin",
+                    "eval_core.log_viewer", "eval_core.grading_service", "eval_core.watcher",
+                    "eval_core.results_store"]
+
+
+@pytest.mark.parametrize("module", ["app", "eval_core.engine"])
+def test_a_student_session_skips_optional_modules(module):
+    code = (f"import sys, {module}\n"
+            f"print([m for m in {OPTIONAL_MODULES!r} if m in sys.modules])")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+
+    assert out.stdout.strip() == "[]"
+
+
+def test_the_session_reads_only_eval_config_up_front(monkeypatch):
+    monkeypatch.setattr(logger, "_session", threading.local())
+    monkeypatch.setattr(logger, "default_session", None)
+    monkeypatch.setattr(logger, "console", False)
+    with open(os.path.join(ROOT, "config", "eval_config.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    write_json("config/eval_config.json", dict(config, log_console=False, git_repo=""))
+    write_json("config/exercises.json", {"exercises": []})
+    os.makedirs("exercises")
+
+    from eval_core.engine import EvaluationEngine
+    engine = EvaluationEngine("alice")
+
+    assert engine.publisher is None and engine.git._clone_thread is None
+    assert not {"qcm_data", "roasts", "exercises_data"} & set(vars(engine))
+    assert engine.exercises_data == {"exercises": []}
+    with pytest.raises(Exception):
+        engine.qcm_data  # config/qcm.json was never needed until now
+
+
+def test_the_clone_runs_in_the_background_and_publishing_waits(monkeypatch):
+    manager = GitManager("unused")
+    release = threading.Event()
+    os.makedirs(os.path.join("results", "alice"))
+
+    def clone():
+        release.wait()
+        os.makedirs("submissions", exist_ok=True)
+
+    monkeypatch.setattr(manager, "clone_if_needed", clone)
+
+    assert manager.clone_in_background() is manager
+    assert manager.wait_ready(timeout=0.05) is False
+
+    published = []
+    monkeypatch.setattr(manager, "sync_student", lambda student: published.append(student))
+    publisher = threading.Thread(target=manager.publish_batch, args=(["alice"],))
+    publisher.start()
+    publisher.join(timeout=0.1)
+    assert published == []
+
+    release.set()
+    publisher.join(timeout=5)
+    assert published == ["alice"] and manager.wait_ready(timeout=0)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_background_clone_of_a_real_repository():
+    subprocess.run(["git", "init", "--bare", "-b", "main", "remote.git"],
+                   check=True, capture_output=True)
+
+    manager = GitManager(os.path.abspath("remote.git")).clone_in_background()
+
+    assert manager.wait_ready(timeout=30)
+    assert os.path.isdir(os.path.join("submissions", ".git"))
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from eval_core.comparator import Comparator
+from eval_core.sandbox_runner import SandboxRunner
+from eval_core.stream_compare import StreamMatcher
+
+
+def feed_all(expected, chunks):
+    matcher = StreamMatcher(expected)
+    for chunk in chunks:
+        if not matcher.feed(chunk):
+            return matcher, False
+    return matcher, matcher.finish()
+
+
+@pytest.mark.parametrize("chunks", [
+    [b"1\r\n2\r\n3\r\n"],
+    [b"1\r", b"\n2\r", b"\n3\r", b"\n"],        # \r\n split across chunks
+    [b"1\n2\r\n3"],                              # mixed endings, no final newline
+])
+def test_crlf_matches_lf(chunks):
+    assert feed_all("1\n2\n3\n", chunks)[1] is True
+
+
+@pytest.mark.parametrize("chunks", [
+    [b"1\n2\n3\n\n\n"],
+    [b"1\n2\n3   \t\n"],
+    [b"1\n2\n3", b" ", b"\n", b"\r\n"],
+])
+def test_trailing_whitespace_at_the_end_is_ignored(chunks):
+    assert feed_all("1\n2\n3\n", chunks)[1] is True
+
+
+def test_trailing_whitespace_inside_the_output_is_a_difference():
+    matcher, ok = feed_all("ab\ncd\n", [b"ab \ncd\n"])
+    assert ok is False
+    assert matcher.mismatch["line"] == 1 and matcher.mismatch["column"] == 3
+
+
+def test_divergence_is_reported_before_the_end():
+    matcher = StreamMatcher("hello\nworld\n")
+    assert matcher.feed(b"hello\nwor") is True
+    assert matcher.feed(b"ms") is False
+    assert matcher.mismatch == {"line": 2, "column": 4, "expected": "world", "got": "worms"}
+
+
+def test_missing_output_is_a_difference():
+    matcher, ok = feed_all("1\n2\n", [b"1\n"])
+    assert ok is False
+    assert matcher.mismatch["got"] == "<end of output>"
+
+
+def test_long_trailing_whitespace_is_accepted_chunk_by_chunk():
+    matcher = StreamMatcher("1\n")
+    assert matcher.feed(b"1") is True
+    for _ in range(100):
+        assert matcher.feed(b" " * 10000) is True
+    assert matcher.finish() is True
+
+
+@pytest.mark.parametrize("chunks", [
+    ["2\u3000".encode()[:2], "2\u3000".encode()[2:]],   # split inside a character
+    [b"2\xe3\x80"],                                    # unfinished character
+])
+def test_trailing_utf8_is_decoded_across_chunks(chunks):
+    assert feed_all("2\n", chunks)[1] is ("\u3000" in b"".join(chunks).decode("utf-8", "replace"))
+
+
+@pytest.mark.parametrize("got", [
+    "1\n2\n", "1\r\n2\r\n", "1\n2  \n\n", "1\n3\n", "1\n", "1 \n2\n",
+    "1\n2" + " " * 10000,
+    "1\n2\x0b\x0c\x1c\x85\xa0\u2003\u3000\n",     # whitespace for str.rstrip only
+    "1\n2\u200b\n",                                  # zero width space: not whitespace
+])
+@pytest.mark.parametrize("expected", ["1\n2\n", "1\n2\u3000\xa0\n"])
+@pytest.mark.parametrize("as_file", [False, True])
+def test_streaming_and_plain_comparison_agree(got, expected, as_file, make_exercise, write_file):
+    make_exercise("any", [])
+    plain = Comparator().compare(got.replace("\r\n", "\n"), expected)
+    if as_file:
+        expected = {"file": write_file("01.out", expected)}
+    assert feed_all(expected, [got.encode()])[1] is plain
+
+
+def test_the_run_is_killed_at_the_first_divergence(write_file):
+    path = write_file("slow.py", "import time\nprint('wrong', flush=True)\ntime.sleep(10)\n")
+    start = time.monotonic()
+    res = SandboxRunner(timeout=20).run(path, "python", "", expected="right\n")
+
+    assert res.stream_match is False
+    assert res.mismatch["got"] == "wrong"
+    assert time.monotonic() - start < 5
@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+
+from eval_core import tracing
+from eval_core.tracing import NULL_SPAN, Tracer, traced
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False, trace_dir="traces")
+
+    assert tracer.span("compile") is NULL_SPAN
+    with tracer.span("compile") as s:
+        s.set(verdict="ok")
+    assert tracer.summary() == {}
+    assert tracer.export("alice") is None
+    assert not os.path.exists("traces")
+
+
+def test_nested_spans_are_exported_as_chrome_trace_events():
+    tracer = Tracer(enabled=True, trace_dir="traces")
+    with tracer.span("grade", "eval", exercise="01_hello"):
+        for _ in range(2):
+            with tracer.span("run", "sandbox") as s:
+                s.set(exit_code=0)
+    with pytest.raises(ValueError):
+        with tracer.span("run", "sandbox"):
+            raise ValueError
+
+    path = tracer.export("alice-20260131-100000")
+    assert path == os.path.join("traces", "alice-20260131-100000.trace.json")
+
+    with open(path, encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [e["name"] for e in spans] == ["run", "run", "grade", "run"]
+    assert spans[0]["args"] == {"exit_code": 0}
+    assert spans[3]["args"] == {"error": "ValueError"}
+    grade = spans[2]
+    assert grade["args"] == {"exercise": "01_hello"}
+    assert grade["ts"] <= spans[0]["ts"] and spans[1]["ts"] + spans[1]["dur"] <= grade["ts"] + grade["dur"]
+    assert any(e["ph"] == "M" and e["name"] == "thread_name" for e in events)
+
+    with open(os.path.join("traces", "alice-20260131-100000.summary.json"), encoding="utf-8") as f:
+        summary = json.load(f)
+    assert summary["session"] == "alice-20260131-100000"
+    assert summary["spans"]["run"]["count"] == 3
+    assert summary["spans"]["run"]["cat"] == "sandbox"
+    assert list(summary["spans"]) == list(tracer.summary())
+
+
+def test_traced_checks_the_global_tracer_at_call_time(monkeypatch):
+    monkeypatch.setattr(tracing, "tracer", Tracer(enabled=False))
+
+    @traced()
+    def work():
+        return 42
+
+    assert work() == 42
+    assert tracing.tracer.summary() == {}
+
+    tracing.tracer.configure(enabled=True)
+    assert work() == 42
+    assert list(tracing.tracer.summary()) == [work.__wrapped__.__qualname__]
@@ -0,0 +1,131 @@
+import itertools
+import math
+
+import pytest
+
+from conftest import write_json
+from eval_core.catalog import ExerciseCatalog
+from eval_core.comparator import Comparator
+from eval_core.grader import SubmissionGrader
+from eval_core.sandbox_runner import SandboxRunner
+from eval_core.variants import (
+    VariantError, VariantFile, exam_bank, generate_variants, permutation_rank,
+    permutation_unrank, resolve_exercises, resolve_questions
+)
+
+QCM = {"questions": [
+    {"id": f"q{i}", "choices": ["A: yes", "B: no", "C: maybe", "D: never"], "answer": "B"}
+    for i in range(6)
+]}
+EXERCISES = {"exercises": [{"name": name, "language": "python"}
+                           for name in ("double", "triple", "missing")]}
+
+
+@pytest.fixture
+def catalog(make_exercise):
+    make_exercise("double", [{"input": "2\n", "output": "4\n"}],
+                  meta={"variations": ["plus", "untested"]},
+                  files={"variations/plus.json": '{"tests": [{"input": "2\\n", "output": "3\\n"}]}'})
+    make_exercise("triple", [{"input": "2\n", "output": "6\n"}])
+    return ExerciseCatalog("exercises", check_interval=0)
+
+
+def test_choice_orders_fit_in_two_bytes():
+    for perm in itertools.permutations(range(4)):
+        assert permutation_unrank(permutation_rank(list(perm)), 4) == list(perm)
+    assert permutation_rank(list(range(8))[::-1]) == math.factorial(8) - 1 < 2 ** 16
+
+
+def test_only_variations_with_tests_are_drawn(catalog):
+    assert catalog.variations("double") == ["plus"]
+
+    bank = exam_bank(QCM, EXERCISES, catalog)
+    assert bank["exercises"] == [{"name": "double", "variations": ["plus"], "points": 0},
+                                 {"name": "triple", "variations": [], "points": 0}]
+
+
+def test_variants_are_reproducible_from_the_seed(catalog):
+    generate_variants("a.bin", QCM, EXERCISES, catalog, 50, "exam-1", 3, 2)
+    generate_variants("b.bin", QCM, EXERCISES, catalog, 50, "exam-1", 3, 2)
+    first, second = VariantFile("a.bin"), VariantFile("b.bin")
+
+    assert [first.variant(n) for n in range(50)] == [second.variant(n) for n in range(50)]
+    assert all(first.verify(n) for n in range(50))
+    assert first.for_student(" Alice ") == first.for_student("alice")
+
+    variant = first.variant(7)
+    assert len(variant["questions"]) == 3
+    assert [e["name"] for e in variant["exercises"]] == ["double", "triple"]
+    assert variant["exercises"][0]["variation"] == "plus"
+    assert variant["exercises"][1]["variation"] is None
+
+    for question, choices, answer in resolve_questions(variant, QCM):
+        assert choices[ord(answer) - ord("A")].endswith("no")
+
+    with pytest.raises(VariantError):
+        first.variant(50)
+    with open("a.bin", "r+b") as f:
+        f.write(b"garbage!")
+    with pytest.raises(VariantError):
+        VariantFile("a.bin")
+
+
+def test_every_variant_has_the_same_maximum_score(make_exercise):
+    points = {"easy": 10, "hard": 20, "medium": 15, "other_easy": 10, "other_hard": 20}
+    for name in points:
+        make_exercise(name, [{"input": "", "output": ""}])
+    exercises = {"exercises": [{"name": name, "language": "python", "points": p}
+                               for name, p in points.items()]}
+    qcm = {"questions": [dict(q, points=5 if i % 2 else 3) for i, q in enumerate(QCM["questions"])]}
+
+    generate_variants("v.bin", qcm, exercises, ExerciseCatalog("exercises", check_interval=0),
+                      200, "exam-1", 2, 3)
+    variants = VariantFile("v.bin")
+    by_id = {q["id"]: q["points"] for q in qcm["questions"]}
+    drawn = set()
+    for number in range(variants.count):
+        variant = variants.variant(number)
+        names = [e["name"] for e in variant["exercises"]]
+        drawn.update(names)
+        assert sum(points[name] for name in names) == 45
+        assert sum(by_id[q["id"]] for q in variant["questions"]) == 8
+        # Bank order is kept
+        assert names == sorted(names, key=list(points).index)
+    assert drawn == set(points)
+
+
+def test_a_file_without_variants_is_rejected(catalog):
+    with pytest.raises(VariantError):
+        generate_variants("none.bin", QCM, EXERCISES, catalog, 0, "exam-1", 3, 2)
+
+    generate_variants("one.bin", QCM, EXERCISES, catalog, 1, "exam-1", 3, 2)
+    with open("one.bin", "rb") as f:
+        data = f.read()
+    with open("none.bin", "wb") as f:
+        f.write(data.replace(b'"count":1,', b'"count":0,'))
+    with pytest.raises(VariantError):
+        VariantFile("none.bin")
+
+
+def test_a_variation_whose_tests_disappeared_is_dropped(catalog):
+    variant = {"exercises": [{"name": "double", "variation": "untested"},
+                             {"name": "double", "variation": "plus"}]}
+
+    resolved = resolve_exercises(variant, EXERCISES, catalog)
+    assert [exo["variation"] for exo in resolved] == [None, "plus"]
+
+    with pytest.raises(VariantError):
+        resolve_exercises({"exercises": [{"name": "gone", "variation": None}]}, EXERCISES, catalog)
+
+
+def test_a_variation_is_graded_on_its_own_tests(catalog, write_file):
+    grader = SubmissionGrader({"test_mode": "single"}, SandboxRunner(timeout=5), Comparator(),
+                              catalog)
+    path = write_file("results/alice/double.py", "print(int(input()) + 1)\n")
+
+    assert grader.grade("double", path, "python")["verdicts"] == ["wrong_output"]
+    assert grader.grade("double", path, "python", "plus")["verdicts"] == ["ok"]
+
+    write_json("exercises/double/variations/plus.json",
+               {"tests": [{"input": "5\n", "output": "60\n"}]})
+    assert grader.grade("double", path, "python", "plus")["verdicts"] == ["wrong_output"]
@@ -0,0 +1,78 @@
+import pytest
+
+from conftest import write_json
+from eval_core.catalog import ExerciseCatalog
+from eval_core.comparator import Comparator
+from eval_core.grader import SubmissionGrader
+from eval_core.sandbox_runner import SandboxRunner, SandboxResult
+from eval_core.verdict_cache import VerdictCache, verdict_key
+
+
+@pytest.fixture
+def grader(make_exercise):
+    make_exercise("double", [{"input": "2\n", "output": "4\n"}],
+                  meta={"variations": ["plus"]},
+                  files={"variations/plus.json": '{"tests": [{"input": "2\\n", "output": "3\\n"}]}'})
+    catalog = ExerciseCatalog("exercises", check_interval=0)
+    return SubmissionGrader({"test_mode": "single"}, SandboxRunner(timeout=5), Comparator(),
+                            catalog, VerdictCache(max_entries=10))
+
+
+def test_identical_submission_is_a_cache_hit(grader, write_file):
+    path = write_file("results/alice/double.py", "print(int(input()) * 2)\n")
+    first = grader.grade("double", path, "python")
+    assert (first["verdicts"], first["cached"]) == (["ok"], False)
+
+    # Same bytes from another student: not run again
+    other = write_file("results/bob/double.py", "print(int(input()) * 2)\n")
+    second = grader.grade("double", other, "python")
+    assert (second["verdicts"], second["cached"]) == (["ok"], True)
+
+
+def test_a_variation_and_its_exercise_keep_their_own_entries(grader, write_file):
+    path = write_file("results/alice/double.py", "print(int(input()) * 2)\n")
+    grader.grade("double", path, "python")
+    grader.grade("double", path, "python", "plus")
+
+    for _ in range(2):
+        base = grader.grade("double", path, "python")
+        plus = grader.grade("double", path, "python", "plus")
+        assert (base["verdicts"], base["cached"]) == (["ok"], True)
+        assert (plus["verdicts"], plus["cached"]) == (["wrong_output"], True)
+
+
+def test_editing_the_tests_invalidates_the_entries(grader, write_file):
+    path = write_file("results/alice/double.py", "print(int(input()) * 2)\n")
+    grader.grade("double", path, "python")
+    old_key = verdict_key("double", path, grader.catalog.tests_hash("double"), "python",
+                          grader.sandbox.limits("python"))
+
+    write_json("exercises/double/test.json",
+               {"tests": [{"input": "2\n", "output": "4\n"}, {"input": "3\n", "output": "7\n"}]})
+    report = grader.grade("double", path, "python")
+
+    assert (report["verdicts"], report["cached"]) == (["ok", "wrong_output"], False)
+    assert grader.verdict_cache.lookup(old_key) is None
+
+
+def test_sandbox_failures_are_never_cached(grader, write_file, monkeypatch):
+    path = write_file("results/alice/double.py", "print(int(input()) * 2)\n")
+    monkeypatch.setattr(grader, "execute_tests",
+                        lambda *args: [SandboxResult.failure(OSError("fork failed"))])
+
+    report = grader.grade("double", path, "python")
+    assert report["verdicts"] == ["internal_error"]
+
+    key = verdict_key("double", path, grader.catalog.tests_hash("double"), "python",
+                      grader.sandbox.limits("python"))
+    assert grader.verdict_cache.lookup(key) is None
+
+
+def test_least_recently_used_entries_are_evicted(workdir):
+    cache = VerdictCache(db_path="small.db", max_entries=2)
+    keys = [(f"k{i}", "exo", "h") for i in range(3)]
+    for key in keys:
+        cache.store(key, ["ok"])
+
+    assert cache.lookup(keys[0]) is None
+    assert cache.lookup(keys[2]) == ["ok"]
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from eval_core.fork_server import error_response
+from eval_core.sandbox_runner import SandboxRunner
+from eval_core.warm_pool import WarmPythonPool
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="the warm pool needs os.fork")
+
+
+@pytest.fixture
+def pool():
+    pool = WarmPythonPool(size=1)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def echo(write_file):
+    return write_file("echo.py", "print(input().upper())\n")
+
+
+def test_warm_pool_runs_a_file(pool, echo):
+    res = pool.run(echo, "hi\n", timeout=5)
+    assert (res["stdout"], res["exit_code"]) == ("HI\n", 0)
+
+    results = pool.run_many(echo, ["a\n", "b\n"], timeout=5)
+    assert [r["stdout"] for r in results] == ["A\n", "B\n"]
+
+
+def test_dead_worker_is_an_internal_error_then_replaced(pool, echo):
+    for worker in list(pool._workers):
+        worker.kill()
+        worker.wait()
+
+    res = pool.run(echo, "hi\n", timeout=5)
+    assert res["internal_error"] is True
+
+    res = pool.run(echo, "again\n", timeout=5)
+    assert res["stdout"] == "AGAIN\n"
+
+
+def test_failed_restart_never_requeues_the_dead_worker(pool, echo, monkeypatch):
+    spawn = pool._spawn
+
+    def broken_spawn():
+        raise RuntimeError("no fork today")
+
+    for worker in list(pool._workers):
+        worker.kill()
+        worker.wait()
+    monkeypatch.setattr(pool, "_spawn", broken_spawn)
+
+    assert pool.run_many(echo, ["x\n"], timeout=5)[0]["internal_error"] is True
+    assert pool._idle.empty()
+    assert pool.run(echo, "x\n", timeout=5)["internal_error"] is True
+
+    # The pool is short of a worker: the next request starts one
+    monkeypatch.setattr(pool, "_spawn", spawn)
+    assert pool.run(echo, "back\n", timeout=5)["stdout"] == "BACK\n"
+
+
+def test_error_reply_keeps_the_requested_shape():
+    many = error_response({"file": "x.py", "inputs": ["1", "2"]}, "boom")
+    assert many["results"][0]["stderr"] == "boom"
+    assert many["results"][0]["internal_error"] is True
+
+    one = error_response({"file": "x.py", "input": "1"}, "boom")
+    assert "results" not in one and one["internal_error"] is True
+    assert error_response(None, "bad json")["stderr"] == "bad json"
+
+
+def test_forked_children_run_their_atexit_handlers(pool, write_file):
+    path = write_file("bye.py", "import atexit\natexit.register(print, 'bye')\nprint('main')\n")
+    assert pool.run(path, "", timeout=5)["stdout"] == "main\nbye\n"
+
+
+PICKLER = """
+import pickle, __main__
+class P:
+    pass
+print(hasattr(__main__, "P"), type(pickle.loads(pickle.dumps(P()))).__name__)
+"""
+
+
+@pytest.mark.parametrize("backend", ["subprocess", "warm"])
+def test_every_backend_runs_the_file_as_main(backend, write_file):
+    path = write_file("pick.py", PICKLER)
+    runner = SandboxRunner(timeout=5, backend=backend, pool_size=1)
+    try:
+        results = [runner.run(path, "python", "")]
+        results += runner.run_many(path, "python", [""])
+        results += runner.run_concurrent(path, "python", ["", ""])
+    finally:
+        if runner.pool is not None:
+            runner.pool.close()
+
+    assert [(r.stdout, r.exit_code) for r in results] == [("True P\n", 0)] * 4
@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+
+import pytest
+
+from eval_core import watcher as watcher_module
+from eval_core.file_loader import StudentFileManager
+from eval_core.watcher import SubmissionWatcher
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watcher(request, monkeypatch):
+    if request.param == "polling":
+        monkeypatch.setattr(watcher_module, "_inotify_fd", lambda directory: None)
+    os.makedirs("sub")
+    w = SubmissionWatcher("sub", debounce=0.05, poll_interval=0.02)
+    if request.param == "inotify" and w.backend != "inotify":
+        w.close()
+        pytest.skip("inotify is not available")
+    yield w
+    w.close()
+
+
+def save_later(path, content, delay=0.1):
+    def save():
+        time.sleep(delay)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+    thread = threading.Thread(target=save)
+    thread.start()
+    return thread
+
+
+def test_a_saved_submission_is_reported_once(watcher):
+    thread = save_later("sub/hello.py", "print('hello')\n")
+    assert watcher.wait(["hello.py"], timeout=5) == os.path.abspath("sub/hello.py")
+    thread.join()
+
+    # Same content saved again: not a new submission
+    save_later("sub/hello.py", "print('hello')\n").join()
+    assert watcher.wait(["hello.py"], timeout=0.3) is None
+
+    thread = save_later("sub/hello.py", "print('hello world')\n")
+    assert watcher.wait(["hello.py"], timeout=5) == os.path.abspath("sub/hello.py")
+    thread.join()
+
+
+def test_other_and_empty_files_are_ignored(watcher):
+    with open("sub/hello.py", "w", encoding="utf-8"):
+        pass
+    save_later("sub/notes.txt", "todo\n").join()
+
+    assert watcher.wait(["hello.py"], timeout=0.3) is None
+
+
+def test_a_file_already_present_counts_as_a_change(watcher):
+    with open("sub/hello.py", "w", encoding="utf-8") as f:
+        f.write("print(1)\n")
+
+    assert watcher.wait(["hello.py"], timeout=0) == os.path.abspath("sub/hello.py")
+
+
+def test_a_save_during_the_cooldown_is_graded_once(make_exercise):
+    make_exercise("hello", [{"input": "", "output": "hello\n"}])
+    files = StudentFileManager("alice", watch=True, debounce=0.05)
+    files.prepare_student_directory()
+    path = os.path.join(files.student_dir, "hello.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("print('v1')\n")
+
+    # v1 graded, failed: cooldown
+    assert files.wait_for_submission("hello") == path
+    files.mark_graded(path)
+    # v2 reported during the cooldown, v3 saved before it ends: v3 is graded
+    save_later(path, "print('v2')\n", delay=0).join()
+    assert files.wait_for_submission("hello") == path
+    save_later(path, "print('v3')\n", delay=0).join()
+    files.mark_graded(path)
+
+    # ...and not reported (graded, penalised) a second time
+    assert files.watcher.wait(["hello.py"], timeout=0.3) is None
+    files.watcher.close()